@@ -4,8 +4,8 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
-from twilio.rest import Client
 from django.conf import settings
+from twilio_app.client import get_twilio_client
 from django.utils.translation import gettext_lazy as _
 from .serializers import (
     UserSerializer, UserCreateSerializer, OperatorPermissionSerializer
@@ -58,7 +58,7 @@ class TwoFactorAuthView(APIView):
     @staticmethod
     def post(request):
         phone_number = request.user.phone_number
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
         client.verify.v2.services(settings.TWILIO_VERIFY_SERVICE_SID).verifications.create(
             to=phone_number, channel="sms"
         )
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.2 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+def copy_event_ids(apps, schema_editor):
+    """
+    Move the event IDs logged in additional_data into the new column, keeping the
+    first entry of any event that was logged twice.
+    """
+    UserActivityLog = apps.get_model("accounts", "UserActivityLog")
+    seen = set()
+    logs = []
+    for log in (
+        UserActivityLog.objects.filter(additional_data__has_key="event_id")
+        .only("additional_data")
+        .order_by("pk")
+        .iterator()
+    ):
+        event_id = log.additional_data["event_id"]
+        if isinstance(event_id, int) and event_id not in seen:
+            seen.add(event_id)
+            log.event_id = event_id
+            logs.append(log)
+    UserActivityLog.objects.bulk_update(logs, ["event_id"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_alter_customuser_language"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="useractivitylog",
+            name="event_id",
+            field=models.BigIntegerField(
+                blank=True,
+                editable=False,
+                help_text="Outbox event the entry was recorded from.",
+                null=True,
+                unique=True,
+                verbose_name="Event ID",
+            ),
+        ),
+        migrations.RunPython(copy_event_ids, migrations.RunPython.noop),
+    ]
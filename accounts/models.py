@@ -143,18 +143,16 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         self.email = self.email.lower()
         super().save(*args, **kwargs)
 
-def check_certificate_expiration(self) -> None:
-    if self.role == "supplier":
-        expired_certificates = self.certificate_set.filter(
-            expiry_date__lt=timezone.now().date(), approved=True
-        ).exists()
+    def check_certificate_expiration(self) -> None:
+        """
+        Update is_active from this supplier's certificates. Use
+        certificates.expiry.sync_supplier_activation to update all suppliers at once.
+        """
+        from certificates.expiry import sync_supplier_activation
 
-        new_is_active = not expired_certificates
-        if self.is_active != new_is_active:
-            self.is_active = new_is_active
-            self.save(update_fields=['is_active'])
+        sync_supplier_activation(supplier_ids=[self.pk])
+        self.refresh_from_db(fields=["is_active"])
 
-CustomUser.check_certificate_expiration = check_certificate_expiration
 
 class OperatorPermission(models.Model):
     operator = models.OneToOneField(
@@ -221,6 +219,14 @@ class UserActivityLog(models.Model):
     timestamp = models.DateTimeField(_("Timestamp"), auto_now_add=True)
     ip_address = models.GenericIPAddressField(_("IP Address"), null=True, blank=True)
     additional_data = models.JSONField(_("Additional Data"), null=True, blank=True)
+    event_id = models.BigIntegerField(
+        _("Event ID"),
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        help_text=_("Outbox event the entry was recorded from."),
+    )
 
     class Meta:
         verbose_name = _("User Activity Log")
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AuditLogsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "audit_logs"
+
+    def ready(self):
+        from .handlers import register_handlers
+
+        register_handlers()
@@ -0,0 +1,38 @@
+from accounts.models import UserActivityLog
+from events.bus import subscribe
+
+AUDITED_TOPICS = [
+    "certificate.approved",
+    "product.approved",
+    "ticket.created",
+    "ticket.status_changed",
+    "ticket.assigned",
+]
+
+
+def record_activity(events):
+    """
+    Log an activity entry per event for the user it concerns. Events already logged
+    by an earlier delivery are skipped by the unique event ID.
+    """
+    UserActivityLog.objects.bulk_create(
+        [
+            UserActivityLog(
+                user_id=event.payload["user_id"],
+                action=event.topic,
+                event_id=event.pk,
+                additional_data={"event_id": event.pk, **event.payload},
+            )
+            for event in events
+            if event.payload.get("user_id")
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def register_handlers():
+    """
+    Records the audited domain events in the user activity log.
+    """
+    for topic in AUDITED_TOPICS:
+        subscribe(topic, record_activity)
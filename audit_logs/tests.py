@@ -1,3 +1,25 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import CustomUser, UserActivityLog
+from events.bus import publish_many
+from .handlers import record_activity
+
+
+class RecordActivityTests(TestCase):
+    def test_each_event_is_logged_once(self):
+        user = CustomUser.objects.create_user("user@example.com", "password")
+        events = publish_many(
+            [
+                ("ticket.created", {"user_id": user.pk, "ticket_id": 1}),
+                ("ticket.assigned", {"user_id": user.pk, "ticket_id": 1}),
+                ("ticket.status_changed", {"ticket_id": 1}),
+            ]
+        )
+        record_activity(events[:1])
+        record_activity(events)
+
+        logs = UserActivityLog.objects.order_by("event_id")
+        self.assertEqual(
+            list(logs.values_list("event_id", "action")),
+            [(events[0].pk, "ticket.created"), (events[1].pk, "ticket.assigned")],
+        )
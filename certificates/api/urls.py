@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path(
+        "expiring-suppliers/",
+        views.ExpiringSuppliersView.as_view(),
+        name="expiring-suppliers",
+    ),
+]
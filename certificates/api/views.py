@@ -1,3 +1,32 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.utils.translation import gettext_lazy as _
 
-# Create your views here.
+from certificates.expiry import suppliers_expiring_within
+
+
+class ExpiringSuppliersView(APIView):
+    """
+    Lists the suppliers with a certificate expiring within `days` days (default 30).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @staticmethod
+    def get(request):
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = -1
+        if days < 0:
+            return Response(
+                {"detail": _("days must be a non-negative integer.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        suppliers = suppliers_expiring_within(days).values(
+            "id", "email", "first_name", "last_name", "next_expiry_date"
+        )
+        return Response(list(suppliers), status=status.HTTP_200_OK)
@@ -0,0 +1,188 @@
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def cache_stats():
+    """
+    Return the hit/miss counters of the extraction cache for the current process.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    stats["hit_ratio"] = stats.get("hits", 0) / lookups if lookups else 0.0
+    return stats
+
+
+class DiskLRUCache:
+    """
+    Local on-disk LRU cache of extracted texts. Entries are plain text files named
+    after the file hash; reads refresh the modification time and the least recently
+    used entries are evicted once the directory grows beyond `max_bytes`.
+    The directory size is tracked as entries are written, so it is only walked once
+    on first use and when an eviction is due. Evictions go down to
+    EVICTION_TARGET of `max_bytes` so they do not happen on every write.
+    """
+
+    EVICTION_TARGET = 0.9
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _scan(self):
+        entries = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        return entries
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as cached_file:
+                text = cached_file.read()
+            os.utime(path, None)
+        except OSError:
+            return None
+        return text
+
+    def set(self, key, text):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                replaced_size = os.stat(path).st_size
+            except OSError:
+                replaced_size = 0
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(text)
+            written_size = os.stat(tmp_path).st_size
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _mtime, size, _path in self._scan())
+            else:
+                self._size += written_size - replaced_size
+            due = self._size > self.max_bytes
+        if due:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the directory is below the
+        eviction target. The size is recounted from disk, which also picks up entries
+        written or removed by other processes sharing the directory.
+        """
+        with self._lock:
+            entries = self._scan()
+            total_size = sum(size for _mtime, size, _path in entries)
+            target = self.max_bytes * self.EVICTION_TARGET
+            for _mtime, size, path in sorted(entries):
+                if total_size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total_size -= size
+                _record("disk_evictions")
+            self._size = total_size
+
+
+_disk_cache = None
+
+
+def get_disk_cache():
+    """
+    Return the local disk cache, or None when CERTIFICATE_TEXT_CACHE_DIR is not set.
+    """
+    global _disk_cache
+    if _disk_cache is None and settings.CERTIFICATE_TEXT_CACHE_DIR:
+        _disk_cache = DiskLRUCache(
+            settings.CERTIFICATE_TEXT_CACHE_DIR,
+            settings.CERTIFICATE_TEXT_CACHE_MAX_BYTES,
+        )
+    return _disk_cache
+
+
+def get_cached_text(file_hash):
+    """
+    Look up previously extracted text by file hash, first on the local disk and then
+    in the database. Returns None on a miss.
+    """
+    from .models import ExtractedText
+
+    if not file_hash:
+        return None
+
+    disk_cache = get_disk_cache()
+    if disk_cache is not None:
+        text = disk_cache.get(file_hash)
+        if text is not None:
+            _record("hits")
+            _record("disk_hits")
+            return text
+
+    text = (
+        ExtractedText.objects.filter(file_hash=file_hash)
+        .values_list("text", flat=True)
+        .first()
+    )
+    if text is None:
+        _record("misses")
+        return None
+
+    ExtractedText.objects.filter(file_hash=file_hash).update(
+        hit_count=F("hit_count") + 1, last_used_at=timezone.now()
+    )
+    _record("hits")
+    _record("db_hits")
+    if disk_cache is not None:
+        disk_cache.set(file_hash, text)
+    return text
+
+
+def store_text(file_hash, text):
+    """
+    Store extracted text for a file hash in the database and the local disk cache.
+    Empty results are not cached so that failed extractions are retried.
+    """
+    from .models import ExtractedText
+
+    if not file_hash or not text:
+        return
+    ExtractedText.objects.get_or_create(file_hash=file_hash, defaults={"text": text})
+    disk_cache = get_disk_cache()
+    if disk_cache is not None:
+        disk_cache.set(file_hash, text)
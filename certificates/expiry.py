@@ -0,0 +1,179 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, F, Min, OuterRef
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .models import Certificate, SupplierExpiry
+
+
+def valid_certificates():
+    """Certificates that count for expiry: approved and verified."""
+    return Certificate.objects.filter(approved=True, verified=True)
+
+
+def refresh_supplier_expiry(supplier_ids, today=None):
+    """
+    Recompute the next expiry date of the given suppliers with one aggregate query
+    and one upsert.
+    """
+    supplier_ids = set(supplier_ids)
+    if not supplier_ids:
+        return
+    today = today or timezone.now().date()
+    next_expiry = dict(
+        valid_certificates()
+        .filter(supplier_id__in=supplier_ids, expiry_date__gte=today)
+        .values("supplier_id")
+        .annotate(next_expiry_date=Min("expiry_date"))
+        .values_list("supplier_id", "next_expiry_date")
+    )
+    SupplierExpiry.objects.bulk_create(
+        [
+            SupplierExpiry(
+                supplier_id=supplier_id,
+                next_expiry_date=next_expiry.get(supplier_id),
+            )
+            for supplier_id in supplier_ids
+        ],
+        update_conflicts=True,
+        unique_fields=["supplier"],
+        update_fields=["next_expiry_date", "updated_at"],
+    )
+
+
+def refresh_passed_expiries(today=None):
+    """
+    Move suppliers whose next expiry date has passed on to their following expiry.
+    Only those rows are touched, found through the index on next_expiry_date.
+    """
+    today = today or timezone.now().date()
+    supplier_ids = (
+        SupplierExpiry.objects.filter(next_expiry_date__lt=today)
+        .values_list("supplier_id", flat=True)
+        .iterator(chunk_size=settings.CERTIFICATE_EXPIRY_REFRESH_BATCH_SIZE)
+    )
+    while chunk := list(
+        islice(supplier_ids, settings.CERTIFICATE_EXPIRY_REFRESH_BATCH_SIZE)
+    ):
+        refresh_supplier_expiry(chunk, today)
+
+
+def rebuild_supplier_expiry():
+    """
+    Recompute the next expiry date of every supplier.
+    """
+    supplier_ids = (
+        CustomUser.objects.filter(role="supplier")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=settings.CERTIFICATE_EXPIRY_REFRESH_BATCH_SIZE)
+    )
+    while chunk := list(
+        islice(supplier_ids, settings.CERTIFICATE_EXPIRY_REFRESH_BATCH_SIZE)
+    ):
+        refresh_supplier_expiry(chunk)
+
+
+def suppliers_expiring_within(days, today=None):
+    """
+    Return the suppliers with an approved, verified certificate expiring in the next
+    `days` days, annotated with their next expiry date.
+    """
+    today = today or timezone.now().date()
+    refresh_passed_expiries(today)
+    return (
+        CustomUser.objects.filter(
+            certificate_expiry__next_expiry_date__range=(
+                today,
+                today + timedelta(days=days),
+            )
+        )
+        .annotate(next_expiry_date=F("certificate_expiry__next_expiry_date"))
+        .order_by("certificate_expiry__next_expiry_date")
+    )
+
+
+def suppliers_with_expiry_on(dates):
+    """
+    Return the suppliers with an approved, verified certificate expiring on one of
+    `dates`, resolved through the partial expiry index.
+    """
+    return CustomUser.objects.filter(
+        pk__in=valid_certificates().filter(expiry_date__in=dates).values("supplier_id")
+    )
+
+
+def invalidate_supplier_expiry(sender, instance, **kwargs):
+    """
+    Refresh the supplier of a saved or deleted certificate, and its previous supplier
+    when the certificate was moved to another one.
+    """
+    supplier_ids = [instance.supplier_id]
+    loaded_values = getattr(instance, "_loaded_values", None) or {}
+    if isinstance(loaded_values.get("supplier_id"), int):
+        supplier_ids.append(loaded_values["supplier_id"])
+    refresh_supplier_expiry(supplier_ids)
+
+
+def update_supplier_activation(queryset, is_active):
+    """
+    Set is_active on the users of `queryset` with a single UPDATE ... RETURNING and
+    return the IDs of the rows changed.
+    """
+    select_sql, select_params = queryset.values("pk").query.sql_with_params()
+    table = CustomUser._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET is_active = %s WHERE id IN ({select_sql}) RETURNING id",
+            [is_active, *select_params],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def sync_supplier_activation(today=None, supplier_ids=None):
+    """
+    Deactivate approved suppliers that hold an expired approved certificate and
+    reactivate those that no longer do, with one UPDATE each driven by an (anti-)join
+    on the expiry index. Limited to `supplier_ids` when given.
+    Only suppliers deactivated by this sync and with a verified email are reactivated,
+    so accounts awaiting verification or deactivated by an admin stay inactive.
+    Returns the IDs of the deactivated and of the reactivated suppliers.
+    """
+    today = today or timezone.now().date()
+    expired = Certificate.objects.filter(
+        supplier_id=OuterRef("pk"), approved=True, expiry_date__lt=today
+    )
+    suppliers = CustomUser.objects.filter(role="supplier", approval_status="approved")
+    if supplier_ids is not None:
+        suppliers = suppliers.filter(pk__in=supplier_ids)
+
+    with transaction.atomic():
+        deactivated = update_supplier_activation(
+            suppliers.filter(Exists(expired), is_active=True), False
+        )
+        reactivated = update_supplier_activation(
+            suppliers.filter(
+                ~Exists(expired),
+                is_active=False,
+                email_verified=True,
+                certificate_expiry__deactivated_for_expiry=True,
+            ),
+            True,
+        )
+        # Remember why the suppliers were deactivated, creating missing rows as needed
+        SupplierExpiry.objects.bulk_create(
+            [
+                SupplierExpiry(supplier_id=supplier_id, deactivated_for_expiry=True)
+                for supplier_id in deactivated
+            ],
+            update_conflicts=True,
+            unique_fields=["supplier"],
+            update_fields=["deactivated_for_expiry", "updated_at"],
+        )
+        SupplierExpiry.objects.filter(supplier_id__in=reactivated).update(
+            deactivated_for_expiry=False, updated_at=timezone.now()
+        )
+    return deactivated, reactivated
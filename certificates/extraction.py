@@ -0,0 +1,105 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from search.indexing import reindex_objects
+from .cache import get_cached_text, store_text
+from .models import Certificate, ExtractionStatus
+
+logger = logging.getLogger(__name__)
+
+
+def claim_pending_certificates(batch_size=None):
+    """
+    Lock a batch of certificates waiting for extraction and mark them as processing.
+    Rows locked by another worker are skipped, so several workers can drain the queue.
+    """
+    batch_size = batch_size or settings.CERTIFICATE_EXTRACTION_BATCH_SIZE
+    with transaction.atomic():
+        certificate_ids = list(
+            Certificate.objects.select_for_update(skip_locked=True)
+            .filter(extraction_status=ExtractionStatus.PENDING)
+            .order_by("upload_time")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        Certificate.objects.filter(pk__in=certificate_ids).update(
+            extraction_status=ExtractionStatus.PROCESSING
+        )
+    return certificate_ids
+
+
+def record_dates_found(certificate):
+    """
+    Store a positive date validation as soon as both dates have been read, while the
+    rest of the document is still being extracted.
+    """
+    Certificate.objects.filter(
+        pk=certificate.pk,
+        file_hash=certificate.file_hash,
+        extraction_status=ExtractionStatus.PROCESSING,
+    ).update(dates_match=True)
+
+
+def extract_certificate(certificate):
+    """
+    Extract the text of a single certificate once per unique file content and store
+    the result. Results are written with a queryset update so that `save()` is not
+    re-entered, and are discarded if the file was replaced in the meantime.
+    """
+    text = get_cached_text(certificate.file_hash)
+    if text is None:
+        # Read the object once and hand the same buffer to the parsers
+        source, file_hash = certificate.spool_file()
+        with source:
+            if file_hash != certificate.file_hash:
+                logger.warning(
+                    f"Stored file of certificate {certificate.pk} does not match its recorded hash."
+                )
+            text, complete = certificate.extract_text_for_validation(
+                source, lambda: record_dates_found(certificate)
+            )
+        # Only the text of fully read documents is shared through the cache
+        if complete:
+            store_text(file_hash, text)
+
+    status = ExtractionStatus.COMPLETED if text else ExtractionStatus.FAILED
+    dates_match = certificate.validate_dates(text)
+
+    updated = Certificate.objects.filter(
+        pk=certificate.pk,
+        file_hash=certificate.file_hash,
+        extraction_status=ExtractionStatus.PROCESSING,
+    ).update(
+        extraction_status=status,
+        extracted_text=text,
+        extracted_at=timezone.now(),
+        dates_match=dates_match,
+    )
+    if updated:
+        # The update bypasses save(), so the search document is refreshed here
+        reindex_objects("certificate", [certificate.pk])
+    if updated and not dates_match:
+        logger.warning(
+            f"Entered dates for certificate {certificate.pk} were not found in the extracted text."
+        )
+    return status
+
+
+def run_pending_extractions(batch_size=None):
+    """
+    Process one batch of pending certificates. Returns the number of certificates handled.
+    """
+    certificate_ids = claim_pending_certificates(batch_size)
+    for certificate in Certificate.objects.filter(pk__in=certificate_ids):
+        try:
+            extract_certificate(certificate)
+        except Exception as e:
+            logger.error(
+                f"Text extraction failed for certificate {certificate.pk}: {e}"
+            )
+            Certificate.objects.filter(
+                pk=certificate.pk, extraction_status=ExtractionStatus.PROCESSING
+            ).update(extraction_status=ExtractionStatus.FAILED)
+    return len(certificate_ids)
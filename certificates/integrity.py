@@ -0,0 +1,153 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from qr_generator.snapshots import invalidate_supplier_snapshots
+from .expiry import refresh_supplier_expiry
+from .models import Certificate, IntegritySweep
+
+logger = logging.getLogger(__name__)
+
+SWEEP_FIELDS = [
+    "verified",
+    "suspected_tampered",
+    "last_checked",
+    "file_etag",
+    "file_size",
+]
+
+
+def verification_state(certificate):
+    """
+    The certificate fields written by a check that the supplier's next expiry date and
+    scan snapshots depend on.
+    """
+    return certificate.verified, certificate.suspected_tampered
+
+
+def check_certificate(certificate, full=False):
+    """
+    Check a single certificate against storage and set its verification fields.
+    Objects whose ETag and size match the last successful check are not downloaded
+    unless `full` is set. Only a hash mismatch marks a certificate as tampered; storage
+    errors are retried CERTIFICATE_INTEGRITY_RETRIES times and then reported as
+    "error", leaving the certificate unchanged for the next sweep.
+    Returns "skipped", "verified", "tampered" or "error".
+    """
+    for attempt in range(settings.CERTIFICATE_INTEGRITY_RETRIES + 1):
+        try:
+            etag, size = certificate.get_file_metadata()
+            if (
+                not full
+                and certificate.verified
+                and certificate.file_etag
+                and (etag, size) == (certificate.file_etag, certificate.file_size)
+            ):
+                certificate.last_checked = timezone.now()
+                return "skipped"
+            current_hash = certificate.calculate_file_hash()
+            break
+        except Exception as e:
+            logger.warning(
+                f"Integrity check of certificate {certificate.pk} could not read storage "
+                f"(attempt {attempt + 1}): {e}"
+            )
+            if attempt < settings.CERTIFICATE_INTEGRITY_RETRIES:
+                time.sleep(settings.CERTIFICATE_INTEGRITY_RETRY_DELAY * 2**attempt)
+    else:
+        logger.error(
+            f"Integrity check of certificate {certificate.pk} skipped after storage errors."
+        )
+        return "error"
+
+    certificate.check_file_integrity(current_hash)
+    certificate.file_etag = etag
+    certificate.file_size = size
+    if certificate.suspected_tampered:
+        logger.warning(
+            f"Suspected tampering detected for certificate {certificate.pk}: {certificate.name}"
+        )
+        return "tampered"
+    return "verified"
+
+
+def sweep_integrity(
+    name="default", batch_size=None, workers=None, full=False, restart=False
+):
+    """
+    Check all certificates in primary key order, reading from storage on a bounded
+    thread pool. Results are written with bulk_update and the checkpoint is advanced
+    after every batch, so an interrupted sweep continues where it stopped.
+    """
+    batch_size = batch_size or settings.CERTIFICATE_INTEGRITY_BATCH_SIZE
+    workers = workers or settings.CERTIFICATE_INTEGRITY_WORKERS
+
+    sweep, _created = IntegritySweep.objects.get_or_create(name=name)
+    if restart or sweep.finished_at or not sweep.started_at:
+        sweep.last_certificate_id = 0
+        sweep.checked_count = sweep.skipped_count = sweep.tampered_count = 0
+        sweep.started_at = timezone.now()
+        sweep.finished_at = None
+        sweep.save()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            certificates = list(
+                Certificate.objects.filter(pk__gt=sweep.last_certificate_id)
+                .order_by("pk")
+                .only(
+                    "pk",
+                    "supplier",
+                    "name",
+                    "file",
+                    "file_hash",
+                    "file_etag",
+                    "file_size",
+                    "verified",
+                    "suspected_tampered",
+                    "last_checked",
+                )[:batch_size]
+            )
+            if not certificates:
+                break
+            previous_states = [
+                verification_state(certificate) for certificate in certificates
+            ]
+
+            results = list(
+                executor.map(
+                    lambda certificate: check_certificate(certificate, full),
+                    certificates,
+                )
+            )
+            Certificate.objects.bulk_update(certificates, SWEEP_FIELDS)
+            # bulk_update sends no signals, so refresh what depends on certificates that changed state
+            changed_supplier_ids = {
+                certificate.supplier_id
+                for certificate, state in zip(certificates, previous_states)
+                if verification_state(certificate) != state
+            }
+            for supplier_id in changed_supplier_ids:
+                invalidate_supplier_snapshots(supplier_id)
+            refresh_supplier_expiry(changed_supplier_ids)
+
+            sweep.last_certificate_id = certificates[-1].pk
+            IntegritySweep.objects.filter(pk=sweep.pk).update(
+                last_certificate_id=sweep.last_certificate_id,
+                checked_count=F("checked_count")
+                + results.count("verified")
+                + results.count("tampered"),
+                # Certificates that could not be read are left for the next sweep
+                skipped_count=F("skipped_count")
+                + results.count("skipped")
+                + results.count("error"),
+                tampered_count=F("tampered_count") + results.count("tampered"),
+            )
+
+    IntegritySweep.objects.filter(pk=sweep.pk).update(finished_at=timezone.now())
+    sweep.refresh_from_db()
+    return sweep
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from certificates.cache import cache_stats
+from certificates.extraction import run_pending_extractions
+
+
+class Command(BaseCommand):
+    help = "Extract text from certificates that are pending extraction."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CERTIFICATE_EXTRACTION_BATCH_SIZE,
+            help="Number of certificates to claim per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for pending certificates instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.CERTIFICATE_EXTRACTION_POLL_INTERVAL,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending_extractions(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} certificate(s).")
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Extraction cache: {cache_stats()}")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
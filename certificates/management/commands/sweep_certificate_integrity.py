@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from certificates.integrity import sweep_integrity
+
+
+class Command(BaseCommand):
+    help = "Check the integrity of all certificates against storage, resuming from the last checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--name", default="default", help="Checkpoint name of the sweep."
+        )
+        parser.add_argument("--batch-size", type=int, help="Certificates per batch.")
+        parser.add_argument("--workers", type=int, help="Concurrent storage reads.")
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-hash every file even if its ETag and size are unchanged.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint and start from the first certificate.",
+        )
+
+    def handle(self, *args, **options):
+        sweep = sweep_integrity(
+            name=options["name"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            full=options["full"],
+            restart=options["restart"],
+        )
+        self.stdout.write(
+            f"Checked {sweep.checked_count}, skipped {sweep.skipped_count} unchanged or unreadable, "
+            f"{sweep.tampered_count} suspected tampered."
+        )
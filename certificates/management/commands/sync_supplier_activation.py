@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from certificates.expiry import sync_supplier_activation
+
+
+class Command(BaseCommand):
+    help = "Deactivate suppliers with expired certificates and reactivate those without. Run daily."
+
+    def handle(self, *args, **options):
+        deactivated, reactivated = sync_supplier_activation()
+        self.stdout.write(
+            f"Deactivated {len(deactivated)} and reactivated {len(reactivated)} supplier(s)."
+        )
+        if options["verbosity"] > 1:
+            self.stdout.write(f"Deactivated: {deactivated}")
+            self.stdout.write(f"Reactivated: {reactivated}")
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.2 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificates", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificate",
+            name="extraction_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending Extraction"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=10,
+                verbose_name="Extraction Status",
+            ),
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="extracted_text",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Extracted Text"
+            ),
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="extracted_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Extracted At"
+            ),
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="dates_match",
+            field=models.BooleanField(
+                blank=True,
+                help_text="Whether the entered dates were found in the extracted text.",
+                null=True,
+                verbose_name="Dates Match",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="certificate",
+            index=models.Index(
+                fields=["extraction_status"], name="certificate_extract_504f76_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.2 on 2026-10-17 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificates", "0002_certificate_extraction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExtractedText",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "file_hash",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="File Hash"
+                    ),
+                ),
+                ("text", models.TextField(verbose_name="Extracted Text")),
+                (
+                    "hit_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Hit Count"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "last_used_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Last Used At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Extracted Text",
+                "verbose_name_plural": "Extracted Texts",
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificates", "0003_extractedtext"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IntegritySweep",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="Sweep Name"
+                    ),
+                ),
+                (
+                    "last_certificate_id",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Last Certificate ID"
+                    ),
+                ),
+                (
+                    "checked_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Checked"),
+                ),
+                (
+                    "skipped_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Skipped Unchanged"
+                    ),
+                ),
+                (
+                    "tampered_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Suspected Tampered"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Started At"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Integrity Sweep",
+                "verbose_name_plural": "Integrity Sweeps",
+            },
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="file_etag",
+            field=models.CharField(
+                blank=True, editable=False, max_length=128, verbose_name="File ETag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="file_size",
+            field=models.PositiveBigIntegerField(
+                blank=True, editable=False, null=True, verbose_name="File Size"
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+from django.utils import timezone
+
+
+def populate_supplier_expiry(apps, schema_editor):
+    Certificate = apps.get_model("certificates", "Certificate")
+    SupplierExpiry = apps.get_model("certificates", "SupplierExpiry")
+    next_expiry = (
+        Certificate.objects.filter(
+            approved=True, verified=True, expiry_date__gte=timezone.now().date()
+        )
+        .values("supplier_id")
+        .annotate(next_expiry_date=Min("expiry_date"))
+    )
+    SupplierExpiry.objects.bulk_create(
+        [SupplierExpiry(**row) for row in next_expiry], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_alter_customuser_language"),
+        ("certificates", "0004_integrity_sweep"),
+        ("qr_generator", "0003_scan_snapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupplierExpiry",
+            fields=[
+                (
+                    "supplier",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="certificate_expiry",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Supplier",
+                    ),
+                ),
+                (
+                    "next_expiry_date",
+                    models.DateField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="Next Expiry Date",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Supplier Expiry",
+                "verbose_name_plural": "Supplier Expiries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="certificate",
+            index=models.Index(
+                condition=models.Q(("approved", True)),
+                fields=["expiry_date", "supplier"],
+                name="certificate_expiry_idx",
+            ),
+        ),
+        migrations.RunPython(populate_supplier_expiry, migrations.RunPython.noop),
+    ]
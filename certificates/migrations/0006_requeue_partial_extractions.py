@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:10
+
+from django.db import migrations
+
+
+def requeue_partial_extractions(apps, schema_editor):
+    """
+    PDF extraction used to stop once both dates were found, and those partial texts
+    were stored as completed but never added to the extraction cache. Queue them again
+    so the full text is extracted.
+    """
+    Certificate = apps.get_model("certificates", "Certificate")
+    ExtractedText = apps.get_model("certificates", "ExtractedText")
+    Certificate.objects.filter(
+        extraction_status="completed", file__iendswith=".pdf"
+    ).exclude(file_hash__in=ExtractedText.objects.values("file_hash")).update(
+        extraction_status="pending", extracted_at=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificates", "0005_supplier_expiry"),
+    ]
+
+    operations = [
+        migrations.RunPython(requeue_partial_extractions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0006_requeue_partial_extractions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplierexpiry',
+            name='deactivated_for_expiry',
+            field=models.BooleanField(default=False, help_text='Whether the supplier was deactivated for holding an expired certificate. Only such suppliers are reactivated automatically.', verbose_name='Deactivated for Expiry'),
+        ),
+    ]
@@ -1,14 +1,78 @@
-from django.db import models
+from django.db import models, transaction
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from accounts.models import CustomUser
 from qr_generator.models import CertificateQR
 from approval.models import ApprovalStatus
+from events.bus import publish
 from django.utils import timezone
+from storages.utils import clean_name
 import hashlib
+import logging
 import re
-import PyPDF2
+import tempfile
 import pytesseract
 from PIL import Image
+from .pdf import DateMatcher, extract_pdf_text
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionStatus(models.TextChoices):
+    """Choices for the state of the background text extraction."""
+
+    PENDING = "pending", _("Pending Extraction")
+    PROCESSING = "processing", _("Processing")
+    COMPLETED = "completed", _("Completed")
+    FAILED = "failed", _("Failed")
+
+
+# Read size used when streaming certificate files from storage
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+class ExtractedText(models.Model):
+    """
+    Content-addressed store of text extracted from certificate files, keyed by the
+    SHA-256 of the file so identical documents are only parsed once.
+    """
+
+    file_hash = models.CharField(_("File Hash"), max_length=64, unique=True)
+    text = models.TextField(_("Extracted Text"))
+    hit_count = models.PositiveIntegerField(_("Hit Count"), default=0)
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    last_used_at = models.DateTimeField(_("Last Used At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Extracted Text")
+        verbose_name_plural = _("Extracted Texts")
+
+    def __str__(self):
+        return f"Extracted text for {self.file_hash}"
+
+
+class IntegritySweep(models.Model):
+    """
+    Checkpoint of a bulk certificate integrity sweep, so an interrupted sweep resumes
+    after the last certificate it processed.
+    """
+
+    name = models.CharField(_("Sweep Name"), max_length=100, unique=True)
+    last_certificate_id = models.PositiveBigIntegerField(
+        _("Last Certificate ID"), default=0
+    )
+    checked_count = models.PositiveIntegerField(_("Checked"), default=0)
+    skipped_count = models.PositiveIntegerField(_("Skipped Unchanged"), default=0)
+    tampered_count = models.PositiveIntegerField(_("Suspected Tampered"), default=0)
+    started_at = models.DateTimeField(_("Started At"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Integrity Sweep")
+        verbose_name_plural = _("Integrity Sweeps")
+
+    def __str__(self):
+        return f"Integrity sweep {self.name}"
 
 
 class Certificate(models.Model):
@@ -45,6 +109,30 @@ class Certificate(models.Model):
     )
     suspected_tampered = models.BooleanField(_("Suspected Tampered"), default=False)
 
+    # Text extraction results, filled in by the background extraction pipeline
+    extraction_status = models.CharField(
+        _("Extraction Status"),
+        max_length=10,
+        choices=ExtractionStatus.choices,
+        default=ExtractionStatus.PENDING,
+    )
+    extracted_text = models.TextField(_("Extracted Text"), blank=True, editable=False)
+    extracted_at = models.DateTimeField(_("Extracted At"), null=True, blank=True)
+    dates_match = models.BooleanField(
+        _("Dates Match"),
+        null=True,
+        blank=True,
+        help_text=_("Whether the entered dates were found in the extracted text."),
+    )
+
+    # Storage metadata recorded by the last integrity check, used to skip unchanged objects
+    file_etag = models.CharField(
+        _("File ETag"), max_length=128, blank=True, editable=False
+    )
+    file_size = models.PositiveBigIntegerField(
+        _("File Size"), null=True, blank=True, editable=False
+    )
+
     certificate_qr = models.OneToOneField(
         CertificateQR,
         on_delete=models.SET_NULL,
@@ -60,69 +148,179 @@ class Certificate(models.Model):
         indexes = [
             models.Index(fields=["supplier"]),
             models.Index(fields=["file_hash"]),
+            models.Index(fields=["extraction_status"]),
+            # Expiry lookups only ever consider approved certificates
+            models.Index(
+                fields=["expiry_date", "supplier"],
+                condition=models.Q(approved=True),
+                name="certificate_expiry_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.name} - {self.supplier.get_full_name()}"
 
+    def get_file_metadata(self):
+        """
+        Return the ETag and size of the stored file using a metadata-only request.
+        Storages without ETags fall back to the modification time.
+        """
+        storage = self.file.storage
+        bucket = getattr(storage, "bucket", None)
+        if bucket is not None:
+            key = storage._normalize_name(clean_name(self.file.name))
+            stored_object = bucket.Object(key)
+            return stored_object.e_tag.strip('"'), stored_object.content_length
+        return (
+            storage.get_modified_time(self.file.name).isoformat(),
+            storage.size(self.file.name),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Keep the values loaded from the database so save() can detect a replaced file
+        without reloading the row.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_saved_state(self):
+        """
+        Return the stored file name, hash, version, upload time and dates of this certificate.
+        """
+        state_fields = [
+            "file",
+            "file_hash",
+            "version",
+            "upload_time",
+            "issue_date",
+            "expiry_date",
+        ]
+        loaded_values = getattr(self, "_loaded_values", None) or {}
+        if all(
+            field in loaded_values and loaded_values[field] is not models.DEFERRED
+            for field in state_fields
+        ):
+            return loaded_values
+        return Certificate.objects.filter(pk=self.pk).values(*state_fields).first()
+
+    def iter_file_chunks(self):
+        """
+        Stream the file in large chunks. A freshly uploaded file is read from the upload
+        and rewound rather than closed, so storage can still save it afterwards.
+        """
+        if not getattr(self.file, "_committed", True):
+            upload = self.file.file
+            upload.seek(0)
+            yield from iter(lambda: upload.read(FILE_CHUNK_SIZE), b"")
+            upload.seek(0)
+            return
+
+        with self.file.open("rb") as f:
+            yield from iter(lambda: f.read(FILE_CHUNK_SIZE), b"")
+
     def calculate_file_hash(self):
         """
         Generate a SHA-256 hash for the uploaded file.
         """
         hash_sha256 = hashlib.sha256()
         if self.file and hasattr(self.file, "open"):
-            with self.file.open("rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
+            for chunk in self.iter_file_chunks():
+                hash_sha256.update(chunk)
             return hash_sha256.hexdigest()
         return None
 
-    def extract_text_from_file(self):
+    def spool_file(self):
+        """
+        Read the file from storage once into a temporary buffer, hashing it on the way.
+        Returns the rewound buffer and the SHA-256 of its content; the buffer stays in
+        memory up to CERTIFICATE_SPOOL_MAX_MEMORY bytes and spills to disk beyond that.
+        """
+        hash_sha256 = hashlib.sha256()
+        buffer = tempfile.SpooledTemporaryFile(
+            max_size=settings.CERTIFICATE_SPOOL_MAX_MEMORY
+        )
+        for chunk in self.iter_file_chunks():
+            hash_sha256.update(chunk)
+            buffer.write(chunk)
+        buffer.seek(0)
+        return buffer, hash_sha256.hexdigest()
+
+    def extract_text_from_file(self, source=None):
         """
         Extract text from the uploaded file using appropriate methods based on file type.
+        `source` is an already spooled copy of the file; it is read from storage otherwise.
         """
         if self.file:
             file_extension = self.file.name.split(".")[-1].lower()
 
             if file_extension == "pdf":
-                return self.extract_text_from_pdf()
+                return self.extract_text_from_pdf(source)
             elif file_extension in ["jpg", "jpeg", "png"]:
-                return self.extract_text_from_image()
+                return self.extract_text_from_image(source)
 
         return ""
 
-    def extract_text_from_pdf(self):
+    def extract_text_from_pdf(self, source=None):
         """
         Extract text from a PDF file using PyPDF2.
         """
         text = ""
         try:
-            with self.file.open("rb") as pdf_file:
-                reader = PyPDF2.PdfReader(pdf_file)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
+            if source is None:
+                source, _file_hash = self.spool_file()
+            text, _complete = extract_pdf_text(
+                source, max_pages=settings.CERTIFICATE_PDF_MAX_PAGES
+            )
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
         return text
 
-    def extract_text_from_image(self):
+    def extract_text_from_image(self, source=None):
         """
         Extract text from an image file using OCR (pytesseract).
         """
         text = ""
         try:
-            with self.file.open("rb") as image_file:
-                image = Image.open(image_file)
-                text = pytesseract.image_to_string(image)
+            if source is None:
+                source, _file_hash = self.spool_file()
+            source.seek(0)
+            image = Image.open(source)
+            text = pytesseract.image_to_string(image)
         except Exception as e:
             print(f"Error extracting text from image: {e}")
         return text
 
-    def validate_dates(self):
+    def extract_text_for_validation(self, source, on_dates_found=None):
+        """
+        Extract the full text of the file and validate the entered dates on the way.
+        For PDFs, `on_dates_found` is called once as soon as both dates have been seen,
+        while the remaining pages are still read so the full text is stored.
+        Returns the text and whether it is complete.
+        """
+        if self.file and self.file.name.split(".")[-1].lower() == "pdf":
+            try:
+                return extract_pdf_text(
+                    source,
+                    matcher=DateMatcher(
+                        self.issue_date, self.expiry_date, on_dates_found
+                    ),
+                    max_pages=settings.CERTIFICATE_PDF_MAX_PAGES,
+                )
+            except Exception:
+                logger.exception(f"Could not extract text from certificate {self.pk}.")
+                return "", False
+        return self.extract_text_from_file(source), True
+
+    def validate_dates(self, extracted_text=None):
         """
         Validate the extracted dates from the certificate file to match manually entered dates.
+        Uses the stored extraction result unless a text is passed in explicitly.
         """
-        extracted_text = self.extract_text_from_file()
+        if extracted_text is None:
+            extracted_text = self.extracted_text
         if not extracted_text:
             return False
 
@@ -144,53 +342,121 @@ class Certificate(models.Model):
 
         return False
 
+    def reset_extraction(self):
+        """
+        Queue the certificate for text extraction by the background pipeline.
+        """
+        self.extraction_status = ExtractionStatus.PENDING
+        self.extracted_text = ""
+        self.extracted_at = None
+        self.dates_match = None
+
+    def has_new_file(self, saved_state=None):
+        """
+        Check whether the file needs hashing, i.e. a new file was assigned or no hash is stored yet.
+        """
+        if not self.file:
+            return False
+        if not self.file_hash or not getattr(self.file, "_committed", True):
+            return True
+        return saved_state is not None and saved_state["file"] != self.file.name
+
     def save(self, *args, **kwargs):
         """
-        Override save method to validate date consistency, calculate file hash, and manage QR code and approvals.
+        Override save method to calculate file hash, queue text extraction and manage QR code and approvals.
+        Date validation uses the stored extraction result and records its outcome in
+        dates_match; new or replaced files are filled from the extraction cache when
+        possible and are otherwise left pending for the background extraction pipeline.
         """
-        # Validate the manually entered dates against extracted dates
-        if not self.validate_dates():
-            raise ValueError(
-                _(
-                    "The manually entered dates do not match the dates found in the uploaded certificate file."
-                )
-            )
+        from .cache import get_cached_text
 
-        current_hash = self.calculate_file_hash()
+        saved_state = self.get_saved_state() if self.pk else None
+
+        # Only re-read the file when a new file was assigned
+        if self.has_new_file(saved_state):
+            current_hash = self.calculate_file_hash()
+        else:
+            current_hash = self.file_hash
 
         # Check if the file has been modified or a new certificate is being uploaded
-        if self.pk:
-            existing_certificate = Certificate.objects.get(pk=self.pk)
-            if existing_certificate.file_hash != current_hash:
-                # Archive the previous version
-                if not self.previous_versions:
-                    self.previous_versions = []
-                self.previous_versions.append(
-                    {
-                        "version": existing_certificate.version,
-                        "file_hash": existing_certificate.file_hash,
-                        "upload_time": str(existing_certificate.upload_time),
-                    }
+        if saved_state and saved_state["file_hash"] != current_hash:
+            # Archive the previous version
+            if not self.previous_versions:
+                self.previous_versions = []
+            self.previous_versions.append(
+                {
+                    "version": saved_state["version"],
+                    "file_hash": saved_state["file_hash"],
+                    "upload_time": str(saved_state["upload_time"]),
+                }
+            )
+            self.version += 1
+
+        if self.file_hash != current_hash:
+            self.reset_extraction()
+            cached_text = get_cached_text(current_hash)
+            if cached_text is not None:
+                self.extracted_text = cached_text
+                self.extraction_status = ExtractionStatus.COMPLETED
+                self.extracted_at = timezone.now()
+
+        if self.extraction_status == ExtractionStatus.COMPLETED:
+            # Validate the manually entered dates against the stored extracted dates
+            self.dates_match = self.validate_dates()
+            if not self.dates_match:
+                # Recorded in dates_match rather than raised, so unrelated edits and
+                # approvals of the certificate still save
+                logger.warning(
+                    f"Entered dates for certificate {self.pk} were not found in the extracted text."
                 )
-                self.version += 1
 
         self.file_hash = current_hash
 
-        # Generate QR Code if approved and not already set
-        if not self.certificate_qr and self.approval_status == ApprovalStatus.APPROVED:
-            certificate_qr = CertificateQR.objects.create(certificate=self)
-            self.certificate_qr = certificate_qr
-
         if self.approval_status == ApprovalStatus.APPROVED:
             self.approved = True
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # The QR code of an approved certificate is created by the event relay
+            if (
+                self.approval_status == ApprovalStatus.APPROVED
+                and not self.certificate_qr_id
+            ):
+                publish(
+                    "certificate.approved",
+                    {"certificate_id": self.pk, "user_id": self.supplier_id},
+                )
+
+        self._loaded_values = {
+            "supplier_id": self.supplier_id,
+            "file": self.file.name,
+            "file_hash": self.file_hash,
+            "version": self.version,
+            "upload_time": self.upload_time,
+            "issue_date": self.issue_date,
+            "expiry_date": self.expiry_date,
+        }
 
-    def verify_integrity(self):
+    def generate_certificate_qr(self):
         """
-        Verify the integrity of the uploaded file by comparing the stored hash with the current hash.
+        Create the QR code of an approved certificate if it has none yet.
         """
-        current_hash = self.calculate_file_hash()
+        if self.certificate_qr_id or self.approval_status != ApprovalStatus.APPROVED:
+            return False
+        self.certificate_qr = CertificateQR.objects.create(
+            supplier_id=self.supplier_id, certificate_id=str(self.pk)
+        )
+        Certificate.objects.filter(pk=self.pk).update(
+            certificate_qr=self.certificate_qr
+        )
+        return True
+
+    def check_file_integrity(self, current_hash=None):
+        """
+        Set the verification flags by comparing the stored hash with the current hash, without saving.
+        """
+        if current_hash is None:
+            current_hash = self.calculate_file_hash()
         if current_hash and current_hash == self.file_hash:
             self.verified = True
             self.suspected_tampered = False
@@ -200,7 +466,26 @@ class Certificate(models.Model):
                 True  # Mark as suspected tampered if verification fails
             )
         self.last_checked = timezone.now()
-        self.save()
+
+    def verify_integrity(self):
+        """
+        Verify the integrity of the uploaded file by comparing the stored hash with the current hash.
+        Only the verification fields are written, so the save() side effects are not re-run.
+        """
+        previous_state = (self.verified, self.suspected_tampered)
+        self.check_file_integrity()
+        Certificate.objects.filter(pk=self.pk).update(
+            verified=self.verified,
+            suspected_tampered=self.suspected_tampered,
+            last_checked=self.last_checked,
+        )
+        # The next expiry date only counts verified certificates
+        if (self.verified, self.suspected_tampered) != previous_state:
+            from qr_generator.snapshots import invalidate_supplier_snapshots
+            from .expiry import refresh_supplier_expiry
+
+            invalidate_supplier_snapshots(self.supplier_id)
+            refresh_supplier_expiry([self.supplier_id])
 
     def has_file_been_tampered(self):
         """
@@ -218,3 +503,38 @@ class Certificate(models.Model):
             print(
                 f"Suspected tampering detected for certificate: {self.name} by {self.supplier.get_full_name()}"
             )
+
+
+class SupplierExpiry(models.Model):
+    """
+    Earliest upcoming expiry date among each supplier's approved and verified
+    certificates. Kept up to date when certificates change, so "suppliers expiring
+    within D days" is a range scan on one row per supplier.
+    """
+
+    supplier = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="certificate_expiry",
+        verbose_name=_("Supplier"),
+    )
+    next_expiry_date = models.DateField(
+        _("Next Expiry Date"), null=True, blank=True, db_index=True
+    )
+    deactivated_for_expiry = models.BooleanField(
+        _("Deactivated for Expiry"),
+        default=False,
+        help_text=_(
+            "Whether the supplier was deactivated for holding an expired certificate. "
+            "Only such suppliers are reactivated automatically."
+        ),
+    )
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Supplier Expiry")
+        verbose_name_plural = _("Supplier Expiries")
+
+    def __str__(self):
+        return f"Next certificate expiry of supplier {self.supplier_id}: {self.next_expiry_date}"
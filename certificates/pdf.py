@@ -0,0 +1,116 @@
+import re
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import PyPDF2
+from django.conf import settings
+
+DATE_PATTERN = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+
+_executor = None
+
+# Reader of the last PDF opened by a pool process, reused across its page ranges
+_worker_reader = (None, None)
+
+
+class DateMatcher:
+    """
+    Streaming matcher fed with page texts as they are extracted. It is satisfied once
+    both the issue and the expiry date have been seen; `on_satisfied` is then called
+    once, so the validation result is known before the rest of the document is read.
+    """
+
+    def __init__(self, issue_date, expiry_date, on_satisfied=None):
+        self.complete_set = issue_date is not None and expiry_date is not None
+        self.remaining = (
+            {issue_date.isoformat(), expiry_date.isoformat()}
+            if self.complete_set
+            else set()
+        )
+        self.on_satisfied = on_satisfied
+
+    def feed(self, text):
+        if self.remaining:
+            self.remaining.difference_update(DATE_PATTERN.findall(text))
+            if self.satisfied and self.on_satisfied is not None:
+                self.on_satisfied()
+
+    @property
+    def satisfied(self):
+        return self.complete_set and not self.remaining
+
+
+def get_executor():
+    """
+    Return the process pool used for page extraction, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.CERTIFICATE_PDF_WORKERS)
+    return _executor
+
+
+def _extract_page_range(path, start, stop):
+    """
+    Extract the text of pages [start, stop) of the PDF at `path`. Runs in a pool process.
+    """
+    global _worker_reader
+    reader_path, reader = _worker_reader
+    if reader_path != path:
+        reader = PyPDF2.PdfReader(path)
+        _worker_reader = (path, reader)
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def extract_pdf_text(source, matcher=None, max_pages=None):
+    """
+    Extract the text of a PDF page by page, up to `max_pages` pages, feeding each page
+    to `matcher` in page order. Large documents are split into page ranges extracted
+    on a process pool. Returns the text and whether every page was read.
+    """
+    source.seek(0)
+    reader = PyPDF2.PdfReader(source)
+    page_count = len(reader.pages)
+    page_limit = min(page_count, max_pages) if max_pages else page_count
+    pages_per_task = settings.CERTIFICATE_PDF_PAGES_PER_TASK
+    parts = []
+
+    if settings.CERTIFICATE_PDF_WORKERS <= 1 or page_limit <= pages_per_task:
+        for index in range(page_limit):
+            page_text = reader.pages[index].extract_text() or ""
+            parts.append(page_text)
+            if matcher is not None:
+                matcher.feed(page_text)
+        return "\n".join(parts), len(parts) == page_count
+
+    page_ranges = iter(
+        (start, min(start + pages_per_task, page_limit))
+        for start in range(0, page_limit, pages_per_task)
+    )
+    executor = get_executor()
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+        source.seek(0)
+        shutil.copyfileobj(source, pdf_file)
+        pdf_file.flush()
+
+        # Keep a bounded window of ranges in flight and consume them in page order
+        pending = deque(
+            executor.submit(_extract_page_range, pdf_file.name, start, stop)
+            for start, stop in islice(page_ranges, settings.CERTIFICATE_PDF_WORKERS * 2)
+        )
+        while pending:
+            page_texts = pending.popleft().result()
+            parts.extend(page_texts)
+            if matcher is not None:
+                for page_text in page_texts:
+                    matcher.feed(page_text)
+            next_range = next(page_ranges, None)
+            if next_range is not None:
+                pending.append(
+                    executor.submit(_extract_page_range, pdf_file.name, *next_range)
+                )
+
+    return "\n".join(parts), len(parts) == page_count
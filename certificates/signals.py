@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+
+from .expiry import invalidate_supplier_expiry
+from .models import Certificate
+
+
+def connect_signals():
+    """
+    Keeps the next expiry date of a supplier in step with its certificates.
+    """
+    post_save.connect(invalidate_supplier_expiry, sender=Certificate)
+    post_delete.connect(invalidate_supplier_expiry, sender=Certificate)
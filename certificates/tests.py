@@ -1,3 +1,319 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import CustomUser
+from .cache import DiskLRUCache
+from .expiry import sync_supplier_activation
+from .extraction import extract_certificate
+from .integrity import check_certificate, sweep_integrity
+from .models import Certificate, ExtractedText, ExtractionStatus, SupplierExpiry
+from .pdf import DateMatcher, extract_pdf_text
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+)
+class CertificateTestCase(TestCase):
+    """
+    Stores certificate files on the local file system instead of the bucket.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.supplier = CustomUser.objects.create_user(
+            "supplier@example.com", "password", role="supplier"
+        )
+
+    def create_certificate(
+        self, content=b"certificate", name="certificate.txt", **fields
+    ):
+        fields.setdefault("issue_date", date(2024, 1, 1))
+        fields.setdefault("expiry_date", date(2030, 1, 1))
+        certificate = Certificate(supplier=self.supplier, name="ISO 9001", **fields)
+        certificate.file.save(name, ContentFile(content), save=False)
+        certificate.save()
+        return certificate
+
+    def complete_extraction(self, certificate, text):
+        Certificate.objects.filter(pk=certificate.pk).update(
+            extraction_status=ExtractionStatus.COMPLETED, extracted_text=text
+        )
+        return Certificate.objects.get(pk=certificate.pk)
+
+
+class CertificateSaveTests(CertificateTestCase):
+    def test_new_file_is_queued_for_extraction(self):
+        certificate = self.create_certificate()
+        self.assertEqual(certificate.extraction_status, ExtractionStatus.PENDING)
+        self.assertTrue(certificate.file_hash)
+
+    def test_matching_dates_are_recorded(self):
+        certificate = self.complete_extraction(
+            self.create_certificate(), "Issued 2024-01-01, expires 2030-01-01"
+        )
+        certificate.save()
+        self.assertTrue(certificate.dates_match)
+
+    def test_mismatched_dates_do_not_block_unrelated_saves(self):
+        certificate = self.complete_extraction(self.create_certificate(), "no dates")
+        certificate.description = "Edited by an admin"
+        certificate.save()
+
+        certificate.refresh_from_db()
+        self.assertEqual(certificate.description, "Edited by an admin")
+        self.assertIs(certificate.dates_match, False)
+        self.assertEqual(certificate.extraction_status, ExtractionStatus.COMPLETED)
+
+
+class DiskLRUCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.cache = DiskLRUCache(self.directory, max_bytes=100)
+
+    def test_round_trip(self):
+        self.cache.set("ab" * 32, "text")
+        self.assertEqual(self.cache.get("ab" * 32), "text")
+        self.assertIsNone(self.cache.get("cd" * 32))
+
+    def test_directory_is_not_walked_on_every_write(self):
+        with mock.patch("certificates.cache.os.walk", wraps=os.walk) as walk:
+            for key in range(5):
+                self.cache.set(f"{key:064x}", "x" * 10)
+        self.assertEqual(walk.call_count, 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        keys = [f"{key:064x}" for key in range(4)]
+        for key in keys[:3]:
+            self.cache.set(key, "x" * 40)
+            # Spread the modification times so the eviction order is deterministic
+            os.utime(self.cache._path(key), (0, keys.index(key)))
+        self.cache.set(keys[3], "x" * 40)
+
+        self.assertIsNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[3]))
+        self.assertLessEqual(self.cache._size, 90)
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+@override_settings(CERTIFICATE_PDF_WORKERS=1)
+class PDFExtractionTests(SimpleTestCase):
+    def test_all_pages_are_read_after_the_dates_are_found(self):
+        pages = [FakePage("Issued 2024-01-01"), FakePage("Expires 2030-01-01")]
+        pages += [FakePage(f"Page {number}") for number in range(3, 6)]
+        found = mock.Mock()
+        matcher = DateMatcher(date(2024, 1, 1), date(2030, 1, 1), found)
+
+        with mock.patch("certificates.pdf.PyPDF2.PdfReader") as reader:
+            reader.return_value.pages = pages
+            text, complete = extract_pdf_text(mock.Mock(), matcher=matcher)
+
+        self.assertTrue(complete)
+        self.assertIn("Page 5", text)
+        self.assertTrue(matcher.satisfied)
+        found.assert_called_once_with()
+
+
+class ExtractCertificateTests(CertificateTestCase):
+    def test_full_text_is_stored_and_cached(self):
+        certificate = self.create_certificate(name="certificate.pdf")
+        Certificate.objects.filter(pk=certificate.pk).update(
+            extraction_status=ExtractionStatus.PROCESSING
+        )
+
+        def extract(source, on_dates_found):
+            on_dates_found()
+            self.assertIs(Certificate.objects.get(pk=certificate.pk).dates_match, True)
+            return "2024-01-01 2030-01-01 and the rest of the document", True
+
+        with mock.patch.object(
+            Certificate, "extract_text_for_validation", side_effect=extract
+        ):
+            status = extract_certificate(certificate)
+
+        certificate.refresh_from_db()
+        self.assertEqual(status, ExtractionStatus.COMPLETED)
+        self.assertIn("rest of the document", certificate.extracted_text)
+        self.assertTrue(certificate.dates_match)
+        self.assertTrue(
+            ExtractedText.objects.filter(file_hash=certificate.file_hash).exists()
+        )
+
+    def test_unreadable_pdf_is_logged(self):
+        certificate = self.create_certificate(name="certificate.pdf")
+        with mock.patch(
+            "certificates.models.extract_pdf_text", side_effect=ValueError("EOF")
+        ), self.assertLogs("certificates.models", "ERROR") as logs:
+            result = certificate.extract_text_for_validation(mock.Mock())
+        self.assertEqual(result, ("", False))
+        self.assertIn("EOF", logs.output[0])
+
+
+@override_settings(CERTIFICATE_INTEGRITY_RETRIES=2, CERTIFICATE_INTEGRITY_RETRY_DELAY=0)
+class CheckCertificateTests(CertificateTestCase):
+    def test_matching_hash_is_verified(self):
+        certificate = self.create_certificate()
+        self.assertEqual(check_certificate(certificate), "verified")
+        self.assertTrue(certificate.verified)
+        self.assertFalse(certificate.suspected_tampered)
+
+    def test_changed_content_is_tampered(self):
+        certificate = self.create_certificate()
+        with open(certificate.file.path, "wb") as stored_file:
+            stored_file.write(b"forged")
+        self.assertEqual(check_certificate(certificate), "tampered")
+        self.assertTrue(certificate.suspected_tampered)
+
+    def test_storage_errors_are_retried_and_not_tampered(self):
+        certificate = self.create_certificate()
+        with mock.patch.object(
+            Certificate, "get_file_metadata", side_effect=OSError("timed out")
+        ) as metadata:
+            self.assertEqual(check_certificate(certificate), "error")
+        self.assertEqual(metadata.call_count, 3)
+        self.assertFalse(certificate.suspected_tampered)
+
+    def test_unreadable_certificates_are_swept_without_extra_queries(self):
+        def sweep(name):
+            with mock.patch.object(
+                Certificate, "get_file_metadata", side_effect=OSError("timed out")
+            ), CaptureQueriesContext(connection) as queries:
+                sweep_integrity(name=name, workers=1)
+            return len(queries)
+
+        self.create_certificate()
+        queries = sweep("one")
+        for _ in range(3):
+            self.create_certificate()
+        self.assertEqual(sweep("four"), queries)
+
+    def test_transient_error_then_success(self):
+        certificate = self.create_certificate()
+        metadata = certificate.get_file_metadata()
+        with mock.patch.object(
+            Certificate, "get_file_metadata", side_effect=[OSError("reset"), metadata]
+        ):
+            self.assertEqual(check_certificate(certificate), "verified")
+
+
+class SupplierExpiryTests(CertificateTestCase):
+    def next_expiry(self, supplier):
+        return (
+            SupplierExpiry.objects.filter(supplier=supplier)
+            .values_list("next_expiry_date", flat=True)
+            .first()
+        )
+
+    def create_approved_certificate(self):
+        return self.create_certificate(approval_status="approved")
+
+    def test_verification_by_integrity_check_refreshes_the_expiry(self):
+        certificate = self.create_approved_certificate()
+        self.assertIsNone(self.next_expiry(self.supplier))
+
+        certificate.verify_integrity()
+        self.assertEqual(self.next_expiry(self.supplier), date(2030, 1, 1))
+
+    def test_verification_by_sweep_refreshes_the_expiry(self):
+        self.create_approved_certificate()
+        sweep_integrity(name="test", workers=1)
+        self.assertEqual(self.next_expiry(self.supplier), date(2030, 1, 1))
+
+    def test_moving_a_certificate_refreshes_both_suppliers(self):
+        certificate = self.create_approved_certificate()
+        certificate.verify_integrity()
+        other = CustomUser.objects.create_user("other@example.com", role="supplier")
+
+        certificate = Certificate.objects.get(pk=certificate.pk)
+        certificate.supplier = other
+        certificate.save()
+        self.assertIsNone(self.next_expiry(self.supplier))
+        self.assertEqual(self.next_expiry(other), date(2030, 1, 1))
+
+
+class SupplierActivationTests(CertificateTestCase):
+    def setUp(self):
+        super().setUp()
+        CustomUser.objects.filter(pk=self.supplier.pk).update(
+            approval_status="approved", is_active=True, email_verified=True
+        )
+        self.certificate = self.create_certificate(
+            approval_status="approved", expiry_date=date(2025, 1, 1)
+        )
+
+    def is_active(self, supplier):
+        return CustomUser.objects.get(pk=supplier.pk).is_active
+
+    def renew(self):
+        Certificate.objects.filter(pk=self.certificate.pk).update(
+            expiry_date=date(2030, 1, 1)
+        )
+
+    def test_expired_supplier_is_deactivated_and_reactivated(self):
+        self.assertEqual(
+            sync_supplier_activation(date(2025, 6, 1)), ([self.supplier.pk], [])
+        )
+        self.assertFalse(self.is_active(self.supplier))
+        self.assertTrue(
+            SupplierExpiry.objects.get(supplier=self.supplier).deactivated_for_expiry
+        )
+
+        self.renew()
+        self.assertEqual(
+            sync_supplier_activation(date(2025, 6, 1)), ([], [self.supplier.pk])
+        )
+        self.assertTrue(self.is_active(self.supplier))
+        self.assertFalse(
+            SupplierExpiry.objects.get(supplier=self.supplier).deactivated_for_expiry
+        )
+
+    def test_unverified_and_manually_deactivated_suppliers_stay_inactive(self):
+        unverified = CustomUser.objects.create_user(
+            "unverified@example.com", "password", role="supplier"
+        )
+        deactivated = CustomUser.objects.create_user(
+            "deactivated@example.com", "password", role="supplier"
+        )
+        CustomUser.objects.filter(pk__in=[unverified.pk, deactivated.pk]).update(
+            approval_status="approved"
+        )
+        CustomUser.objects.filter(pk=deactivated.pk).update(email_verified=True)
+
+        self.assertEqual(sync_supplier_activation(date(2024, 6, 1)), ([], []))
+        self.assertFalse(self.is_active(unverified))
+        self.assertFalse(self.is_active(deactivated))
+
+    def test_supplier_losing_email_verification_is_not_reactivated(self):
+        sync_supplier_activation(date(2025, 6, 1))
+        CustomUser.objects.filter(pk=self.supplier.pk).update(email_verified=False)
+        self.renew()
+        self.assertEqual(sync_supplier_activation(date(2025, 6, 1)), ([], []))
+        self.assertFalse(self.is_active(self.supplier))
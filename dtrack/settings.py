@@ -76,6 +76,8 @@ INSTALLED_APPS = [
     "profiles",
     "notification_templates",
     "twilio_app",
+    "events",
+    "search",
     "storages",  # Required for S3
 ]
 
@@ -152,11 +154,110 @@ EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=True)
 EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="no-reply@zprimedev.com")
+EMAIL_MAX_SEND_RATE = env.float("EMAIL_MAX_SEND_RATE", default=14.0)  # Messages per second per process, 0 disables
+EMAIL_CONNECTION_POOL_SIZE = env.int("EMAIL_CONNECTION_POOL_SIZE", default=4)  # Parallel SMTP connections per batch
 
 # TWILIO Configuration
 TWILIO_ACCOUNT_SID = env("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = env("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = env("TWILIO_PHONE_NUMBER")
+TWILIO_HTTP_TIMEOUT = env.float("TWILIO_HTTP_TIMEOUT", default=10.0)  # Seconds
+TWILIO_SEND_CONCURRENCY = env.int("TWILIO_SEND_CONCURRENCY", default=16)  # Parallel API requests and pooled connections
+
+# Notification Dispatch
+NOTIFICATION_DISPATCH_BATCH_SIZE = env.int("NOTIFICATION_DISPATCH_BATCH_SIZE", default=100)
+NOTIFICATION_DISPATCH_POLL_INTERVAL = env.float("NOTIFICATION_DISPATCH_POLL_INTERVAL", default=5.0)
+NOTIFICATION_CLAIM_TIMEOUT = env.int("NOTIFICATION_CLAIM_TIMEOUT", default=600)  # Seconds
+NOTIFICATION_MAX_ATTEMPTS = env.int("NOTIFICATION_MAX_ATTEMPTS", default=5)
+NOTIFICATION_RETRY_BASE_DELAY = env.int("NOTIFICATION_RETRY_BASE_DELAY", default=60)  # Doubled per attempt
+NOTIFICATION_RETRY_MAX_DELAY = env.int("NOTIFICATION_RETRY_MAX_DELAY", default=3600)
+NOTIFICATION_HISTORY_BUFFER_SIZE = env.int("NOTIFICATION_HISTORY_BUFFER_SIZE", default=1000)
+NOTIFICATION_HISTORY_FLUSH_INTERVAL = env.float("NOTIFICATION_HISTORY_FLUSH_INTERVAL", default=10.0)  # Seconds
+NOTIFICATION_HISTORY_RETENTION_DAYS = env.int("NOTIFICATION_HISTORY_RETENTION_DAYS", default=90)
+NOTIFICATION_HISTORY_ARCHIVE_BATCH_SIZE = env.int("NOTIFICATION_HISTORY_ARCHIVE_BATCH_SIZE", default=5000)
+
+# Scheduled Tasks
+SCHEDULED_TASK_CHUNK_SIZE = env.int("SCHEDULED_TASK_CHUNK_SIZE", default=2000)
+SCHEDULED_TASK_INSERT_SELECT = env.bool("SCHEDULED_TASK_INSERT_SELECT", default=False)  # Queue audiences inside the database
+TASK_CONDITION_PLAN_CACHE_TIMEOUT = env.int("TASK_CONDITION_PLAN_CACHE_TIMEOUT", default=86400)
+SCHEDULER_WORKERS = env.int("SCHEDULER_WORKERS", default=4)
+SCHEDULER_MAX_SLEEP = env.float("SCHEDULER_MAX_SLEEP", default=60.0)  # Seconds
+
+# Event Outbox
+EVENT_RELAY_BATCH_SIZE = env.int("EVENT_RELAY_BATCH_SIZE", default=100)
+EVENT_RELAY_POLL_INTERVAL = env.float("EVENT_RELAY_POLL_INTERVAL", default=2.0)
+EVENT_CLAIM_TIMEOUT = env.int("EVENT_CLAIM_TIMEOUT", default=300)  # Seconds
+EVENT_MAX_ATTEMPTS = env.int("EVENT_MAX_ATTEMPTS", default=8)
+EVENT_RETRY_BASE_DELAY = env.int("EVENT_RETRY_BASE_DELAY", default=30)  # Doubled per attempt
+EVENT_RETRY_MAX_DELAY = env.int("EVENT_RETRY_MAX_DELAY", default=3600)
+
+# Support Tickets
+SUPPORT_RECIPIENT_CACHE_TIMEOUT = env.int("SUPPORT_RECIPIENT_CACHE_TIMEOUT", default=300)
+SUPPORT_SLA_POLICY_CACHE_TIMEOUT = env.int("SUPPORT_SLA_POLICY_CACHE_TIMEOUT", default=3600)
+SUPPORT_SLA_SCAN_BATCH_SIZE = env.int("SUPPORT_SLA_SCAN_BATCH_SIZE", default=500)
+SUPPORT_SLA_SCAN_INTERVAL = env.float("SUPPORT_SLA_SCAN_INTERVAL", default=60.0)  # Seconds
+SUPPORT_THREAD_PAGE_SIZE = env.int("SUPPORT_THREAD_PAGE_SIZE", default=50)
+SUPPORT_THREAD_MAX_PAGE_SIZE = env.int("SUPPORT_THREAD_MAX_PAGE_SIZE", default=200)
+
+# Full-Text Search
+SEARCH_RESULT_LIMIT = env.int("SEARCH_RESULT_LIMIT", default=20)
+SEARCH_MAX_RESULT_LIMIT = env.int("SEARCH_MAX_RESULT_LIMIT", default=100)
+SEARCH_INDEX_BATCH_SIZE = env.int("SEARCH_INDEX_BATCH_SIZE", default=500)
+
+# Certificate Processing
+CERTIFICATE_EXTRACTION_BATCH_SIZE = env.int("CERTIFICATE_EXTRACTION_BATCH_SIZE", default=20)
+CERTIFICATE_EXTRACTION_POLL_INTERVAL = env.float("CERTIFICATE_EXTRACTION_POLL_INTERVAL", default=5.0)
+CERTIFICATE_SPOOL_MAX_MEMORY = env.int("CERTIFICATE_SPOOL_MAX_MEMORY", default=10 * 1024 * 1024)
+CERTIFICATE_PDF_WORKERS = env.int("CERTIFICATE_PDF_WORKERS", default=os.cpu_count() or 1)
+CERTIFICATE_PDF_PAGES_PER_TASK = env.int("CERTIFICATE_PDF_PAGES_PER_TASK", default=8)
+CERTIFICATE_PDF_MAX_PAGES = env.int("CERTIFICATE_PDF_MAX_PAGES", default=0)  # 0 disables the cap
+CERTIFICATE_INTEGRITY_BATCH_SIZE = env.int("CERTIFICATE_INTEGRITY_BATCH_SIZE", default=200)
+CERTIFICATE_INTEGRITY_WORKERS = env.int("CERTIFICATE_INTEGRITY_WORKERS", default=8)
+CERTIFICATE_INTEGRITY_RETRIES = env.int("CERTIFICATE_INTEGRITY_RETRIES", default=2)
+CERTIFICATE_INTEGRITY_RETRY_DELAY = env.float("CERTIFICATE_INTEGRITY_RETRY_DELAY", default=1.0)
+CERTIFICATE_TEXT_CACHE_DIR = env("CERTIFICATE_TEXT_CACHE_DIR", default=None)
+CERTIFICATE_TEXT_CACHE_MAX_BYTES = env.int("CERTIFICATE_TEXT_CACHE_MAX_BYTES", default=256 * 1024 * 1024)
+
+# Certificate Expiry
+CERTIFICATE_EXPIRY_REFRESH_BATCH_SIZE = env.int("CERTIFICATE_EXPIRY_REFRESH_BATCH_SIZE", default=1000)
+
+# Cache Configuration
+QR_IMAGE_CACHE_DIR = env("QR_IMAGE_CACHE_DIR", default=None)
+CACHES = {
+    # Use a shared backend (e.g. redis://) in production so invalidation reaches all workers
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    # Rendered QR images, kept on local disk when QR_IMAGE_CACHE_DIR is set
+    "qr_codes": {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if QR_IMAGE_CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": QR_IMAGE_CACHE_DIR or "qr_codes",
+        "OPTIONS": {"MAX_ENTRIES": env.int("QR_IMAGE_CACHE_MAX_ENTRIES", default=5000)},
+    },
+}
+# Whether the default cache is shared by all processes. Entries of a process-local cache
+# cannot be invalidated by other processes, so without a shared cache scan snapshots
+# and notification rules are read from the database instead of being cached.
+CACHE_IS_SHARED = env.bool(
+    "CACHE_IS_SHARED",
+    default=CACHES["default"]["BACKEND"].rsplit(".", 1)[-1]
+    not in ("LocMemCache", "FileBasedCache", "DummyCache"),
+)
+
+# QR Code Rendering
+QR_PRERENDER_IMAGES = env.bool("QR_PRERENDER_IMAGES", default=False)  # Store PNGs in storage
+QR_IMAGE_CACHE_ALIAS = "qr_codes"
+QR_IMAGE_MAX_AGE = env.int("QR_IMAGE_MAX_AGE", default=31536000)  # 1 year
+QR_IMAGE_MIN_SIZE = 64
+QR_IMAGE_MAX_SIZE = 2048
+QR_SCAN_CACHE_ALIAS = "default"
+QR_SCAN_CACHE_TIMEOUT = env.int("QR_SCAN_CACHE_TIMEOUT", default=86400)
+QR_RENDER_BATCH_SIZE = env.int("QR_RENDER_BATCH_SIZE", default=500)
+QR_RENDER_WORKERS = env.int("QR_RENDER_WORKERS", default=os.cpu_count() or 1)
+QR_UPLOAD_CONCURRENCY = env.int("QR_UPLOAD_CONCURRENCY", default=16)
+QR_RENDER_POLL_INTERVAL = env.float("QR_RENDER_POLL_INTERVAL", default=5.0)
 
 # Security Settings
 SECURE_SSL_REDIRECT = env.bool("SECURE_SSL_REDIRECT", default=True)
@@ -10,6 +10,18 @@ urlpatterns = [
     # Set the DRF browsable API under /api/v1/
     path("api/v1/", include("rest_framework.urls")),
 
+    # Public QR code pages and images
+    path("qr/", include("qr_generator.urls")),
+
+    # Certificate API
+    path("api/v1/certificates/", include("certificates.api.urls")),
+
+    # Support API
+    path("api/v1/support/", include("support.api.urls")),
+
+    # Search API
+    path("api/v1/search/", include("search.api.urls")),
+
     # Include other API routes if needed
     # path("api/v1/some_app/", include("some_app.urls")),
 ]
@@ -0,0 +1,44 @@
+from .models import OutboxEvent
+
+# Handlers per topic; each is called with a list of events of that topic
+_handlers = {}
+
+
+def subscribe(topic, handler):
+    """
+    Register a handler for a topic. Each handler runs in its own savepoint and an
+    event is delivered to it at most once after the handler succeeded, but a relay
+    that dies in between delivers it again, so handlers must be idempotent. When a
+    batch fails, the handler is called again for each of its events on their own;
+    side effects outside the database must therefore happen only once nothing can
+    fail any more.
+    """
+    handlers = _handlers.setdefault(topic, [])
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def get_handlers(topic):
+    return list(_handlers.get(topic, []))
+
+
+def handler_name(handler):
+    """Name under which deliveries to a handler are recorded on the events."""
+    return f"{handler.__module__}.{handler.__qualname__}"
+
+
+def publish(topic, payload):
+    """
+    Append an event to the outbox. Call it inside the transaction that makes the
+    change, so the event is stored if and only if the change is committed.
+    """
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(events):
+    """
+    Append several (topic, payload) events to the outbox with one insert.
+    """
+    return OutboxEvent.objects.bulk_create(
+        [OutboxEvent(topic=topic, payload=payload) for topic, payload in events]
+    )
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from events.relay import relay_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver outbox events to their handlers. Run several instances to scale out."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EVENT_RELAY_BATCH_SIZE,
+            help="Number of events to claim per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new events instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.EVENT_RELAY_POLL_INTERVAL,
+            help="Seconds to wait between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            handled = relay_events(options["batch_size"])
+            if handled:
+                self.stdout.write(f"Relayed {handled} event(s).")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='delivered_to',
+            field=models.JSONField(blank=True, default=list, help_text='Handlers that processed the event; retries skip them.', verbose_name='Delivered To'),
+        ),
+    ]
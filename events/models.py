@@ -0,0 +1,47 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxEvent(models.Model):
+    """
+    Domain event written in the same transaction as the change it describes and
+    delivered to the registered handlers by the event relay.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", _("Pending")),
+        ("processed", _("Processed")),
+        ("failed", _("Failed")),
+    ]
+
+    topic = models.CharField(_("Topic"), max_length=100)
+    payload = models.JSONField(_("Payload"), encoder=DjangoJSONEncoder, default=dict)
+    status = models.CharField(
+        _("Status"), max_length=20, choices=STATUS_CHOICES, default="pending"
+    )
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    available_at = models.DateTimeField(_("Available At"), auto_now_add=True)
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    processed_at = models.DateTimeField(_("Processed At"), null=True, blank=True)
+    last_error = models.TextField(_("Last Error"), blank=True)
+    delivered_to = models.JSONField(
+        _("Delivered To"),
+        default=list,
+        blank=True,
+        help_text=_("Handlers that processed the event; retries skip them."),
+    )
+
+    class Meta:
+        verbose_name = _("Outbox Event")
+        verbose_name_plural = _("Outbox Events")
+        indexes = [
+            models.Index(
+                fields=["available_at"],
+                name="outboxevent_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk}"
@@ -0,0 +1,114 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .bus import get_handlers, handler_name
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def claim_events(batch_size=None):
+    """
+    Lock a batch of available events and push their availability past the claim
+    timeout. Rows locked by another relay are skipped, and the events of a relay that
+    died become available again once the claim expires.
+    """
+    batch_size = batch_size or settings.EVENT_RELAY_BATCH_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", available_at__lte=now)
+            .order_by("available_at", "pk")[:batch_size]
+        )
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            available_at=now + timedelta(seconds=settings.EVENT_CLAIM_TIMEOUT)
+        )
+    return events
+
+
+def record_failure(event, error, now):
+    event.attempts += 1
+    event.last_error = str(error)
+    if event.attempts >= settings.EVENT_MAX_ATTEMPTS:
+        event.status = "failed"
+        event.processed_at = now
+        return
+    delay = min(
+        settings.EVENT_RETRY_BASE_DELAY * 2 ** (event.attempts - 1),
+        settings.EVENT_RETRY_MAX_DELAY,
+    )
+    event.available_at = now + timedelta(seconds=delay)
+
+
+def deliver(handler, events):
+    """
+    Call a handler with events in a savepoint and record the delivery in the same
+    transaction, so a failing handler leaves neither its changes nor the delivery
+    behind. Returns the error raised by the handler, if any.
+    """
+    name = handler_name(handler)
+    try:
+        with transaction.atomic():
+            handler(events)
+            OutboxEvent.objects.bulk_update(
+                [
+                    OutboxEvent(pk=event.pk, delivered_to=[*event.delivered_to, name])
+                    for event in events
+                ],
+                ["delivered_to"],
+            )
+    except Exception as e:
+        return e
+    for event in events:
+        event.delivered_to.append(name)
+    return None
+
+
+def relay_events(batch_size=None):
+    """
+    Deliver a batch of events to their handlers, one call per handler and topic.
+    When a call fails, the handler is called again for each event on its own, and
+    only the events it still fails on are retried with exponential backoff. Handlers
+    that already processed an event are skipped on retries. Returns the number of
+    events handled.
+    """
+    events = claim_events(batch_size)
+    if not events:
+        return 0
+
+    by_topic = {}
+    for event in events:
+        by_topic.setdefault(event.topic, []).append(event)
+
+    errors = {}
+    for topic, topic_events in by_topic.items():
+        for handler in get_handlers(topic):
+            name = handler_name(handler)
+            pending = [
+                event for event in topic_events if name not in event.delivered_to
+            ]
+            if not pending or deliver(handler, pending) is None:
+                continue
+            for event in pending:
+                error = deliver(handler, [event])
+                if error is not None:
+                    logger.error(f"{name} failed on {topic} event {event.pk}: {error}")
+                    errors.setdefault(event.pk, error)
+
+    now = timezone.now()
+    for event in events:
+        if event.pk in errors:
+            record_failure(event, errors[event.pk], now)
+        else:
+            event.status = "processed"
+            event.processed_at = now
+
+    OutboxEvent.objects.bulk_update(
+        events, ["status", "attempts", "available_at", "processed_at", "last_error"]
+    )
+    return len(events)
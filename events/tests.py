@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .bus import handler_name, publish_many
+from .models import OutboxEvent
+from .relay import relay_events
+
+
+@override_settings(EVENT_MAX_ATTEMPTS=3, EVENT_RETRY_BASE_DELAY=0)
+class RelayEventsTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        handlers = {"test.topic": [self.record, self.create_user]}
+        patcher = mock.patch.dict("events.bus._handlers", handlers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        logger_patcher = mock.patch("events.relay.logger")
+        self.logger = logger_patcher.start()
+        self.addCleanup(logger_patcher.stop)
+        self.events = publish_many(
+            ("test.topic", {"email": email})
+            for email in ["a@example.com", "bad", "c@example.com"]
+        )
+
+    def record(self, events):
+        self.calls.append([event.payload["email"] for event in events])
+
+    def create_user(self, events):
+        for event in events:
+            CustomUser.objects.create_user(event.payload["email"], "password")
+            if "@" not in event.payload["email"]:
+                raise ValueError("Invalid email")
+
+    def retry(self):
+        OutboxEvent.objects.filter(status="pending").update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.calls.clear()
+        return relay_events()
+
+    def test_only_the_failing_event_is_retried(self):
+        self.assertEqual(relay_events(), 3)
+        statuses = dict(OutboxEvent.objects.values_list("payload__email", "status"))
+        self.assertEqual(
+            statuses,
+            {
+                "a@example.com": "processed",
+                "bad": "pending",
+                "c@example.com": "processed",
+            },
+        )
+        # The user of the failing event was rolled back with its savepoint
+        self.assertEqual(
+            set(CustomUser.objects.values_list("email", flat=True)),
+            {"a@example.com", "c@example.com"},
+        )
+
+        bad = OutboxEvent.objects.get(payload__email="bad")
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn("Invalid email", bad.last_error)
+        self.assertEqual(bad.delivered_to, [handler_name(self.record)])
+        self.logger.error.assert_called_once()
+
+    def test_successful_handlers_are_not_called_again(self):
+        relay_events()
+        self.assertEqual(self.retry(), 1)
+        self.assertEqual(self.calls, [])
+
+    def test_events_failing_every_attempt_are_dead_lettered(self):
+        relay_events()
+        self.retry()
+        self.retry()
+        bad = OutboxEvent.objects.get(payload__email="bad")
+        self.assertEqual(bad.status, "failed")
+        self.assertEqual(bad.attempts, 3)
+        self.assertEqual(self.retry(), 0)
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.core.validators import MinValueValidator
@@ -7,6 +7,7 @@ from qr_generator.models import (
     ProductQR,
 )  # Import QR code model for product integration
 from certificates.models import Certificate
+from events.bus import publish
 
 
 class Category(models.Model):
@@ -175,20 +176,26 @@ class Product(models.Model):
 
     def generate_product_qr(self):
         """
-        Method to create a QR code for a product.
+        Method to create a QR code for an approved product if it has none yet.
         """
-        if not self.product_qr and self.approval_status == ApprovalStatus.APPROVED:
-            product_qr = ProductQR.objects.create(product=self)
-            self.product_qr = product_qr
-            self.save()
+        if self.product_qr_id or self.approval_status != ApprovalStatus.APPROVED:
+            return False
+        self.product_qr = ProductQR.objects.create(
+            supplier_id=self.supplier_id, product_id=str(self.pk)
+        )
+        Product.objects.filter(pk=self.pk).update(product_qr=self.product_qr)
+        return True
 
     def save(self, *args, **kwargs):
         """
-        Override save method to ensure QR code generation and approval updates.
+        Override save method to handle approval updates. The QR code of an approved
+        product is created by the event relay.
         """
-        if self.approval_status == ApprovalStatus.APPROVED:
-            self.approved = True
-            self.generate_product_qr()
-        else:
-            self.approved = False
-        super().save(*args, **kwargs)
+        self.approved = self.approval_status == ApprovalStatus.APPROVED
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.approved and not self.product_qr_id:
+                publish(
+                    "product.approved",
+                    {"product_id": self.pk, "user_id": self.supplier_id},
+                )
@@ -0,0 +1,77 @@
+from django.template import TemplateSyntaxError, engines
+from django.utils import translation
+from django.utils.html import strip_tags
+
+# Fields rendered per template model, and whether HTML escaping applies to them
+TEMPLATE_FIELDS = {
+    "notification_templates.EmailTemplate": {
+        "subject": False,
+        "html_body": True,
+        "text_body": False,
+    },
+    "notification_templates.SMSTemplate": {"body": False},
+}
+
+# Compiled fields per template, tagged with the sources they were compiled from. Each
+# lookup compares against the sources of the template instance passed in, which the
+# caller loaded from the database, so no cross-process invalidation is needed: a
+# template edited in another process, even through .update(), is recompiled here.
+_compiled = {}
+
+
+def compile_source(source, autoescape):
+    if not autoescape:
+        source = "{% autoescape off %}" + source + "{% endautoescape %}"
+    return engines["django"].from_string(source)
+
+
+def get_compiled(template):
+    """
+    Return the compiled fields of a template. Each template is compiled once and
+    recompiled only when the source of one of its fields changes.
+    """
+    fields = TEMPLATE_FIELDS[template._meta.label]
+    key = (template._meta.label, template.pk)
+    sources = tuple(getattr(template, field) for field in fields)
+    cached = _compiled.get(key)
+    if cached is not None and cached[0] == sources:
+        return cached[1]
+    try:
+        compiled = {
+            field: compile_source(source, autoescape)
+            for (field, autoescape), source in zip(fields.items(), sources)
+        }
+    except TemplateSyntaxError as e:
+        raise ValueError(f"Template {template} could not be compiled: {e}")
+    _compiled[key] = (sources, compiled)
+    return compiled
+
+
+def render_templates(template, contexts):
+    """
+    Render a template for many recipients. `contexts` holds a (language, context) pair
+    per recipient; recipients are rendered grouped by language so each language is
+    activated once. Returns a dict of the rendered fields per recipient, in order.
+    Emails without a text body get one derived from the HTML body.
+    """
+    compiled = get_compiled(template)
+    results = [None] * len(contexts)
+    by_language = {}
+    for position, (language, context) in enumerate(contexts):
+        by_language.setdefault(language, []).append(position)
+
+    for language, positions in by_language.items():
+        with translation.override(language):
+            for position in positions:
+                context = contexts[position][1]
+                results[position] = {
+                    field: field_template.render(context)
+                    for field, field_template in compiled.items()
+                }
+
+    if "html_body" in compiled:
+        for parts in results:
+            parts["subject"] = " ".join(parts["subject"].split())
+            if not parts["text_body"].strip():
+                parts["text_body"] = strip_tags(parts["html_body"]).strip()
+    return results
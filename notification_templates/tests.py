@@ -1,3 +1,45 @@
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import EmailTemplate, SMSTemplate
+from .rendering import get_compiled, render_templates
+
+
+class RenderTemplatesTests(TestCase):
+    def setUp(self):
+        self.template = EmailTemplate.objects.create(
+            name="Expiry",
+            subject="Hello {{ name }}",
+            html_body="<p>{{ name }} & co</p>",
+        )
+
+    def test_fields_are_rendered_per_recipient(self):
+        results = render_templates(
+            self.template, [("en", {"name": "Ada"}), ("ar", {"name": "<b>"})]
+        )
+        self.assertEqual(results[0]["subject"], "Hello Ada")
+        self.assertEqual(results[0]["text_body"], "Ada & co")
+        self.assertEqual(results[1]["html_body"], "<p>&lt;b&gt; & co</p>")
+        self.assertEqual(results[1]["subject"], "Hello <b>")
+
+    def test_templates_are_compiled_once(self):
+        get_compiled(self.template)
+        with mock.patch(
+            "notification_templates.rendering.compile_source"
+        ) as compile_source:
+            get_compiled(EmailTemplate.objects.get(pk=self.template.pk))
+        compile_source.assert_not_called()
+
+    def test_template_changed_elsewhere_is_recompiled(self):
+        sms = SMSTemplate.objects.create(name="Expiry", body="Hi {{ name }}")
+        self.assertEqual(
+            render_templates(sms, [("en", {"name": "Ada"})])[0]["body"], "Hi Ada"
+        )
+
+        # An edit made without save(), so no signal tells this process about it
+        SMSTemplate.objects.filter(pk=sms.pk).update(body="Bye {{ name }}")
+        sms = SMSTemplate.objects.get(pk=sms.pk)
+        self.assertEqual(
+            render_templates(sms, [("en", {"name": "Ada"})])[0]["body"], "Bye Ada"
+        )
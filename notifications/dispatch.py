@@ -0,0 +1,187 @@
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notification_templates.rendering import render_templates
+from twilio_app.client import make_voice_calls, send_sms_batch
+from .history import get_history_buffer
+from .mailer import send_email_messages
+from .models import Notification, NotificationHistory, preferred_language
+from .rules import attach_rules
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_FIELDS = [
+    "status",
+    "sent_at",
+    "message_id",
+    "additional_data",
+    "next_attempt_at",
+]
+
+
+def claim_due_notifications(batch_size=None):
+    """
+    Lock a batch of due notifications and mark them as processing. Rows locked by
+    another worker are skipped, so any number of workers can drain the queue. The claim
+    expires after NOTIFICATION_CLAIM_TIMEOUT seconds, after which the notifications of
+    a worker that died are picked up again.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_DISPATCH_BATCH_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        notification_ids = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="pending", next_attempt_at__isnull=True)
+                | Q(status__in=["pending", "processing"], next_attempt_at__lte=now)
+            )
+            .order_by("created_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        Notification.objects.filter(pk__in=notification_ids).update(
+            status="processing",
+            next_attempt_at=now
+            + timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT),
+        )
+    return notification_ids
+
+
+def send_emails(messages):
+    return [
+        (message.extra_headers["Message-ID"], error)
+        for message, error in zip(messages, send_email_messages(messages))
+    ]
+
+
+# Per method: how a notification's payload is built and how a batch of payloads is sent
+CHANNELS = {
+    "email": (Notification.build_email_message, send_emails),
+    "sms": (Notification.get_sms_params, send_sms_batch),
+    "voice": (Notification.get_voice_params, make_voice_calls),
+}
+
+
+# The rule template rendered for each method
+TEMPLATE_ATTRIBUTES = {"email": "email_template", "sms": "sms_template"}
+
+
+def render_notifications(notifications, method):
+    """
+    Render the rule templates of a batch of notifications. Each template is compiled
+    once and rendered for all of its recipients together. Returns the rendered parts
+    (or the rendering error) per notification, or None where there is nothing to render.
+    """
+    results = [None] * len(notifications)
+    attribute = TEMPLATE_ATTRIBUTES.get(method)
+    if attribute is None:
+        return results
+
+    groups = {}
+    for position, notification in enumerate(notifications):
+        template = getattr(notification.rule, attribute, None)
+        if template is not None:
+            groups.setdefault(template.pk, (template, []))[1].append(position)
+
+    for template, positions in groups.values():
+        contexts = [
+            (
+                preferred_language(notifications[position].user),
+                notifications[position].get_template_context(),
+            )
+            for position in positions
+        ]
+        try:
+            rendered = render_templates(template, contexts)
+        except Exception as e:
+            rendered = [e] * len(positions)
+        for position, parts in zip(positions, rendered):
+            results[position] = parts
+    return results
+
+
+def deliver_batch(notifications, method, build, send):
+    """
+    Render, build the payload of each notification and send them as one batch.
+    Returns a (message ID, error) pair per notification.
+    """
+    results = [None] * len(notifications)
+    payloads = []
+    positions = []
+    rendered = render_notifications(notifications, method)
+    for position, (notification, parts) in enumerate(zip(notifications, rendered)):
+        if isinstance(parts, Exception):
+            results[position] = (None, parts)
+            continue
+        try:
+            payloads.append(build(notification, parts))
+        except Exception as e:
+            results[position] = (None, e)
+        else:
+            positions.append(position)
+
+    for position, result in zip(positions, send(payloads)):
+        results[position] = result
+    return results
+
+
+def dispatch_notifications(notification_ids):
+    """
+    Send the given claimed notifications and write the outcomes with one bulk update.
+    History rows go to the process's history buffer, which inserts them in bulk.
+    Emails go out over pooled SMTP connections and SMS and voice calls are fanned out
+    over the shared Twilio client. Rules, templates and methods come from the process
+    cache rather than the database.
+    Returns the count per status.
+    """
+    notifications = list(
+        Notification.objects.filter(pk__in=notification_ids, status="processing")
+        .select_related("user__notification_preferences")
+        .order_by("created_at")
+    )
+    attach_rules(notifications)
+
+    by_method = {}
+    for notification in notifications:
+        method = notification.method.method if notification.method else None
+        by_method.setdefault(method, []).append(notification)
+
+    outcomes = []
+    for method, batch in by_method.items():
+        if method in CHANNELS:
+            results = deliver_batch(batch, method, *CHANNELS[method])
+        else:
+            error = ValueError(f"Unsupported notification method {method}.")
+            results = [(None, error)] * len(batch)
+        outcomes.extend(zip(batch, results))
+
+    history = []
+    for notification, (message_id, error) in outcomes:
+        if error is None:
+            notification.record_success(message_id)
+        else:
+            logger.warning(f"Sending notification {notification.pk} failed: {error}")
+            notification.record_failure(error)
+        if notification.status in ("sent", "failed"):
+            history.append(NotificationHistory(**notification.get_history_fields()))
+
+    Notification.objects.bulk_update(notifications, DISPATCH_FIELDS)
+    get_history_buffer().add(history)
+    return Counter(notification.status for notification in notifications)
+
+
+def run_due_notifications(batch_size=None):
+    """
+    Claim and send one batch of due notifications. Returns the count per status.
+    Buffered history rows are written out whenever the queue is empty.
+    """
+    notification_ids = claim_due_notifications(batch_size)
+    if not notification_ids:
+        get_history_buffer().flush()
+        return Counter()
+    return dispatch_notifications(notification_ids)
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedNotificationHistory, NotificationHistory
+
+# Columns copied as they are from NotificationHistory into the archive
+ARCHIVE_COLUMNS = [
+    "id",
+    "user_id",
+    "rule_id",
+    "method_id",
+    "status",
+    "message_id",
+    "sent_at",
+    "additional_data",
+]
+
+_buffer = None
+
+
+class HistoryBuffer:
+    """
+    Collects history rows and writes them with one bulk insert once `size` rows are
+    waiting or `max_age` seconds have passed since the oldest one was added.
+    """
+
+    def __init__(self, size, max_age):
+        self.size = size
+        self.max_age = max_age
+        self._rows = []
+        self._first_added = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, rows):
+        with self._lock:
+            if rows and not self._rows:
+                self._first_added = time.monotonic()
+            self._rows.extend(rows)
+            due = len(self._rows) >= self.size or (
+                self._rows and time.monotonic() - self._first_added >= self.max_age
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if rows:
+            NotificationHistory.objects.bulk_create(rows, batch_size=self.size or None)
+        return len(rows)
+
+
+def get_history_buffer():
+    """
+    Return the history buffer of this process, creating it on first use.
+    """
+    global _buffer
+    if _buffer is None:
+        _buffer = HistoryBuffer(
+            settings.NOTIFICATION_HISTORY_BUFFER_SIZE,
+            settings.NOTIFICATION_HISTORY_FLUSH_INTERVAL,
+        )
+    return _buffer
+
+
+def archive_history(before, batch_size=None):
+    """
+    Move history rows sent before `before` into the archive table, oldest first, with
+    one INSERT ... SELECT and one DELETE per batch. Returns the number of rows moved.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_HISTORY_ARCHIVE_BATCH_SIZE
+    history_table = NotificationHistory._meta.db_table
+    archive_table = ArchivedNotificationHistory._meta.db_table
+    columns = ", ".join(ARCHIVE_COLUMNS)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            history_ids = list(
+                NotificationHistory.objects.filter(sent_at__lt=before)
+                .order_by("sent_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not history_ids:
+                break
+            placeholders = ", ".join(["%s"] * len(history_ids))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {archive_table} ({columns}, archived_at) "
+                    f"SELECT {columns}, %s FROM {history_table} WHERE id IN ({placeholders})",
+                    [timezone.now(), *history_ids],
+                )
+            NotificationHistory.objects.filter(pk__in=history_ids).delete()
+        moved += len(history_ids)
+    return moved
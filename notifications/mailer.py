@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Spaces out calls across threads so that at most `rate` happen per second.
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    """
+    Return the rate limiter shared by all email sends of this process.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(settings.EMAIL_MAX_SEND_RATE)
+    return _rate_limiter
+
+
+def send_over_connection(messages):
+    """
+    Send messages one by one over a single SMTP connection and return one error (or
+    None) per message. A connection that fails mid-batch is reopened for the next message.
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"Could not open email connection: {e}")
+        return [e] * len(messages)
+
+    rate_limiter = get_rate_limiter()
+    errors = []
+    reopen = False
+    try:
+        for message in messages:
+            rate_limiter.wait()
+            try:
+                if reopen:
+                    connection.open()
+                    reopen = False
+                connection.send_messages([message])
+            except Exception as e:
+                errors.append(e)
+                connection.close()
+                reopen = True
+            else:
+                errors.append(None)
+    finally:
+        connection.close()
+    return errors
+
+
+def send_email_messages(messages, connections=None):
+    """
+    Send a batch of email messages over up to EMAIL_CONNECTION_POOL_SIZE connections in
+    parallel, each reused for its share of the batch, while honouring EMAIL_MAX_SEND_RATE.
+    Returns one error (or None) per message, in order.
+    """
+    if not messages:
+        return []
+    connections = min(connections or settings.EMAIL_CONNECTION_POOL_SIZE, len(messages))
+    errors = [None] * len(messages)
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        chunk_errors = executor.map(
+            send_over_connection,
+            [messages[offset::connections] for offset in range(connections)],
+        )
+        for offset, chunk in enumerate(chunk_errors):
+            errors[offset::connections] = chunk
+    return errors
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.history import archive_history
+
+
+class Command(BaseCommand):
+    help = "Move notification history older than the retention period into the archive. Run daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.NOTIFICATION_HISTORY_RETENTION_DAYS,
+            help="Keep history sent within this many days in the live table.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_HISTORY_ARCHIVE_BATCH_SIZE,
+            help="Number of rows moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        moved = archive_history(before, options["batch_size"])
+        self.stdout.write(f"Archived {moved} notification history row(s).")
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.dispatch import run_due_notifications
+from notifications.history import get_history_buffer
+
+
+class Command(BaseCommand):
+    help = "Send pending notifications. Run several instances to scale out."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_DISPATCH_BATCH_SIZE,
+            help="Number of notifications to claim per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for due notifications instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.NOTIFICATION_DISPATCH_POLL_INTERVAL,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                counts = run_due_notifications(options["batch_size"])
+                if counts:
+                    summary = ", ".join(
+                        f"{count} {status}" for status, count in sorted(counts.items())
+                    )
+                    self.stdout.write(f"Dispatched notifications: {summary}.")
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        finally:
+            get_history_buffer().flush()
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_dispatch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notificationhistory',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='sent', max_length=20, verbose_name='Status'),
+        ),
+    ]
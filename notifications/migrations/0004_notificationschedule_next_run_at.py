@@ -0,0 +1,50 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:53
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def set_next_run_at(apps, schema_editor):
+    NotificationSchedule = apps.get_model("notifications", "NotificationSchedule")
+    for schedule in NotificationSchedule.objects.all():
+        if schedule.last_sent_at is None:
+            schedule.next_run_at = schedule.schedule_time
+        elif schedule.is_recurring and schedule.recurrence_interval:
+            interval = timedelta(days=schedule.recurrence_interval)
+            schedule.next_run_at = schedule.schedule_time
+            if schedule.next_run_at <= schedule.last_sent_at:
+                schedule.next_run_at += (
+                    (schedule.last_sent_at - schedule.schedule_time) // interval + 1
+                ) * interval
+        else:
+            continue
+        schedule.save(update_fields=["next_run_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notificationhistory_pending"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationschedule",
+            name="next_run_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the scheduler fires next; empty once a one-off schedule was sent.",
+                null=True,
+                verbose_name="Next Run At",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notificationschedule",
+            index=models.Index(
+                fields=["next_run_at"], name="notificatio_next_ru_59950e_idx"
+            ),
+        ),
+        migrations.RunPython(set_next_run_at, migrations.RunPython.noop),
+    ]
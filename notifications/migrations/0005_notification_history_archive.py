@@ -0,0 +1,93 @@
+# Generated by Django 5.1.2 on 2026-10-17 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_notificationschedule_next_run_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedNotificationHistory",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("status", models.CharField(max_length=20, verbose_name="Status")),
+                (
+                    "message_id",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Message ID"
+                    ),
+                ),
+                ("sent_at", models.DateTimeField(verbose_name="Sent At")),
+                (
+                    "additional_data",
+                    models.JSONField(
+                        blank=True, null=True, verbose_name="Additional Data"
+                    ),
+                ),
+                ("archived_at", models.DateTimeField(verbose_name="Archived At")),
+            ],
+            options={
+                "verbose_name": "Archived Notification History",
+                "verbose_name_plural": "Archived Notification Histories",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="notificationhistory",
+            name="notificatio_user_id_93d024_idx",
+        ),
+        migrations.AddIndex(
+            model_name="notificationhistory",
+            index=models.Index(
+                fields=["user", "sent_at"], name="notifhistory_user_sent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notificationhistory",
+            index=models.Index(fields=["sent_at"], name="notifhistory_sent_at_idx"),
+        ),
+        migrations.AddField(
+            model_name="archivednotificationhistory",
+            name="method",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="notifications.notificationmethod",
+                verbose_name="Notification Method",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivednotificationhistory",
+            name="rule",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="notifications.notificationrule",
+                verbose_name="Notification Rule",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivednotificationhistory",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_notification_history",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="User",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivednotificationhistory",
+            index=models.Index(
+                fields=["user", "sent_at"], name="notifarchive_user_sent_idx"
+            ),
+        ),
+    ]
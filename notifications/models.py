@@ -1,19 +1,49 @@
+from datetime import timedelta
+from email.utils import make_msgid, parseaddr
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 
 import accounts.models
 from notification_templates.models import EmailTemplate, SMSTemplate, VoiceTemplate
-from twilio.rest import Client
-
-# Twilio setup
-TWILIO_ACCOUNT_SID = settings.TWILIO_ACCOUNT_SID
-TWILIO_AUTH_TOKEN = settings.TWILIO_AUTH_TOKEN
-TWILIO_PHONE_NUMBER = settings.TWILIO_PHONE_NUMBER
-
-client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+from notification_templates.rendering import render_templates
+from twilio.base.exceptions import TwilioRestException
+from twilio_app.client import get_twilio_client
+
+
+def is_retryable(error):
+    """
+    Return whether a failed delivery may succeed on a later attempt. Missing templates
+    or phone numbers and requests rejected by Twilio (other than rate limiting) are final.
+    """
+    if isinstance(error, ValueError):
+        return False
+    if isinstance(error, TwilioRestException):
+        return error.status >= 500 or error.status == 429
+    return True
+
+
+def preferred_language(user):
+    """
+    Return the language the user reads notifications in, or the site default.
+    """
+    try:
+        return user.notification_preferences.preferred_language
+    except UserNotificationPreferences.DoesNotExist:
+        return settings.LANGUAGE_CODE
+
+
+def next_occurrence(start, interval, after):
+    """
+    Return the first time `start + k * interval` (k >= 0) that lies after `after`.
+    Occurrences missed while nothing was running are skipped rather than replayed.
+    """
+    if start > after:
+        return start
+    return start + ((after - start) // interval + 1) * interval
 
 
 class NotificationMethod(models.Model):
@@ -123,7 +153,11 @@ class NotificationHistory(models.Model):
     status = models.CharField(
         _("Status"),
         max_length=20,
-        choices=[("sent", _("Sent")), ("failed", _("Failed"))],
+        choices=[
+            ("pending", _("Pending")),
+            ("sent", _("Sent")),
+            ("failed", _("Failed")),
+        ],
         default="sent",
     )
     message_id = models.CharField(_("Message ID"), max_length=100, blank=True)
@@ -134,7 +168,8 @@ class NotificationHistory(models.Model):
         verbose_name = _("Notification History")
         verbose_name_plural = _("Notification Histories")
         indexes = [
-            models.Index(fields=["user"]),
+            models.Index(fields=["user", "sent_at"], name="notifhistory_user_sent_idx"),
+            models.Index(fields=["sent_at"], name="notifhistory_sent_at_idx"),
             models.Index(fields=["method"]),
             models.Index(fields=["status"]),
         ]
@@ -143,6 +178,50 @@ class NotificationHistory(models.Model):
         return f"Notification to {self.user.get_full_name() if hasattr(self.user, 'get_full_name') else self.user}"
 
 
+class ArchivedNotificationHistory(models.Model):
+    """
+    History rows moved out of NotificationHistory once they are older than the
+    retention period, keeping their original IDs.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        accounts.models.CustomUser,
+        on_delete=models.CASCADE,
+        related_name="archived_notification_history",
+        verbose_name=_("User"),
+    )
+    rule = models.ForeignKey(
+        NotificationRule,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name=_("Notification Rule"),
+    )
+    method = models.ForeignKey(
+        NotificationMethod,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name=_("Notification Method"),
+    )
+    status = models.CharField(_("Status"), max_length=20)
+    message_id = models.CharField(_("Message ID"), max_length=100, blank=True)
+    sent_at = models.DateTimeField(_("Sent At"))
+    additional_data = models.JSONField(_("Additional Data"), null=True, blank=True)
+    archived_at = models.DateTimeField(_("Archived At"))
+
+    class Meta:
+        verbose_name = _("Archived Notification History")
+        verbose_name_plural = _("Archived Notification Histories")
+        indexes = [
+            models.Index(fields=["user", "sent_at"], name="notifarchive_user_sent_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived notification to {self.user}"
+
+
 class UserNotificationPreferences(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -196,10 +275,19 @@ class Notification(models.Model):
             ("sent", _("Sent")),
             ("failed", _("Failed")),
             ("pending", _("Pending")),
+            ("processing", _("Processing")),
         ],
         default="pending",
     )
     sent_at = models.DateTimeField(_("Sent At"), null=True, blank=True)
+    next_attempt_at = models.DateTimeField(
+        _("Next Attempt At"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Earliest time a pending notification is sent, or when a claim by a dispatch worker expires."
+        ),
+    )
     message_id = models.CharField(_("Message ID"), max_length=100, blank=True)
     additional_data = models.JSONField(_("Additional Data"), null=True, blank=True)
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
@@ -210,96 +298,174 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=["user"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["status", "next_attempt_at"]),
         ]
 
     def __str__(self):
         return f"Notification to {self.user.get_full_name() if hasattr(self.user, 'get_full_name') else self.user}"
 
     def send_notification(self):
+        """
+        Send the notification right away and record the outcome. Failures that can be
+        retried leave the notification pending for the dispatch workers.
+        """
+        try:
+            message_id = self.deliver()
+        except Exception as e:
+            self.record_failure(e)
+        else:
+            self.record_success(message_id)
+        self.save()
+        if self.status in ("sent", "failed"):
+            NotificationHistory.objects.create(**self.get_history_fields())
+
+    def deliver(self):
+        """
+        Send the notification through its method and return the provider message ID.
+        Raises ValueError when the notification cannot be delivered at all.
+        """
+        if self.method is None:
+            raise ValueError("Notification has no delivery method.")
         if self.method.method == "email":
-            self.send_email_notification()
-        elif self.method.method == "sms":
-            self.send_sms_notification()
-        elif self.method.method == "voice":
-            self.send_voice_notification()
+            return self.deliver_email()
+        if self.method.method == "sms":
+            return self.deliver_sms()
+        if self.method.method == "voice":
+            return self.deliver_voice()
+        raise ValueError(f"Unknown notification method {self.method.method}.")
+
+    def get_template_context(self):
+        return {"user": self.user, "notification": self}
+
+    def render_template(self, template):
+        """
+        Render a template of the rule for this notification's user, in their language.
+        """
+        return render_templates(
+            template, [(preferred_language(self.user), self.get_template_context())]
+        )[0]
 
-    def send_email_notification(self):
+    def build_email_message(self, parts=None):
+        """
+        Build the email for this notification from the rule's template, with a text body
+        and an HTML alternative. `parts` holds the rendered template when it was rendered
+        for a whole batch. The generated Message-ID is kept as the notification's
+        message ID.
+        """
+        if not self.rule or not self.rule.email_template:
+            raise ValueError("Notification rule has no email template.")
+        parts = parts or self.render_template(self.rule.email_template)
+        self.message_id = make_msgid(
+            domain=parseaddr(settings.DEFAULT_FROM_EMAIL)[1].rpartition("@")[2]
+        )
+        message = EmailMultiAlternatives(
+            parts["subject"],
+            parts["text_body"],
+            settings.DEFAULT_FROM_EMAIL,
+            [self.user.email],
+            headers={"Message-ID": self.message_id},
+        )
+        message.attach_alternative(parts["html_body"], "text/html")
+        return message
+
+    def deliver_email(self):
         """
         Send email using the selected template and user preferences.
         """
-        if self.rule.email_template:
-            subject = self.rule.email_template.subject
-            body = self.rule.email_template.html_body
-            try:
-                send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [self.user.email])
-                self.status = "sent"
-                NotificationHistory.objects.create(
-                    user=self.user,
-                    rule=self.rule,
-                    method=self.method,
-                    status="sent",
-                    message_id=self.message_id,
-                )
-            except Exception as e:
-                self.status = "failed"
-                self.additional_data = {"error": str(e)}
-            finally:
-                self.sent_at = timezone.now()
-                self.save()
-
-    def send_sms_notification(self):
+        self.build_email_message().send()
+        return self.message_id
+
+    def get_sms_params(self, parts=None):
+        """
+        Return the Twilio message parameters for this notification, with the rule's
+        template rendered for the user unless `parts` already holds it.
+        """
+        if not self.rule or not self.rule.sms_template:
+            raise ValueError("Notification rule has no SMS template.")
+        if not self.user.phone_number:
+            raise ValueError("User has no phone number.")
+        parts = parts or self.render_template(self.rule.sms_template)
+        return {"to": self.user.phone_number, "body": parts["body"]}
+
+    def get_voice_params(self, parts=None):
+        """
+        Return the Twilio call parameters playing the recorded message of this notification.
+        """
+        if not self.rule or not self.rule.voice_template:
+            raise ValueError("Notification rule has no voice template.")
+        if not self.user.phone_number:
+            raise ValueError("User has no phone number.")
+        return {
+            "to": self.user.phone_number,
+            "twiml": f"<Response><Play>{self.rule.voice_template.message_file.url}</Play></Response>",
+        }
+
+    def deliver_sms(self):
         """
         Send SMS using Twilio and the selected template and user preferences.
         """
-        if self.rule.sms_template and self.user.phone_number:
-            try:
-                message = client.messages.create(
-                    body=self.rule.sms_template.body,
-                    from_=TWILIO_PHONE_NUMBER,
-                    to=self.user.phone_number,
-                )
-                self.message_id = message.sid
-                self.status = "sent"
-                NotificationHistory.objects.create(
-                    user=self.user,
-                    rule=self.rule,
-                    method=self.method,
-                    status="sent",
-                    message_id=message.sid,
-                )
-            except Exception as e:
-                self.status = "failed"
-                self.additional_data = {"error": str(e)}
-            finally:
-                self.sent_at = timezone.now()
-                self.save()
-
-    def send_voice_notification(self):
+        message = get_twilio_client().messages.create(
+            from_=settings.TWILIO_PHONE_NUMBER, **self.get_sms_params()
+        )
+        return message.sid
+
+    def deliver_voice(self):
         """
         Make a voice call using Twilio and play the recorded message.
         """
-        if self.rule.voice_template and self.user.phone_number:
-            try:
-                call = client.calls.create(
-                    twiml=f"<Response><Play>{self.rule.voice_template.message_file.url}</Play></Response>",
-                    from_=TWILIO_PHONE_NUMBER,
-                    to=self.user.phone_number,
-                )
-                self.message_id = call.sid
-                self.status = "sent"
-                NotificationHistory.objects.create(
-                    user=self.user,
-                    rule=self.rule,
-                    method=self.method,
-                    status="sent",
-                    message_id=call.sid,
-                )
-            except Exception as e:
-                self.status = "failed"
-                self.additional_data = {"error": str(e)}
-            finally:
-                self.sent_at = timezone.now()
-                self.save()
+        call = get_twilio_client().calls.create(
+            from_=settings.TWILIO_PHONE_NUMBER, **self.get_voice_params()
+        )
+        return call.sid
+
+    def record_success(self, message_id):
+        self.status = "sent"
+        self.message_id = message_id or ""
+        self.sent_at = timezone.now()
+        self.next_attempt_at = None
+
+    def record_failure(self, error):
+        """
+        Record a failed delivery attempt in `additional_data`. Retryable errors are
+        rescheduled with exponential backoff until NOTIFICATION_MAX_ATTEMPTS is reached.
+        """
+        now = timezone.now()
+        data = dict(self.additional_data or {})
+        attempts = data.get("attempts", 0) + 1
+        data["attempts"] = attempts
+        data["error"] = str(error)
+        data["errors"] = data.get("errors", []) + [
+            {"attempt": attempts, "at": now.isoformat(), "error": str(error)}
+        ]
+
+        if is_retryable(error) and attempts < settings.NOTIFICATION_MAX_ATTEMPTS:
+            delay = min(
+                settings.NOTIFICATION_RETRY_BASE_DELAY * 2 ** (attempts - 1),
+                settings.NOTIFICATION_RETRY_MAX_DELAY,
+            )
+            self.status = "pending"
+            self.next_attempt_at = now + timedelta(seconds=delay)
+            data["next_attempt_at"] = self.next_attempt_at.isoformat()
+        else:
+            self.status = "failed"
+            self.sent_at = now
+            self.next_attempt_at = None
+            data.pop("next_attempt_at", None)
+        self.additional_data = data
+
+    def get_history_fields(self):
+        return {
+            "user_id": self.user_id,
+            "rule_id": self.rule_id,
+            "method_id": self.method_id,
+            "status": self.status,
+            "message_id": self.message_id,
+            "additional_data": (
+                {"error": self.additional_data["error"]}
+                if self.status == "failed" and self.additional_data
+                else None
+            ),
+        }
 
 
 class NotificationSchedule(models.Model):
@@ -319,10 +485,40 @@ class NotificationSchedule(models.Model):
         help_text=_("Interval in days for recurring notifications"),
     )
     last_sent_at = models.DateTimeField(_("Last Sent At"), null=True, blank=True)
+    next_run_at = models.DateTimeField(
+        _("Next Run At"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "When the scheduler fires next; empty once a one-off schedule was sent."
+        ),
+    )
 
     class Meta:
         verbose_name = _("Notification Schedule")
         verbose_name_plural = _("Notification Schedules")
+        indexes = [
+            models.Index(fields=["next_run_at"]),
+        ]
 
     def __str__(self):
         return f"Schedule for {self.rule.name} at {self.schedule_time}"
+
+    def get_next_run_at(self):
+        """
+        Return when the schedule fires next given when it was last sent, or None if it is done.
+        """
+        if self.last_sent_at is None:
+            return self.schedule_time
+        if not self.is_recurring or not self.recurrence_interval:
+            return None
+        return next_occurrence(
+            self.schedule_time,
+            timedelta(days=self.recurrence_interval),
+            self.last_sent_at,
+        )
+
+    def save(self, *args, **kwargs):
+        self.next_run_at = self.get_next_run_at()
+        super().save(*args, **kwargs)
@@ -0,0 +1,101 @@
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import NotificationMethod, NotificationRule
+
+# Shared version of the rule cache; changing it makes every process drop its copy
+RULES_VERSION_KEY = "notification-rules-version"
+
+_rules = {}
+_methods = {}
+_cached_version = None
+_lock = threading.Lock()
+
+
+def current_version():
+    version = cache.get(RULES_VERSION_KEY)
+    if version is None:
+        cache.add(RULES_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(RULES_VERSION_KEY)
+    return version
+
+
+def check_version():
+    """
+    Drop the rules and methods cached in this process if the shared version changed.
+    Returns whether the process cache may be used at all: with a cache that is not
+    shared between processes, a changed version would never reach the notifier or
+    scheduler processes, so rules are then loaded for every batch instead.
+    """
+    global _cached_version
+    if not settings.CACHE_IS_SHARED:
+        return False
+    version = current_version()
+    with _lock:
+        if version != _cached_version:
+            _rules.clear()
+            _methods.clear()
+            _cached_version = version
+    return True
+
+
+def load_rules(rule_ids):
+    return {
+        rule.pk: rule
+        for rule in NotificationRule.objects.filter(pk__in=rule_ids)
+        .select_related("email_template", "sms_template", "voice_template")
+        .prefetch_related("notification_methods")
+    }
+
+
+def get_rules(rule_ids):
+    """
+    Return the given notification rules by ID with their templates and methods loaded.
+    Rules are kept in process memory until a rule, template or method changes.
+    """
+    rule_ids = {rule_id for rule_id in rule_ids if rule_id is not None}
+    if not check_version():
+        return load_rules(rule_ids)
+    with _lock:
+        rules = {rule_id: _rules[rule_id] for rule_id in rule_ids if rule_id in _rules}
+    missing = rule_ids - rules.keys()
+    if missing:
+        loaded = load_rules(missing)
+        with _lock:
+            _rules.update(loaded)
+        rules.update(loaded)
+    return rules
+
+
+def get_methods():
+    """
+    Return all notification methods by ID, kept in process memory like the rules.
+    """
+    if not check_version():
+        return {method.pk: method for method in NotificationMethod.objects.all()}
+    with _lock:
+        if _methods:
+            return dict(_methods)
+    methods = {method.pk: method for method in NotificationMethod.objects.all()}
+    with _lock:
+        _methods.update(methods)
+    return methods
+
+
+def attach_rules(notifications):
+    """
+    Set the cached rule and method on each notification, so sending them does not load
+    rules, templates or methods from the database.
+    """
+    rules = get_rules(notification.rule_id for notification in notifications)
+    methods = get_methods()
+    for notification in notifications:
+        notification.rule = rules.get(notification.rule_id)
+        notification.method = methods.get(notification.method_id)
+
+
+def invalidate_rules(sender=None, **kwargs):
+    cache.set(RULES_VERSION_KEY, uuid.uuid4().hex, None)
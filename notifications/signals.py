@@ -0,0 +1,23 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from notification_templates.models import EmailTemplate, SMSTemplate, VoiceTemplate
+from .models import NotificationMethod, NotificationRule
+from .rules import invalidate_rules
+
+
+def connect_signals():
+    """
+    Drops the cached notification rules whenever a rule, template or method changes.
+    """
+    for model in (
+        NotificationRule,
+        NotificationMethod,
+        EmailTemplate,
+        SMSTemplate,
+        VoiceTemplate,
+    ):
+        post_save.connect(invalidate_rules, sender=model)
+        post_delete.connect(invalidate_rules, sender=model)
+    m2m_changed.connect(
+        invalidate_rules, sender=NotificationRule.notification_methods.through
+    )
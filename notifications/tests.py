@@ -1,3 +1,156 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from . import mailer, rules
+from .dispatch import claim_due_notifications
+from .history import HistoryBuffer
+from .mailer import RateLimiter, send_email_messages
+from .models import Notification, NotificationHistory, NotificationRule
+
+
+class RuleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rules._rules.clear()
+        rules._methods.clear()
+        rules._cached_version = None
+        self.rule = NotificationRule.objects.create(name="Expiry", trigger="expiry")
+
+    def rule_name(self):
+        return rules.get_rules([self.rule.pk])[self.rule.pk].name
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_rules_are_cached_until_a_rule_changes(self):
+        self.assertEqual(self.rule_name(), "Expiry")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.rule_name(), "Expiry")
+
+        self.rule.name = "Renewal"
+        self.rule.save()
+        self.assertEqual(self.rule_name(), "Renewal")
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_rules_are_loaded_per_batch_without_a_shared_cache(self):
+        self.assertEqual(self.rule_name(), "Expiry")
+        # A change made by another process, whose version key this one cannot see
+        NotificationRule.objects.filter(pk=self.rule.pk).update(name="Renewal")
+        self.assertEqual(self.rule_name(), "Renewal")
+        self.assertFalse(rules._rules)
+
+
+@override_settings(NOTIFICATION_CLAIM_TIMEOUT=60)
+class ClaimDueNotificationsTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user("user@example.com", "password")
+        self.due = Notification.objects.create(user=user)
+        self.later = Notification.objects.create(
+            user=user, next_attempt_at=timezone.now() + timedelta(hours=1)
+        )
+
+    def test_due_notifications_are_claimed_once(self):
+        self.assertEqual(claim_due_notifications(10), [self.due.pk])
+        self.due.refresh_from_db()
+        self.assertEqual(self.due.status, "processing")
+        self.assertGreater(self.due.next_attempt_at, timezone.now())
+        self.assertEqual(claim_due_notifications(10), [])
+
+    def test_expired_claims_are_picked_up_again(self):
+        claim_due_notifications(10)
+        Notification.objects.filter(pk=self.due.pk).update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim_due_notifications(10), [self.due.pk])
+
+
+class HistoryBufferTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user("user@example.com", "password")
+
+    def rows(self, count):
+        return [
+            NotificationHistory(user=self.user, status="sent") for _ in range(count)
+        ]
+
+    def test_rows_are_written_once_the_buffer_is_full(self):
+        buffer = HistoryBuffer(size=3, max_age=3600)
+        buffer.add(self.rows(2))
+        self.assertEqual(len(buffer), 2)
+        self.assertFalse(NotificationHistory.objects.exists())
+
+        buffer.add(self.rows(1))
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(NotificationHistory.objects.count(), 3)
+
+    def test_old_rows_are_written_on_the_next_add(self):
+        buffer = HistoryBuffer(size=100, max_age=0)
+        buffer.add(self.rows(1))
+        self.assertEqual(NotificationHistory.objects.count(), 1)
+        self.assertEqual(buffer.flush(), 0)
+
+
+class BrokenMessage(EmailMessage):
+    def message(self):
+        raise ValueError("Malformed message")
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_MAX_SEND_RATE=0,
+)
+class SendEmailMessagesTests(SimpleTestCase):
+    def setUp(self):
+        mailer._rate_limiter = None
+        self.addCleanup(setattr, mailer, "_rate_limiter", None)
+
+    def messages(self, count):
+        return [
+            EmailMessage(f"Message {number}", "Body", to=[f"{number}@example.com"])
+            for number in range(count)
+        ]
+
+    def test_batch_is_split_across_the_pooled_connections(self):
+        with mock.patch(
+            "notifications.mailer.get_connection", wraps=get_connection
+        ) as connection:
+            errors = send_email_messages(self.messages(7), connections=3)
+        self.assertEqual(errors, [None] * 7)
+        self.assertEqual(connection.call_count, 3)
+        self.assertEqual(
+            sorted(message.subject for message in mail.outbox),
+            sorted(f"Message {number}" for number in range(7)),
+        )
+
+    def test_errors_are_returned_per_message(self):
+        messages = self.messages(4)
+        messages[1] = BrokenMessage("Broken", "Body", to=["broken@example.com"])
+        errors = send_email_messages(messages, connections=1)
+        self.assertIsInstance(errors[1], ValueError)
+        self.assertEqual(errors[:1] + errors[2:], [None] * 3)
+        # The connection is reopened for the messages after the failure
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_sends_are_spaced_by_the_rate_limit(self):
+        with override_settings(EMAIL_MAX_SEND_RATE=50):
+            started = time.monotonic()
+            send_email_messages(self.messages(6), connections=3)
+            elapsed = time.monotonic() - started
+        # Six sends at 50 per second need five 20 ms intervals across all connections
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertEqual(len(mail.outbox), 6)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def test_zero_rate_does_not_wait(self):
+        limiter = RateLimiter(0)
+        with mock.patch("notifications.mailer.time.sleep") as sleep:
+            for _ in range(5):
+                limiter.wait()
+        sleep.assert_not_called()
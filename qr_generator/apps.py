@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class QrGeneratorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "qr_generator"
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .handlers import register_handlers
+        from .signals import connect_signals
+
+        connect_signals()
+        register_handlers()
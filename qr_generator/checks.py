@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Scan snapshots and notification rules are only cached when every process can
+    invalidate the cache, i.e. with a shared backend such as redis://.
+    """
+    if settings.CACHE_IS_SHARED:
+        return []
+    return [
+        Warning(
+            "The default cache is not shared between processes.",
+            hint=(
+                "Set CACHE_URL to a shared backend (e.g. redis://) so QR scan "
+                "snapshots and notification rules can be cached."
+            ),
+            id="qr_generator.W001",
+        )
+    ]
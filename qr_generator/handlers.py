@@ -0,0 +1,35 @@
+from django.apps import apps
+
+from events.bus import subscribe
+from .snapshots import invalidate_supplier_snapshots
+
+
+def create_certificate_qr_codes(events):
+    Certificate = apps.get_model("certificates", "Certificate")
+    certificates = Certificate.objects.filter(
+        pk__in={event.payload["certificate_id"] for event in events},
+        certificate_qr__isnull=True,
+    )
+    for certificate in certificates:
+        if certificate.generate_certificate_qr():
+            invalidate_supplier_snapshots(certificate.supplier_id)
+
+
+def create_product_qr_codes(events):
+    Product = apps.get_model("inventory", "Product")
+    products = Product.objects.filter(
+        pk__in={event.payload["product_id"] for event in events},
+        product_qr__isnull=True,
+    )
+    for product in products:
+        if product.generate_product_qr():
+            invalidate_supplier_snapshots(product.supplier_id)
+
+
+def register_handlers():
+    """
+    Creates the QR codes of approved certificates and products. The images are
+    rendered later by the rendering service.
+    """
+    subscribe("certificate.approved", create_certificate_qr_codes)
+    subscribe("product.approved", create_product_qr_codes)
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from qr_generator.rendering import render_pending
+
+
+class Command(BaseCommand):
+    help = "Render pending QR code images in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.QR_RENDER_BATCH_SIZE,
+            help="Number of QR codes to claim per model and batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for pending QR codes instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.QR_RENDER_POLL_INTERVAL,
+            help="Seconds to wait between polls when nothing is pending.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.QR_PRERENDER_IMAGES:
+            self.stderr.write(
+                "QR_PRERENDER_IMAGES is disabled; QR images are rendered on demand."
+            )
+            return
+        while True:
+            rendered = render_pending(options["batch_size"])
+            if rendered:
+                self.stdout.write(f"Rendered {rendered} QR code(s).")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
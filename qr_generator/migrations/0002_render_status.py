@@ -0,0 +1,89 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:42
+
+from django.db import migrations, models
+
+
+def mark_existing_images_rendered(apps, schema_editor):
+    for model_name in ["SupplierQR", "ProductQR", "CertificateQR"]:
+        model = apps.get_model("qr_generator", model_name)
+        model.objects.exclude(qr_code_image="").update(render_status="rendered")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qr_generator", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificateqr",
+            name="render_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("rendered", "Rendered"),
+                    ("failed", "Failed"),
+                ],
+                db_index=True,
+                default="pending",
+                max_length=10,
+                verbose_name="Render Status",
+            ),
+        ),
+        migrations.AddField(
+            model_name="certificateqr",
+            name="rendered_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Rendered At"
+            ),
+        ),
+        migrations.AddField(
+            model_name="productqr",
+            name="render_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("rendered", "Rendered"),
+                    ("failed", "Failed"),
+                ],
+                db_index=True,
+                default="pending",
+                max_length=10,
+                verbose_name="Render Status",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productqr",
+            name="rendered_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Rendered At"
+            ),
+        ),
+        migrations.AddField(
+            model_name="supplierqr",
+            name="render_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("rendered", "Rendered"),
+                    ("failed", "Failed"),
+                ],
+                db_index=True,
+                default="pending",
+                max_length=10,
+                verbose_name="Render Status",
+            ),
+        ),
+        migrations.AddField(
+            model_name="supplierqr",
+            name="rendered_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Rendered At"
+            ),
+        ),
+        migrations.RunPython(mark_existing_images_rendered, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:46
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qr_generator', '0002_render_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qr_token', models.UUIDField(unique=True, verbose_name='QR Token')),
+                ('kind', models.CharField(max_length=20, verbose_name='Kind')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Data')),
+                ('valid_until', models.DateField(blank=True, help_text='Day after which an included certificate has expired.', null=True, verbose_name='Valid Until')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scan_snapshots', to=settings.AUTH_USER_MODEL, verbose_name='Supplier')),
+            ],
+            options={
+                'verbose_name': 'Scan Snapshot',
+                'verbose_name_plural': 'Scan Snapshots',
+                'indexes': [models.Index(fields=['supplier'], name='qr_generato_supplie_ff6ccb_idx')],
+            },
+        ),
+    ]
@@ -1,16 +1,114 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext_lazy as _
 from accounts.models import CustomUser
 from approval.models import ApprovalStatus
 import qrcode
+import qrcode.image.svg
 from io import BytesIO
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.urls import reverse
 from django.conf import settings
+from django.utils import timezone
 import uuid
-import os
 
-class SupplierQR(models.Model):
+
+class RenderStatus(models.TextChoices):
+    """Choices for the rendering state of a QR code image."""
+
+    PENDING = "pending", _("Pending")
+    PROCESSING = "processing", _("Processing")
+    RENDERED = "rendered", _("Rendered")
+    FAILED = "failed", _("Failed")
+
+
+def render_qr_code(qr_content, image_format="png", size=None):
+    """
+    Renders a QR code for the given content and returns the image bytes.
+    `size` is the requested width in pixels; the box size is derived from it.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(qr_content)
+    qr.make(fit=True)
+    if size:
+        qr.box_size = max(1, size // (qr.modules_count + 2 * qr.border))
+
+    buffer = BytesIO()
+    if image_format == "svg":
+        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+        img.save(buffer)
+    else:
+        img = qr.make_image(fill_color='black', back_color='white')
+        img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_qr_png(qr_content):
+    """Renders a QR code for the given content and returns the PNG bytes."""
+    return render_qr_code(qr_content)
+
+
+class RenderableQR(models.Model):
+    """
+    Abstract base for the QR code models.
+    The render state is kept in the database, so saving a QR code never probes storage;
+    pending images are rendered in batches by the rendering service.
+    """
+    render_status = models.CharField(
+        _("Render Status"),
+        max_length=10,
+        choices=RenderStatus.choices,
+        default=RenderStatus.PENDING,
+        db_index=True,
+    )
+    rendered_at = models.DateTimeField(_("Rendered At"), null=True, blank=True)
+
+    detail_url_name = None
+
+    class Meta:
+        abstract = True
+
+    def get_qr_content(self):
+        """Returns the secure URL the QR code points to."""
+        base_url = settings.SITE_URL
+        return f"{base_url}{reverse(self.detail_url_name, args=[self.qr_token])}"
+
+    def get_qr_file_name(self):
+        raise NotImplementedError
+
+    def can_render(self):
+        """QR codes are only rendered for approved suppliers."""
+        return self.supplier.approval_status == ApprovalStatus.APPROVED
+
+    def generate_qr_code(self, force_recreate=False):
+        """Renders the QR code right away if the supplier is approved."""
+        if self.can_render() and (force_recreate or not self.qr_code_image):
+            png = render_qr_png(self.get_qr_content())
+            self.qr_code_image.save(self.get_qr_file_name(), ContentFile(png), save=False)
+            self.render_status = RenderStatus.RENDERED
+            self.rendered_at = timezone.now()
+
+    def get_image_url(self, image_format="png"):
+        """
+        Returns the URL of the QR code image. Stored images are used when they exist,
+        otherwise the image is rendered on demand by the QR image endpoint.
+        """
+        if self.qr_code_image and image_format == "png":
+            return self.qr_code_image.url
+        return reverse("qr_generator:qr_code_image", args=[self.qr_token, image_format])
+
+    def save(self, *args, **kwargs):
+        if not self.qr_code_image:
+            self.render_status = RenderStatus.PENDING
+        super().save(*args, **kwargs)
+
+
+class SupplierQR(RenderableQR):
     """
     Model to generate and store QR codes for suppliers.
     Each supplier is associated with a unique QR code, and the code points to a secure URL.
@@ -29,35 +127,15 @@ class SupplierQR(models.Model):
     )
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
 
-    def generate_qr_code(self, force_recreate=False):
-        """Generates a QR code for the supplier's secure URL if approved."""
-        if self.supplier.approval_status == ApprovalStatus.APPROVED and (force_recreate or not self.qr_code_image):
-            base_url = settings.SITE_URL
-            qr_content = f"{base_url}{reverse('qr_generator:supplier_detail', args=[self.qr_token])}"
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(qr_content)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color='black', back_color='white')
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            file_name = f"supplier_{self.supplier.id}_qr.png"
-            self.qr_code_image.save(file_name, File(buffer), save=False)
+    detail_url_name = "qr_generator:supplier_detail"
 
-    def save(self, *args, **kwargs):
-        if not self.qr_code_image or not os.path.isfile(self.qr_code_image.path):
-            self.generate_qr_code(force_recreate=True)
-        super().save(*args, **kwargs)
+    def get_qr_file_name(self):
+        return f"supplier_{self.supplier_id}_qr.png"
 
     def __str__(self):
         return f"QR Code for {self.supplier.get_full_name()}"
 
-class ProductQR(models.Model):
+class ProductQR(RenderableQR):
     """
     Model to generate and store QR codes for each product.
     Each product added by a supplier is associated with its unique QR code, pointing to a secure URL.
@@ -77,35 +155,15 @@ class ProductQR(models.Model):
     )
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
 
-    def generate_qr_code(self, force_recreate=False):
-        """Generates a QR code for the product's secure URL if the supplier is approved."""
-        if self.supplier.approval_status == ApprovalStatus.APPROVED and (force_recreate or not self.qr_code_image):
-            base_url = settings.SITE_URL
-            qr_content = f"{base_url}{reverse('qr_generator:product_detail', args=[self.qr_token])}"
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(qr_content)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color='black', back_color='white')
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            file_name = f"product_{self.product_id}_qr.png"
-            self.qr_code_image.save(file_name, File(buffer), save=False)
+    detail_url_name = "qr_generator:product_detail"
 
-    def save(self, *args, **kwargs):
-        if not self.qr_code_image or not os.path.isfile(self.qr_code_image.path):
-            self.generate_qr_code(force_recreate=True)
-        super().save(*args, **kwargs)
+    def get_qr_file_name(self):
+        return f"product_{self.product_id}_qr.png"
 
     def __str__(self):
         return f"QR Code for Product {self.product_id}"
 
-class CertificateQR(models.Model):
+class CertificateQR(RenderableQR):
     """
     Model to generate and store QR codes for each certificate.
     Each certificate is associated with its unique QR code for validation, pointing to a secure URL.
@@ -125,30 +183,44 @@ class CertificateQR(models.Model):
     )
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
 
-    def generate_qr_code(self, force_recreate=False):
-        """Generates a QR code for the certificate's secure URL if the supplier is approved."""
-        if self.supplier.approval_status == ApprovalStatus.APPROVED and (force_recreate or not self.qr_code_image):
-            base_url = settings.SITE_URL
-            qr_content = f"{base_url}{reverse('qr_generator:certificate_detail', args=[self.qr_token])}"
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(qr_content)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color='black', back_color='white')
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            file_name = f"certificate_{self.certificate_id}_qr.png"
-            self.qr_code_image.save(file_name, File(buffer), save=False)
+    detail_url_name = "qr_generator:certificate_detail"
 
-    def save(self, *args, **kwargs):
-        if not self.qr_code_image or not os.path.isfile(self.qr_code_image.path):
-            self.generate_qr_code(force_recreate=True)
-        super().save(*args, **kwargs)
+    def get_qr_file_name(self):
+        return f"certificate_{self.certificate_id}_qr.png"
 
     def __str__(self):
         return f"QR Code for Certificate {self.certificate_id}"
+
+
+class ScanSnapshot(models.Model):
+    """
+    Precomputed public view of a scanned QR code: the supplier, the product or
+    certificate and the currently valid certificates. A scan is answered with a single
+    lookup by token; snapshots are deleted whenever the underlying data changes.
+    """
+    qr_token = models.UUIDField(_("QR Token"), unique=True)
+    kind = models.CharField(_("Kind"), max_length=20)
+    supplier = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="scan_snapshots",
+        verbose_name=_("Supplier"),
+    )
+    data = models.JSONField(_("Data"), encoder=DjangoJSONEncoder)
+    valid_until = models.DateField(
+        _("Valid Until"),
+        null=True,
+        blank=True,
+        help_text=_("Day after which an included certificate has expired."),
+    )
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Scan Snapshot")
+        verbose_name_plural = _("Scan Snapshots")
+        indexes = [
+            models.Index(fields=["supplier"]),
+        ]
+
+    def __str__(self):
+        return f"Scan snapshot for {self.kind} {self.qr_token}"
@@ -0,0 +1,120 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from approval.models import ApprovalStatus
+from .models import CertificateQR, ProductQR, RenderStatus, SupplierQR, render_qr_png
+
+logger = logging.getLogger(__name__)
+
+QR_MODELS = [SupplierQR, ProductQR, CertificateQR]
+
+_executor = None
+
+
+def get_executor():
+    """Returns the process pool used to render QR codes, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.QR_RENDER_WORKERS)
+    return _executor
+
+
+def claim_pending(model, batch_size):
+    """
+    Claims a batch of pending QR codes of approved suppliers by marking them as
+    processing. Rows locked by another renderer are skipped.
+    """
+    with transaction.atomic():
+        qr_codes = list(
+            model.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                render_status=RenderStatus.PENDING,
+                supplier__approval_status=ApprovalStatus.APPROVED,
+            )
+            .order_by("pk")[:batch_size]
+        )
+        model.objects.filter(pk__in=[qr_code.pk for qr_code in qr_codes]).update(
+            render_status=RenderStatus.PROCESSING
+        )
+    return qr_codes
+
+
+def render_batch(qr_codes):
+    """
+    Renders and uploads a batch of QR codes of one model. Codes sharing a token are
+    rendered once, images are rendered on the process pool and uploaded to storage
+    with bounded concurrency, and the render state is written with a single bulk_update.
+    """
+    if not qr_codes:
+        return 0
+
+    by_token = {}
+    for qr_code in qr_codes:
+        by_token.setdefault(qr_code.qr_token, []).append(qr_code)
+
+    contents = {}
+    for token, group in by_token.items():
+        try:
+            contents[token] = group[0].get_qr_content()
+        except Exception as e:
+            logger.error(f"Could not build QR content for token {token}: {e}")
+            for qr_code in group:
+                qr_code.render_status = RenderStatus.FAILED
+
+    executor = get_executor()
+    futures = {
+        token: executor.submit(render_qr_png, content)
+        for token, content in contents.items()
+    }
+    images = {}
+    for token, future in futures.items():
+        try:
+            images[token] = future.result()
+        except Exception as e:
+            logger.error(f"Could not render QR code for token {token}: {e}")
+            for qr_code in by_token[token]:
+                qr_code.render_status = RenderStatus.FAILED
+
+    def upload(qr_code):
+        try:
+            qr_code.qr_code_image.save(
+                qr_code.get_qr_file_name(),
+                ContentFile(images[qr_code.qr_token]),
+                save=False,
+            )
+            qr_code.render_status = RenderStatus.RENDERED
+            qr_code.rendered_at = timezone.now()
+        except Exception as e:
+            logger.error(
+                f"Could not upload QR code image for token {qr_code.qr_token}: {e}"
+            )
+            qr_code.render_status = RenderStatus.FAILED
+
+    with ThreadPoolExecutor(max_workers=settings.QR_UPLOAD_CONCURRENCY) as uploader:
+        list(
+            uploader.map(
+                upload, [qr_code for qr_code in qr_codes if qr_code.qr_token in images]
+            )
+        )
+
+    qr_codes[0].__class__.objects.bulk_update(
+        qr_codes, ["qr_code_image", "render_status", "rendered_at"]
+    )
+    return sum(qr_code.render_status == RenderStatus.RENDERED for qr_code in qr_codes)
+
+
+def render_pending(batch_size=None):
+    """
+    Renders one batch of pending QR codes for every QR model. Returns the number rendered.
+    Does nothing unless QR_PRERENDER_IMAGES is enabled, as images are otherwise
+    rendered on demand by the QR image endpoint.
+    """
+    if not settings.QR_PRERENDER_IMAGES:
+        return 0
+    batch_size = batch_size or settings.QR_RENDER_BATCH_SIZE
+    return sum(render_batch(claim_pending(model, batch_size)) for model in QR_MODELS)
@@ -0,0 +1,43 @@
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .snapshots import invalidate_supplier_snapshots
+
+
+def invalidate_for_supplier_field(sender, instance, **kwargs):
+    invalidate_supplier_snapshots(instance.supplier_id)
+
+
+def invalidate_for_user(sender, instance, **kwargs):
+    if instance.role == "supplier":
+        invalidate_supplier_snapshots(instance.pk)
+
+
+def invalidate_for_profile(sender, instance, **kwargs):
+    invalidate_supplier_snapshots(instance.user_id)
+
+
+def invalidate_for_product_certificates(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_supplier_snapshots(instance.supplier_id)
+
+
+def connect_signals():
+    """
+    Connects the receivers that drop QR scan snapshots when the data they show changes:
+    certificates, products, supplier accounts (e.g. approval status) and profiles.
+    """
+    Product = apps.get_model("inventory", "Product")
+    for model in [apps.get_model("certificates", "Certificate"), Product]:
+        post_save.connect(invalidate_for_supplier_field, sender=model)
+        post_delete.connect(invalidate_for_supplier_field, sender=model)
+    post_save.connect(
+        invalidate_for_user, sender=apps.get_model("accounts", "CustomUser")
+    )
+    post_save.connect(
+        invalidate_for_profile, sender=apps.get_model("profiles", "Profile")
+    )
+    m2m_changed.connect(
+        invalidate_for_product_certificates,
+        sender=Product.sustainability_certificates.through,
+    )
@@ -0,0 +1,209 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from approval.models import ApprovalStatus
+from certificates.models import Certificate
+from .models import CertificateQR, ProductQR, ScanSnapshot, SupplierQR
+
+PROFILE_FIELDS = [
+    "date_of_birth",
+    "phone_verified",
+    "address",
+    "city",
+    "country",
+    "postal_code",
+    "company_name",
+    "company_registration_number",
+    "vat_number",
+    "supplier_type",
+    "industry",
+    "date_created",
+    "date_updated",
+]
+DATETIME_KEYS = {"created_at", "date_created", "date_updated"}
+DATE_KEYS = {"date_of_birth", "issue_date", "expiry_date"}
+
+QR_MODELS_BY_KIND = {
+    "supplier": SupplierQR,
+    "product": ProductQR,
+    "certificate": CertificateQR,
+}
+
+
+def get_cache():
+    """
+    Return the scan cache, or None when the default cache is not shared: another
+    process could not drop its entries, so scans then read the snapshot table.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return None
+    return caches[settings.QR_SCAN_CACHE_ALIAS]
+
+
+def cache_key(qr_token):
+    return f"qr-scan:{qr_token}"
+
+
+def valid_certificates(queryset):
+    """Filters a certificate queryset down to approved, untampered and unexpired certificates."""
+    today = timezone.now().date()
+    return queryset.filter(
+        Q(expiry_date__isnull=True) | Q(expiry_date__gte=today),
+        approval_status=ApprovalStatus.APPROVED,
+        suspected_tampered=False,
+    ).order_by("expiry_date")
+
+
+def supplier_data(supplier):
+    data = {
+        "id": supplier.pk,
+        "full_name": supplier.get_full_name(),
+        "email": supplier.email,
+        "phone_number": supplier.phone_number,
+    }
+    profile = getattr(supplier, "profile", None)
+    profile_data = (
+        {field: getattr(profile, field) for field in PROFILE_FIELDS} if profile else {}
+    )
+    return data, profile_data
+
+
+def certificate_data(certificate):
+    return {
+        "id": certificate.pk,
+        "name": certificate.name,
+        "issue_date": certificate.issue_date,
+        "expiry_date": certificate.expiry_date,
+        "verified": certificate.verified,
+    }
+
+
+def build_snapshot(kind, qr_code):
+    """Collects everything a scan page shows for a QR code into a JSON-serialisable dict."""
+    supplier, profile = supplier_data(qr_code.supplier)
+    data = {"kind": kind, "supplier": supplier, "profile": profile}
+
+    if kind == "supplier":
+        certificates = valid_certificates(
+            Certificate.objects.filter(supplier_id=qr_code.supplier_id)
+        )
+    elif kind == "product":
+        product = getattr(qr_code, "product", None)
+        data["product"] = {
+            "product_id": qr_code.product_id,
+            "created_at": qr_code.created_at,
+            "name": product.name if product else "",
+            "description": product.description if product else "",
+            "origin_country": product.origin_country if product else "",
+        }
+        certificates = (
+            valid_certificates(product.sustainability_certificates.all())
+            if product
+            else Certificate.objects.none()
+        )
+    else:
+        certificate = getattr(qr_code, "certificate", None)
+        data["certificate"] = {
+            "certificate_id": qr_code.certificate_id,
+            "created_at": qr_code.created_at,
+            **(certificate_data(certificate) if certificate else {}),
+        }
+        certificates = (
+            valid_certificates(Certificate.objects.filter(pk=certificate.pk))
+            if certificate
+            else Certificate.objects.none()
+        )
+
+    data["certificates"] = [
+        certificate_data(certificate) for certificate in certificates
+    ]
+    expiry_dates = [
+        certificate["expiry_date"]
+        for certificate in data["certificates"]
+        if certificate["expiry_date"]
+    ]
+    return data, min(expiry_dates) if expiry_dates else None
+
+
+def load_snapshot(data):
+    """Restores the dates and datetimes of a snapshot read back from JSON."""
+    for value in data.values():
+        if isinstance(value, dict):
+            load_snapshot(value)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    load_snapshot(item)
+    for key in DATETIME_KEYS.intersection(data):
+        if isinstance(data[key], str):
+            data[key] = parse_datetime(data[key])
+    for key in DATE_KEYS.intersection(data):
+        if isinstance(data[key], str):
+            data[key] = parse_date(data[key])
+    return data
+
+
+def is_current(valid_until):
+    return valid_until is None or timezone.now().date() <= valid_until
+
+
+def resolve_scan(kind, qr_token):
+    """
+    Returns the snapshot for a scanned QR code, or None if the token is unknown or the
+    supplier is not approved. Snapshots are served from the cache when it is shared,
+    then from the snapshot table, and are only built from the source tables on a miss.
+    """
+    cache = get_cache()
+    cached = cache.get(cache_key(qr_token)) if cache is not None else None
+    if cached is not None and is_current(cached[1]):
+        return cached[0] if cached[0]["kind"] == kind else None
+
+    snapshot = (
+        ScanSnapshot.objects.filter(qr_token=qr_token)
+        .values_list("kind", "data", "valid_until")
+        .first()
+    )
+    if snapshot is not None and is_current(snapshot[2]):
+        data, valid_until = load_snapshot(snapshot[1]), snapshot[2]
+    else:
+        qr_code = (
+            QR_MODELS_BY_KIND[kind]
+            .objects.select_related("supplier__profile")
+            .filter(qr_token=qr_token)
+            .first()
+        )
+        if qr_code is None or not qr_code.can_render():
+            return None
+        data, valid_until = build_snapshot(kind, qr_code)
+        ScanSnapshot.objects.update_or_create(
+            qr_token=qr_token,
+            defaults={
+                "kind": kind,
+                "supplier_id": qr_code.supplier_id,
+                "data": data,
+                "valid_until": valid_until,
+            },
+        )
+
+    if cache is not None:
+        cache.set(
+            cache_key(qr_token), (data, valid_until), settings.QR_SCAN_CACHE_TIMEOUT
+        )
+    return data if data["kind"] == kind else None
+
+
+def invalidate_supplier_snapshots(supplier_id):
+    """Drops the cached and stored snapshots of all QR codes of a supplier."""
+    tokens = list(
+        ScanSnapshot.objects.filter(supplier_id=supplier_id).values_list(
+            "qr_token", flat=True
+        )
+    )
+    if tokens:
+        ScanSnapshot.objects.filter(qr_token__in=tokens).delete()
+        cache = get_cache()
+        if cache is not None:
+            cache.delete_many([cache_key(token) for token in tokens])
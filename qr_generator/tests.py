@@ -1,3 +1,171 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from . import rendering
+from .models import RenderStatus, ScanSnapshot, SupplierQR
+from .rendering import render_pending
+from .snapshots import cache_key, invalidate_supplier_snapshots, resolve_scan
+
+
+@override_settings(ROOT_URLCONF="dtrack.urls", SECURE_SSL_REDIRECT=False)
+class QRCodeImageTests(TestCase):
+    def setUp(self):
+        self.supplier = CustomUser.objects.create_user(
+            "supplier@example.com", "password", role="supplier"
+        )
+        CustomUser.objects.filter(pk=self.supplier.pk).update(
+            approval_status="approved"
+        )
+        self.qr_code = SupplierQR.objects.create(supplier=self.supplier)
+
+    def image_url(self, image_format="png"):
+        return reverse(
+            "qr_generator:qr_code_image", args=[self.qr_code.qr_token, image_format]
+        )
+
+    def test_qr_content_points_to_the_detail_route(self):
+        self.assertTrue(
+            self.qr_code.get_qr_content().endswith(
+                reverse("qr_generator:supplier_detail", args=[self.qr_code.qr_token])
+            )
+        )
+
+    def test_image_is_rendered_with_cache_headers(self):
+        response = self.client.get(self.image_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertTrue(response["ETag"])
+
+        svg = self.client.get(self.image_url("svg"), {"size": "128"})
+        self.assertEqual(svg.status_code, 200)
+        self.assertEqual(svg["Content-Type"], "image/svg+xml")
+
+    def test_conditional_request_is_not_modified(self):
+        etag = self.client.get(self.image_url())["ETag"]
+        response = self.client.get(self.image_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unapproved_supplier_and_bad_input(self):
+        self.assertEqual(self.client.get(self.image_url("gif")).status_code, 404)
+        self.assertEqual(
+            self.client.get(self.image_url(), {"size": "big"}).status_code, 400
+        )
+        CustomUser.objects.filter(pk=self.supplier.pk).update(approval_status="pending")
+        self.assertEqual(self.client.get(self.image_url()).status_code, 404)
+
+
+class ResolveScanTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.supplier = CustomUser.objects.create_user(
+            "supplier@example.com", "password", role="supplier", first_name="Ada"
+        )
+        CustomUser.objects.filter(pk=self.supplier.pk).update(
+            approval_status="approved"
+        )
+        self.qr_code = SupplierQR.objects.create(supplier=self.supplier)
+
+    def test_unknown_kind_or_unapproved_supplier(self):
+        self.assertIsNone(resolve_scan("product", self.qr_code.qr_token))
+        CustomUser.objects.filter(pk=self.supplier.pk).update(approval_status="pending")
+        self.assertIsNone(resolve_scan("supplier", self.qr_code.qr_token))
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_snapshot_is_cached_and_invalidated(self):
+        snapshot = resolve_scan("supplier", self.qr_code.qr_token)
+        self.assertEqual(snapshot["supplier"]["email"], "supplier@example.com")
+        self.assertIsNotNone(cache.get(cache_key(self.qr_code.qr_token)))
+        with self.assertNumQueries(0):
+            resolve_scan("supplier", self.qr_code.qr_token)
+
+        invalidate_supplier_snapshots(self.supplier.pk)
+        self.assertIsNone(cache.get(cache_key(self.qr_code.qr_token)))
+        self.assertFalse(ScanSnapshot.objects.exists())
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_process_local_cache_is_bypassed(self):
+        resolve_scan("supplier", self.qr_code.qr_token)
+        self.assertIsNone(cache.get(cache_key(self.qr_code.qr_token)))
+
+        # Another process dropping the snapshot row is seen by the next scan
+        ScanSnapshot.objects.all().delete()
+        CustomUser.objects.filter(pk=self.supplier.pk).update(first_name="Grace")
+        snapshot = resolve_scan("supplier", self.qr_code.qr_token)
+        self.assertTrue(snapshot["supplier"]["full_name"].startswith("Grace"))
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    QR_PRERENDER_IMAGES=True,
+    QR_RENDER_WORKERS=1,
+    QR_UPLOAD_CONCURRENCY=2,
+    MEDIA_ROOT=MEDIA_ROOT,
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+)
+class RenderPendingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        if rendering._executor is not None:
+            rendering._executor.shutdown()
+            rendering._executor = None
+
+    def create_qr_code(self, email, approval_status="approved"):
+        supplier = CustomUser.objects.create_user(email, "password", role="supplier")
+        CustomUser.objects.filter(pk=supplier.pk).update(
+            approval_status=approval_status
+        )
+        return SupplierQR.objects.create(supplier=supplier)
+
+    def test_pending_batch_is_rendered_and_stored(self):
+        rendered = [self.create_qr_code(f"supplier{n}@example.com") for n in range(3)]
+        broken = self.create_qr_code("broken@example.com")
+        unapproved = self.create_qr_code("pending@example.com", "pending")
+        get_qr_content = SupplierQR.get_qr_content
+
+        def content(qr_code):
+            if qr_code.pk == broken.pk:
+                raise ValueError("No content")
+            return get_qr_content(qr_code)
+
+        with mock.patch.object(SupplierQR, "get_qr_content", content), self.assertLogs(
+            "qr_generator.rendering", "ERROR"
+        ):
+            self.assertEqual(render_pending(), 3)
+
+        for qr_code in rendered:
+            qr_code.refresh_from_db()
+            self.assertEqual(qr_code.render_status, RenderStatus.RENDERED)
+            self.assertIsNotNone(qr_code.rendered_at)
+            with qr_code.qr_code_image.open("rb") as image:
+                self.assertEqual(image.read(8), b"\x89PNG\r\n\x1a\n")
+        broken.refresh_from_db()
+        self.assertEqual(broken.render_status, RenderStatus.FAILED)
+        self.assertFalse(broken.qr_code_image)
+        unapproved.refresh_from_db()
+        self.assertEqual(unapproved.render_status, RenderStatus.PENDING)
+
+        # Nothing is left to claim once the batch is done
+        self.assertEqual(render_pending(), 0)
+
+    @override_settings(QR_PRERENDER_IMAGES=False)
+    def test_nothing_is_rendered_on_demand_setups(self):
+        qr_code = self.create_qr_code("supplier@example.com")
+        self.assertEqual(render_pending(), 0)
+        qr_code.refresh_from_db()
+        self.assertEqual(qr_code.render_status, RenderStatus.PENDING)
@@ -0,0 +1,19 @@
+from django.urls import path
+from . import views
+
+app_name = "qr_generator"
+
+urlpatterns = [
+    path("supplier/<uuid:qr_token>/", views.supplier_detail, name="supplier_detail"),
+    path("product/<uuid:qr_token>/", views.product_detail, name="product_detail"),
+    path(
+        "certificate/<uuid:qr_token>/",
+        views.certificate_detail,
+        name="certificate_detail",
+    ),
+    path(
+        "image/<uuid:qr_token>.<str:image_format>",
+        views.qr_code_image,
+        name="qr_code_image",
+    ),
+]
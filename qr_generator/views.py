@@ -1,3 +1,104 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from .models import render_qr_code
+from .rendering import QR_MODELS
+from .snapshots import resolve_scan
+
+QR_IMAGE_CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def find_qr_code(qr_token):
+    """Returns the supplier, product or certificate QR code with the given token, or None."""
+    for model in QR_MODELS:
+        qr_code = (
+            model.objects.select_related("supplier").filter(qr_token=qr_token).first()
+        )
+        if qr_code is not None:
+            return qr_code
+    return None
+
+
+def parse_size(value):
+    """Parses the requested image width, clamped to the configured bounds."""
+    if value is None:
+        return None
+    size = int(value)
+    return min(max(size, settings.QR_IMAGE_MIN_SIZE), settings.QR_IMAGE_MAX_SIZE)
+
+
+def set_cache_headers(response, etag):
+    response["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.QR_IMAGE_MAX_AGE, immutable=True
+    )
+    return response
+
+
+@require_GET
+def qr_code_image(request, qr_token, image_format):
+    """
+    Renders the QR code of a token on demand as PNG or SVG.
+    Images are kept in a bounded cache and sent with a strong ETag and long-lived
+    Cache-Control headers, since the image for a token never changes.
+    """
+    if image_format not in QR_IMAGE_CONTENT_TYPES:
+        raise Http404
+    try:
+        size = parse_size(request.GET.get("size"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid size.")
+
+    qr_code = find_qr_code(qr_token)
+    if qr_code is None or not qr_code.can_render():
+        raise Http404
+
+    qr_content = qr_code.get_qr_content()
+    digest = hashlib.sha256(f"{qr_content}|{image_format}|{size}".encode()).hexdigest()
+    etag = quote_etag(digest[:32])
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return set_cache_headers(not_modified, etag)
+
+    cache = caches[settings.QR_IMAGE_CACHE_ALIAS]
+    image = cache.get(digest)
+    if image is None:
+        image = render_qr_code(qr_content, image_format, size)
+        cache.set(digest, image, settings.QR_IMAGE_MAX_AGE)
+
+    response = HttpResponse(image, content_type=QR_IMAGE_CONTENT_TYPES[image_format])
+    return set_cache_headers(response, etag)
+
+
+def render_scan(request, qr_token, kind):
+    """Renders the public page of a scanned QR code from its precomputed snapshot."""
+    snapshot = resolve_scan(kind, qr_token)
+    if snapshot is None:
+        raise Http404
+    return render(request, f"qr_generator/{kind}_detail.html", snapshot)
+
+
+@require_GET
+def supplier_detail(request, qr_token):
+    return render_scan(request, qr_token, "supplier")
+
+
+@require_GET
+def product_detail(request, qr_token):
+    return render_scan(request, qr_token, "product")
+
 
-# Create your views here.
+@require_GET
+def certificate_detail(request, qr_token):
+    return render_scan(request, qr_token, "certificate")
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from search.models import SEARCH_CONFIGS, SearchDocument
+
+
+def visible_documents(user):
+    """
+    Documents a user may find: all of them for staff and operators, otherwise those
+    of their own tickets, products and certificates.
+    """
+    if user.is_staff or user.role == "operator":
+        return SearchDocument.objects.all()
+    return SearchDocument.objects.filter(supplier=user)
+
+
+class SearchView(APIView):
+    """
+    Ranked full-text search across tickets, products and certificates, including the
+    text extracted from certificate files. `q` is parsed as a web search query with
+    the text search configuration of `lang`, matched through the GIN index of that
+    language. `type` narrows the results to a comma separated list of kinds.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "A search query is required."})
+
+        language = request.query_params.get(
+            "lang", getattr(request, "LANGUAGE_CODE", settings.LANGUAGE_CODE)
+        )
+        language = language.split("-")[0]
+        if language not in SEARCH_CONFIGS:
+            raise ValidationError({"lang": f"Unsupported language: {language}."})
+
+        kinds = [
+            kind for kind in request.query_params.get("type", "").split(",") if kind
+        ]
+        unknown = set(kinds) - {kind for kind, _label in SearchDocument.KIND_CHOICES}
+        if unknown:
+            raise ValidationError(
+                {"type": f"Unknown types: {', '.join(sorted(unknown))}."}
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", settings.SEARCH_RESULT_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "A whole number is required."})
+        limit = max(1, min(limit, settings.SEARCH_MAX_RESULT_LIMIT))
+
+        vector = f"search_{language}"
+        query = SearchQuery(
+            text, config=SEARCH_CONFIGS[language], search_type="websearch"
+        )
+        documents = visible_documents(request.user).filter(**{vector: query})
+        if kinds:
+            documents = documents.filter(kind__in=kinds)
+        results = (
+            documents.annotate(rank=SearchRank(F(vector), query))
+            .order_by("-rank", "pk")
+            .values("kind", "object_id", "title", "rank")[:limit]
+        )
+        return Response(
+            {
+                "query": text,
+                "language": language,
+                "results": [
+                    {
+                        "type": result["kind"],
+                        "id": result["object_id"],
+                        "title": result["title"],
+                        "rank": result["rank"],
+                    }
+                    for result in results
+                ],
+            }
+        )
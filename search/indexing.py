@@ -0,0 +1,109 @@
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+
+from .models import SearchDocument
+
+# OCR output and other long texts are cut, as a tsvector is limited to 1 MB
+MAX_INDEXED_LENGTH = 100000
+
+
+def ticket_document(ticket):
+    return {
+        "supplier_id": ticket.supplier_id,
+        "title": ticket.title,
+        "body": ticket.description,
+        "extra": "",
+    }
+
+
+def product_document(product):
+    return {
+        "supplier_id": product.supplier_id,
+        "title": product.name,
+        "body": product.description,
+        "extra": "\n".join(
+            filter(
+                None,
+                [product.sku, product.material_source, product.lifecycle_assessment],
+            )
+        ),
+    }
+
+
+def certificate_document(certificate):
+    return {
+        "supplier_id": certificate.supplier_id,
+        "title": certificate.name,
+        "body": certificate.description,
+        "extra": certificate.extracted_text[:MAX_INDEXED_LENGTH],
+    }
+
+
+# Indexed models per document kind, with how an object becomes a document
+INDEXED_MODELS = {
+    "ticket": ("support.Ticket", ticket_document),
+    "product": ("inventory.Product", product_document),
+    "certificate": ("certificates.Certificate", certificate_document),
+}
+
+
+def get_kind(model):
+    for kind, (label, _build) in INDEXED_MODELS.items():
+        if model._meta.label == label:
+            return kind
+    return None
+
+
+def index_objects(kind, objects):
+    """
+    Create or update the search documents of `objects` with one upsert.
+    """
+    build = INDEXED_MODELS[kind][1]
+    SearchDocument.objects.bulk_create(
+        [SearchDocument(kind=kind, object_id=obj.pk, **build(obj)) for obj in objects],
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=["supplier", "title", "body", "extra", "updated_at"],
+    )
+
+
+def reindex_objects(kind, object_ids):
+    """
+    Refresh the search documents of the given objects from the database, e.g. after
+    they were changed with a queryset update.
+
+    Documents only follow the ORM signals, so queryset updates and raw SQL that
+    change an indexed field (the title, body, extra text or supplier built above)
+    must call this for the rows they touched, as certificate extraction does.
+    Updates of other fields, such as the status set by SLA escalation, need not.
+    Anything else is corrected by the rebuild_search_index command.
+    """
+    model = apps.get_model(INDEXED_MODELS[kind][0])
+    index_objects(kind, model.objects.filter(pk__in=object_ids))
+
+
+def rebuild_index(batch_size=None):
+    """
+    Index every object of every indexed model, reading them in batches.
+    Returns the number of documents written.
+    """
+    batch_size = batch_size or settings.SEARCH_INDEX_BATCH_SIZE
+    indexed = 0
+    for kind, (label, _build) in INDEXED_MODELS.items():
+        objects = (
+            apps.get_model(label).objects.order_by("pk").iterator(chunk_size=batch_size)
+        )
+        while chunk := list(islice(objects, batch_size)):
+            index_objects(kind, chunk)
+            indexed += len(chunk)
+    return indexed
+
+
+def update_search_document(sender, instance, **kwargs):
+    index_objects(get_kind(sender), [instance])
+
+
+def delete_search_document(sender, instance, **kwargs):
+    SearchDocument.objects.filter(kind=get_kind(sender), object_id=instance.pk).delete()
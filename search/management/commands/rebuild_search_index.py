@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from search.indexing import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents of all tickets, products and certificates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of objects indexed per upsert.",
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(options["batch_size"])
+        self.stdout.write(f"Indexed {indexed} document(s).")
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+# Text search configuration per site language
+SEARCH_CONFIGS = {
+    "en": "english",
+    "ar": "arabic",
+}
+# Document fields and their weight in the ranking
+DOCUMENT_WEIGHTS = [("title", "A"), ("body", "B"), ("extra", "C")]
+
+
+def search_vector_field(language):
+    """
+    Return a stored generated column holding the tsvector of a document parsed with
+    the text search configuration of `language`.
+    """
+    vector = None
+    for field, weight in DOCUMENT_WEIGHTS:
+        part = SearchVector(field, config=SEARCH_CONFIGS[language], weight=weight)
+        vector = part if vector is None else vector + part
+    return models.GeneratedField(
+        expression=vector,
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+
+class SearchDocument(models.Model):
+    """
+    Model to hold the searchable text of a ticket, product or certificate. The
+    database keeps a tsvector per language up to date from the text columns.
+    """
+
+    KIND_CHOICES = [
+        ("ticket", _("Ticket")),
+        ("product", _("Product")),
+        ("certificate", _("Certificate")),
+    ]
+
+    kind = models.CharField(_("Kind"), max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(_("Object ID"))
+    supplier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        verbose_name=_("Supplier"),
+    )
+    title = models.CharField(_("Title"), max_length=255)
+    body = models.TextField(_("Body"), blank=True)
+    extra = models.TextField(_("Extra Text"), blank=True)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+    search_en = search_vector_field("en")
+    search_ar = search_vector_field("ar")
+
+    class Meta:
+        verbose_name = _("Search Document")
+        verbose_name_plural = _("Search Documents")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="searchdocument_object_unique"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["search_en"], name="searchdocument_en_idx"),
+            GinIndex(fields=["search_ar"], name="searchdocument_ar_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}: {self.title}"
@@ -0,0 +1,15 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .indexing import INDEXED_MODELS, delete_search_document, update_search_document
+
+
+def connect_signals():
+    """
+    Keeps the search documents in step with the tickets, products and certificates
+    saved or deleted through the ORM.
+    """
+    for label, _build in INDEXED_MODELS.values():
+        model = apps.get_model(label)
+        post_save.connect(update_search_document, sender=model)
+        post_delete.connect(delete_search_document, sender=model)
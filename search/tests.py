@@ -0,0 +1,79 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from support.models import Ticket
+from .api.views import visible_documents
+from .indexing import reindex_objects
+from .models import SearchDocument
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.supplier = CustomUser.objects.create_user(
+            "supplier@example.com", "password", role="supplier"
+        )
+        self.other = CustomUser.objects.create_user(
+            "other@example.com", "password", role="supplier"
+        )
+        self.operator = CustomUser.objects.create_user(
+            "operator@example.com", "password", role="operator"
+        )
+        self.ticket = self.create_ticket(self.supplier, "Organic cotton audit")
+        self.other_ticket = self.create_ticket(self.other, "Organic cotton invoice")
+
+    def create_ticket(self, supplier, title):
+        return Ticket.objects.create(
+            supplier=supplier, title=title, description="Cotton from Egypt"
+        )
+
+
+class SearchDocumentTests(SearchTestCase):
+    def visible_ids(self, user):
+        return set(visible_documents(user).values_list("object_id", flat=True))
+
+    def test_suppliers_only_see_their_own_documents(self):
+        self.assertEqual(self.visible_ids(self.supplier), {self.ticket.pk})
+        self.assertEqual(
+            self.visible_ids(self.operator), {self.ticket.pk, self.other_ticket.pk}
+        )
+
+    def test_documents_follow_saves_deletes_and_reindexing(self):
+        document = SearchDocument.objects.get(kind="ticket", object_id=self.ticket.pk)
+        self.assertEqual(document.title, "Organic cotton audit")
+
+        Ticket.objects.filter(pk=self.ticket.pk).update(supplier=self.other)
+        reindex_objects("ticket", [self.ticket.pk])
+        self.assertEqual(self.visible_ids(self.supplier), set())
+
+        self.other_ticket.delete()
+        self.assertFalse(
+            SearchDocument.objects.filter(object_id=self.other_ticket.pk).exists()
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+@override_settings(ROOT_URLCONF="dtrack.urls", SECURE_SSL_REDIRECT=False)
+class SearchViewTests(SearchTestCase):
+    def search(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse("search"), params)
+
+    def test_results_respect_visibility(self):
+        results = self.search(self.supplier, q="cotton", lang="en").data["results"]
+        self.assertEqual([result["id"] for result in results], [self.ticket.pk])
+
+        results = self.search(self.operator, q="cotton", lang="en").data["results"]
+        self.assertEqual(len(results), 2)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.search(self.supplier).status_code, 400)
+        self.assertEqual(self.search(self.supplier, q="x", lang="fr").status_code, 400)
+        self.assertEqual(
+            self.search(self.supplier, q="x", type="order").status_code, 400
+        )
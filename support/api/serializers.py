@@ -0,0 +1,64 @@
+from rest_framework import serializers
+
+from accounts.models import CustomUser
+from support.models import ReplyAttachment, Ticket, TicketAttachment, TicketReply
+
+
+class ThreadUserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ["id", "email", "first_name", "last_name", "role"]
+
+
+class TicketAttachmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TicketAttachment
+        fields = ["id", "attachment", "date_added"]
+
+
+class ReplyAttachmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReplyAttachment
+        fields = ["id", "attachment", "date_added"]
+
+
+class TicketReplySerializer(serializers.ModelSerializer):
+    author = ThreadUserSerializer()
+    attachments = ReplyAttachmentSerializer(many=True)
+
+    class Meta:
+        model = TicketReply
+        fields = [
+            "id",
+            "author",
+            "message",
+            "date_created",
+            "last_updated",
+            "attachments",
+        ]
+
+
+class TicketThreadSerializer(serializers.ModelSerializer):
+    supplier = ThreadUserSerializer()
+    assigned_to = ThreadUserSerializer()
+    department = serializers.StringRelatedField()
+    category = serializers.StringRelatedField()
+    attachments = TicketAttachmentSerializer(many=True)
+
+    class Meta:
+        model = Ticket
+        fields = [
+            "id",
+            "title",
+            "description",
+            "status",
+            "priority",
+            "supplier",
+            "assigned_to",
+            "department",
+            "category",
+            "sla_due_date",
+            "date_created",
+            "last_updated",
+            "attachments",
+        ]
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path(
+        "tickets/<int:pk>/thread/",
+        views.TicketThreadView.as_view(),
+        name="ticket-thread",
+    ),
+]
@@ -1,3 +1,123 @@
-from django.shortcuts import render
+import hashlib
 
-# Create your views here.
+from django.conf import settings
+from django.db.models import Count, Max, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from support.models import ReplyAttachment, Ticket, TicketAttachment, TicketReply
+from .serializers import TicketReplySerializer, TicketThreadSerializer
+
+
+class ReplyCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a thread's replies, oldest first.
+    """
+
+    ordering = "date_created"
+    page_size = settings.SUPPORT_THREAD_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.SUPPORT_THREAD_MAX_PAGE_SIZE
+
+
+def subquery_value(queryset, group_by, aggregate):
+    return Subquery(
+        queryset.order_by().values(group_by).annotate(value=aggregate).values("value")
+    )
+
+
+def visible_tickets(user):
+    """
+    Tickets a user may read: all of them for staff and operators, otherwise their own.
+    """
+    if user.is_staff or user.role == "operator":
+        return Ticket.objects.all()
+    return Ticket.objects.filter(supplier=user)
+
+
+class TicketThreadView(APIView):
+    """
+    Returns a ticket with one page of its replies, their authors and attachments.
+    The query count does not depend on the thread length, and responses carry an
+    ETag derived from the thread's change markers so unchanged pages return 304.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        replies = TicketReply.objects.filter(ticket=OuterRef("pk"))
+        reply_attachments = ReplyAttachment.objects.filter(reply__ticket=OuterRef("pk"))
+        ticket_attachments = TicketAttachment.objects.filter(ticket=OuterRef("pk"))
+        ticket = (
+            visible_tickets(request.user)
+            .select_related(
+                "supplier", "assigned_to", "department", "category__department"
+            )
+            .annotate(
+                reply_count=Coalesce(subquery_value(replies, "ticket", Count("pk")), 0),
+                replies_updated=subquery_value(replies, "ticket", Max("last_updated")),
+                attachment_count=Coalesce(
+                    subquery_value(reply_attachments, "reply__ticket", Count("pk")), 0
+                ),
+                attachments_added=subquery_value(
+                    reply_attachments, "reply__ticket", Max("date_added")
+                ),
+                ticket_attachment_count=Coalesce(
+                    subquery_value(ticket_attachments, "ticket", Count("pk")), 0
+                ),
+            )
+            .filter(pk=pk)
+            .first()
+        )
+        if ticket is None:
+            raise Http404
+
+        etag = self.get_etag(request, ticket)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.set_cache_headers(not_modified, etag)
+
+        paginator = ReplyCursorPagination()
+        page = paginator.paginate_queryset(
+            TicketReply.objects.filter(ticket=ticket)
+            .select_related("author")
+            .prefetch_related(
+                Prefetch("attachments", queryset=ReplyAttachment.objects.order_by("pk"))
+            ),
+            request,
+            view=self,
+        )
+        response = paginator.get_paginated_response(
+            TicketReplySerializer(page, many=True, context={"request": request}).data
+        )
+        response.data["ticket"] = TicketThreadSerializer(
+            ticket, context={"request": request}
+        ).data
+        return self.set_cache_headers(response, etag)
+
+    @staticmethod
+    def get_etag(request, ticket):
+        markers = [
+            ticket.pk,
+            ticket.last_updated.isoformat(),
+            ticket.reply_count,
+            ticket.replies_updated and ticket.replies_updated.isoformat(),
+            ticket.attachment_count,
+            ticket.attachments_added and ticket.attachments_added.isoformat(),
+            ticket.ticket_attachment_count,
+            request.get_full_path(),
+            request.accepted_renderer.format,
+        ]
+        digest = hashlib.sha256("|".join(map(str, markers)).encode()).hexdigest()
+        return quote_etag(digest[:32])
+
+    @staticmethod
+    def set_cache_headers(response, etag):
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
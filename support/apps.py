@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SupportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "support"
+
+    def ready(self):
+        from .handlers import register_handlers
+        from .signals import connect_signals
+
+        connect_signals()
+        register_handlers()
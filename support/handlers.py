@@ -0,0 +1,111 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import CustomUser
+from events.bus import subscribe
+from notifications.mailer import send_email_messages
+from .models import Ticket, TicketDepartment
+
+logger = logging.getLogger(__name__)
+
+# Notified of every event besides the department operators
+EVENT_RECIPIENTS = {
+    "created": ["supplier"],
+    "status_changed": [],
+    "assigned": ["assigned_to"],
+}
+
+
+def recipients_cache_key(department_id):
+    return f"ticket-department-recipients:{department_id}"
+
+
+def load_department_recipients(department_id):
+    operators = CustomUser.objects.filter(role="operator", is_active=True)
+    department_operators = operators.filter(ticket_departments=department_id)
+    if department_id is not None and department_operators.exists():
+        operators = department_operators
+    else:
+        operators = operators.filter(
+            operatorpermission__view_only=False,
+            operatorpermission__app_level_permissions__content_type__app_label="support",
+            operatorpermission__app_level_permissions__codename="change_ticket",
+        )
+    return list(operators.values_list("email", flat=True).distinct())
+
+
+def get_department_recipients(department_id):
+    """
+    Return the email addresses of the operators notified about a department's
+    tickets. Departments without operators of their own fall back to every operator
+    allowed to change tickets. The addresses are cached for
+    SUPPORT_RECIPIENT_CACHE_TIMEOUT seconds when the cache is shared, as the relay
+    process would not see the invalidations of the web processes otherwise.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return load_department_recipients(department_id)
+    key = recipients_cache_key(department_id)
+    recipients = cache.get(key)
+    if recipients is None:
+        recipients = load_department_recipients(department_id)
+        cache.set(key, recipients, settings.SUPPORT_RECIPIENT_CACHE_TIMEOUT)
+    return recipients
+
+
+def invalidate_department_recipients(sender, instance, pk_set=None, **kwargs):
+    if isinstance(instance, TicketDepartment):
+        department_ids = [instance.pk]
+    else:
+        department_ids = pk_set or instance.ticket_departments.values_list(
+            "pk", flat=True
+        )
+    cache.delete_many([recipients_cache_key(pk) for pk in department_ids])
+
+
+def get_event_recipients(ticket, event):
+    recipients = []
+    for attribute in EVENT_RECIPIENTS[event]:
+        user = getattr(ticket, attribute)
+        if user is not None:
+            recipients.append(user.email)
+    recipients.extend(get_department_recipients(ticket.department_id))
+    return recipients
+
+
+def send_ticket_notifications(events):
+    """
+    Send the notifications of a batch of ticket events. Mail errors are logged rather
+    than retried, so recipients that were reached are not notified twice, and every
+    message is built before the first is sent, so an event the relay retries on its
+    own has not been mailed yet.
+    """
+    tickets = Ticket.objects.select_related("supplier", "assigned_to").in_bulk(
+        {event.payload["ticket_id"] for event in events}
+    )
+    messages = []
+    for event in events:
+        ticket = tickets.get(event.payload["ticket_id"])
+        if ticket is None:
+            continue
+        name = event.topic.partition(".")[2]
+        messages.extend(
+            ticket.build_notification_messages(
+                name, event.payload["status"], get_event_recipients(ticket, name)
+            )
+        )
+
+    for message, error in zip(messages, send_email_messages(messages)):
+        if error is not None:
+            logger.error(
+                f"Could not send {message.subject!r} to {message.to[0]}: {error}"
+            )
+
+
+def register_handlers():
+    """
+    Notifies suppliers and operators of ticket events.
+    """
+    for event in EVENT_RECIPIENTS:
+        subscribe(f"ticket.{event}", send_ticket_notifications)
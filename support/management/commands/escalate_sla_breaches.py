@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from support.sla import escalate_breached_tickets
+
+
+class Command(BaseCommand):
+    help = "Escalate open tickets whose SLA due date has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SUPPORT_SLA_SCAN_BATCH_SIZE,
+            help="Number of tickets escalated per UPDATE.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep scanning for breaches instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.SUPPORT_SLA_SCAN_INTERVAL,
+            help="Seconds to wait between scans.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            escalated = escalate_breached_tickets(batch_size=options["batch_size"])
+            if escalated:
+                self.stdout.write(f"Escalated {len(escalated)} ticket(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,101 @@
+# Generated by Django 5.1.2 on 2026-10-17 12:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("support", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticketdepartment",
+            name="operators",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Operators notified about the department's tickets. When empty, all operators allowed to change tickets are notified.",
+                limit_choices_to={"role": "operator"},
+                related_name="ticket_departments",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Operators",
+            ),
+        ),
+        migrations.CreateModel(
+            name="TicketEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("status_changed", "Status Changed"),
+                            ("assigned", "Assigned"),
+                        ],
+                        max_length=20,
+                        verbose_name="Event",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Open"),
+                            ("in_progress", "In Progress"),
+                            ("awaiting_user", "Awaiting User Response"),
+                            ("awaiting_support", "Awaiting Support Response"),
+                            ("resolved", "Resolved"),
+                            ("closed", "Closed"),
+                            ("escalated", "Escalated"),
+                        ],
+                        max_length=20,
+                        verbose_name="Ticket Status",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "processed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Processed At"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "ticket",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="support.ticket",
+                        verbose_name="Ticket",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ticket Event",
+                "verbose_name_plural": "Ticket Events",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("processed_at__isnull", True)),
+                        fields=["created_at"],
+                        name="ticketevent_pending_idx",
+                    )
+                ],
+            },
+        ),
+    ]
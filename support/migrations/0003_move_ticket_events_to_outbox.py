@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-17 13:40
+
+from django.db import migrations
+
+
+def move_pending_events(apps, schema_editor):
+    TicketEvent = apps.get_model("support", "TicketEvent")
+    OutboxEvent = apps.get_model("events", "OutboxEvent")
+    OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(
+                topic=f"ticket.{event.event}",
+                payload={
+                    "ticket_id": event.ticket_id,
+                    "status": event.status,
+                    "user_id": event.ticket.supplier_id,
+                },
+            )
+            for event in TicketEvent.objects.filter(
+                processed_at__isnull=True
+            ).select_related("ticket")
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("support", "0002_ticket_events"),
+        ("events", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(move_pending_events, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name="TicketEvent",
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.2 on 2026-10-17 14:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("support", "0003_move_ticket_events_to_outbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SLAPolicy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("critical", "Critical"),
+                        ],
+                        max_length=20,
+                        verbose_name="Priority",
+                    ),
+                ),
+                (
+                    "resolution_hours",
+                    models.PositiveIntegerField(verbose_name="Resolution Time (hours)"),
+                ),
+            ],
+            options={
+                "verbose_name": "SLA Policy",
+                "verbose_name_plural": "SLA Policies",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(
+                    ("sla_due_date__isnull", False),
+                    (
+                        "status__in",
+                        ["open", "in_progress", "awaiting_user", "awaiting_support"],
+                    ),
+                ),
+                fields=["sla_due_date"],
+                name="ticket_sla_due_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="slapolicy",
+            name="department",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sla_policies",
+                to="support.ticketdepartment",
+                verbose_name="Department",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="slapolicy",
+            unique_together={("department", "priority")},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-17 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("support", "0004_sla_policy"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ticketreply",
+            name="support_tic_ticket__7676a6_idx",
+        ),
+        migrations.AddIndex(
+            model_name="ticketreply",
+            index=models.Index(
+                fields=["ticket", "date_created"], name="ticketreply_thread_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-17 06:30
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_policies(apps, schema_editor):
+    """
+    Keep only the newest of the policies for all departments sharing a priority,
+    which the old unique_together could not prevent.
+    """
+    SLAPolicy = apps.get_model("support", "SLAPolicy")
+    global_policies = SLAPolicy.objects.filter(department__isnull=True)
+    newest = global_policies.values("priority").annotate(newest=Max("pk"))
+    global_policies.exclude(pk__in=[row["newest"] for row in newest]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("support", "0005_ticketreply_thread_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_policies, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="slapolicy",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="slapolicy",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("department__isnull", False)),
+                fields=("department", "priority"),
+                name="slapolicy_department_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="slapolicy",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("department__isnull", True)),
+                fields=("priority",),
+                name="slapolicy_all_departments_uniq",
+            ),
+        ),
+    ]
@@ -1,9 +1,13 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 
 import accounts.models
+from events.bus import publish_many
 
 
 class TicketDepartment(models.Model):
@@ -14,6 +18,17 @@ class TicketDepartment(models.Model):
 
     name = models.CharField(_("Department Name"), max_length=50, unique=True)
     description = models.TextField(_("Description"), blank=True)
+    operators = models.ManyToManyField(
+        accounts.models.CustomUser,
+        limit_choices_to={"role": "operator"},
+        related_name="ticket_departments",
+        blank=True,
+        verbose_name=_("Operators"),
+        help_text=_(
+            "Operators notified about the department's tickets. When empty, all "
+            "operators allowed to change tickets are notified."
+        ),
+    )
     date_created = models.DateTimeField(_("Date Created"), auto_now_add=True)
 
     class Meta:
@@ -49,6 +64,10 @@ class TicketCategory(models.Model):
         return f"{self.department.name} - {self.name}"
 
 
+# Ticket statuses still waiting on support, watched for SLA breaches
+SLA_OPEN_STATUSES = ["open", "in_progress", "awaiting_user", "awaiting_support"]
+
+
 class Ticket(models.Model):
     """
     Model to represent a support ticket created by a supplier.
@@ -124,52 +143,150 @@ class Ticket(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["priority"]),
             models.Index(fields=["assigned_to"]),
+            models.Index(
+                fields=["sla_due_date"],
+                name="ticket_sla_due_idx",
+                condition=models.Q(
+                    status__in=SLA_OPEN_STATUSES, sla_due_date__isnull=False
+                ),
+            ),
         ]
 
     def __str__(self):
         return f"Ticket #{self.pk} - {self.title}"
 
-    def send_notification(self, event):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the loaded values, so save() can tell what changed without a query
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_pending_events(self, is_new):
         """
-        Sends email notifications based on the event (ticket creation, status change, etc.).
+        Return the events caused by saving the ticket in its current state.
         """
-        subject = f"[{self.get_status_display()}] - Ticket #{self.pk}: {self.title}"
-        message = f"Ticket Update:\n\nTitle: {self.title}\nStatus: {self.get_status_display()}\nPriority: {self.get_priority_display()}\nDescription: {self.description}\n\nPlease login to view more details."
-        from_email = settings.DEFAULT_FROM_EMAIL
-        recipient_list = []
-
-        if event == "created":
-            # Notify supplier
-            recipient_list.append(self.supplier.email)
-
-        if event in ["created", "status_changed", "assigned"]:
-            # Notify all department operators
-            department_operators = accounts.models.CustomUser.objects.filter(
-                role="operator",
-                operatorpermission__can_manage_tickets=True,
-                profile__department=self.department,
-            )
-            for operator in department_operators:
-                recipient_list.append(operator.email)
-
-        if recipient_list:
-            send_mail(subject, message, from_email, recipient_list)
+        if is_new:
+            return ["created"]
+        loaded = getattr(self, "_loaded_values", {})
+        events = []
+        if "status" in loaded and loaded["status"] != self.status:
+            events.append("status_changed")
+        if (
+            "assigned_to_id" in loaded
+            and loaded["assigned_to_id"] != self.assigned_to_id
+            and self.assigned_to_id is not None
+        ):
+            events.append("assigned")
+        return events
+
+    def apply_sla_policy(self, is_new):
+        """
+        Set the SLA due date from the matching policy when the ticket is created
+        without one, or when its department or priority changes.
+        """
+        from .sla import get_resolution_hours
+
+        loaded = getattr(self, "_loaded_values", {})
+        changed = any(
+            field in loaded and loaded[field] != getattr(self, field)
+            for field in ("department_id", "priority")
+        )
+        if not changed and not (is_new and self.sla_due_date is None):
+            return
+        hours = get_resolution_hours(self.department_id, self.priority)
+        if hours is not None:
+            started = self.date_created or timezone.now()
+            self.sla_due_date = started + timedelta(hours=hours)
+
+    def build_notification_messages(self, event, status, recipients):
+        """
+        Build one email per recipient for a ticket event. `status` is the status the
+        ticket had when the event happened.
+        """
+        status_display = dict(self.STATUS_CHOICES).get(status, status)
+        subject = f"[{status_display}] - Ticket #{self.pk}: {self.title}"
+        message = f"Ticket Update:\n\nTitle: {self.title}\nStatus: {status_display}\nPriority: {self.get_priority_display()}\nDescription: {self.description}\n\nPlease login to view more details."
+        return [
+            EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [recipient])
+            for recipient in dict.fromkeys(recipients)
+        ]
 
     def save(self, *args, **kwargs):
         """
-        Override save method to handle notifications and automatic actions.
+        Override save method to apply the SLA policy and publish the ticket's events to
+        the outbox, in the same transaction as the change. Notifications are sent by
+        the event relay.
         """
         is_new = self.pk is None
-        previous_status = None
-        if not is_new:
-            previous_status = Ticket.objects.get(pk=self.pk).status
+        events = self.get_pending_events(is_new)
+        self.apply_sla_policy(is_new)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            publish_many(
+                [
+                    (
+                        f"ticket.{event}",
+                        {
+                            "ticket_id": self.pk,
+                            "status": self.status,
+                            "user_id": self.supplier_id,
+                        },
+                    )
+                    for event in events
+                ]
+            )
+        self._loaded_values = {
+            "status": self.status,
+            "assigned_to_id": self.assigned_to_id,
+            "department_id": self.department_id,
+            "priority": self.priority,
+        }
 
-        super().save(*args, **kwargs)
 
-        if is_new:
-            self.send_notification(event="created")
-        elif self.status != previous_status:
-            self.send_notification(event="status_changed")
+class SLAPolicy(models.Model):
+    """
+    Model to define the time allowed to resolve tickets of a department and priority.
+    Policies without a department or priority apply to all of them; the most specific
+    matching policy is used.
+    """
+
+    department = models.ForeignKey(
+        TicketDepartment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="sla_policies",
+        verbose_name=_("Department"),
+    )
+    priority = models.CharField(
+        _("Priority"), max_length=20, choices=Ticket.PRIORITY_CHOICES, blank=True
+    )
+    resolution_hours = models.PositiveIntegerField(_("Resolution Time (hours)"))
+
+    class Meta:
+        verbose_name = _("SLA Policy")
+        verbose_name_plural = _("SLA Policies")
+        # NULL departments compare as distinct in a plain unique constraint, so the
+        # policies for all departments get a partial constraint of their own
+        constraints = [
+            models.UniqueConstraint(
+                fields=["department", "priority"],
+                condition=models.Q(department__isnull=False),
+                name="slapolicy_department_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["priority"],
+                condition=models.Q(department__isnull=True),
+                name="slapolicy_all_departments_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        department = self.department.name if self.department else _("All departments")
+        priority = self.get_priority_display() if self.priority else _("any priority")
+        return f"{department} ({priority}): {self.resolution_hours}h"
 
 
 class TicketAttachment(models.Model):
@@ -224,7 +341,9 @@ class TicketReply(models.Model):
         verbose_name = _("Ticket Reply")
         verbose_name_plural = _("Ticket Replies")
         indexes = [
-            models.Index(fields=["ticket"]),
+            models.Index(
+                fields=["ticket", "date_created"], name="ticketreply_thread_idx"
+            ),
             models.Index(fields=["author"]),
         ]
 
@@ -0,0 +1,17 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .handlers import invalidate_department_recipients
+from .models import SLAPolicy, TicketDepartment
+from .sla import invalidate_sla_policies
+
+
+def connect_signals():
+    """
+    Drops the cached recipients of a department when its operators change, and the
+    cached SLA policies when a policy changes.
+    """
+    m2m_changed.connect(
+        invalidate_department_recipients, sender=TicketDepartment.operators.through
+    )
+    post_save.connect(invalidate_sla_policies, sender=SLAPolicy)
+    post_delete.connect(invalidate_sla_policies, sender=SLAPolicy)
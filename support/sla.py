@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from events.bus import publish_many
+from .models import SLA_OPEN_STATUSES, SLAPolicy, Ticket
+
+SLA_POLICIES_CACHE_KEY = "support-sla-policies"
+
+
+def load_sla_policies():
+    return {
+        (department_id, priority): hours
+        for department_id, priority, hours in SLAPolicy.objects.values_list(
+            "department_id", "priority", "resolution_hours"
+        )
+    }
+
+
+def get_sla_policies():
+    """
+    Return the resolution hours of every policy by (department ID, priority). They
+    are cached until a policy changes, which is only seen by every process when the
+    cache is shared, so they are read from the database otherwise.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return load_sla_policies()
+    policies = cache.get(SLA_POLICIES_CACHE_KEY)
+    if policies is None:
+        policies = load_sla_policies()
+        cache.set(
+            SLA_POLICIES_CACHE_KEY,
+            policies,
+            settings.SUPPORT_SLA_POLICY_CACHE_TIMEOUT,
+        )
+    return policies
+
+
+def get_resolution_hours(department_id, priority):
+    """
+    Return the resolution hours of the most specific policy matching a department
+    and priority, or None when no policy applies.
+    """
+    policies = get_sla_policies()
+    for key in [
+        (department_id, priority),
+        (department_id, ""),
+        (None, priority),
+        (None, ""),
+    ]:
+        if key in policies:
+            return policies[key]
+    return None
+
+
+def invalidate_sla_policies(sender, **kwargs):
+    cache.delete(SLA_POLICIES_CACHE_KEY)
+
+
+def escalate_breached_tickets(now=None, batch_size=None):
+    """
+    Escalate open tickets whose SLA due date has passed, walking the partial SLA index
+    in due date order. Each batch is locked, escalated with one UPDATE and announced
+    with one insert of ticket.status_changed events. Returns the escalated ticket IDs.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.SUPPORT_SLA_SCAN_BATCH_SIZE
+    escalated = []
+    while True:
+        with transaction.atomic():
+            tickets = list(
+                Ticket.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status__in=SLA_OPEN_STATUSES,
+                    sla_due_date__isnull=False,
+                    sla_due_date__lt=now,
+                )
+                .order_by("sla_due_date")
+                .values_list("pk", "supplier_id")[:batch_size]
+            )
+            if not tickets:
+                break
+            ticket_ids = [ticket[0] for ticket in tickets]
+            # The status is not part of the search documents, so they need no reindex
+            Ticket.objects.filter(pk__in=ticket_ids).update(
+                status="escalated", last_updated=now
+            )
+            publish_many(
+                [
+                    (
+                        "ticket.status_changed",
+                        {
+                            "ticket_id": ticket_id,
+                            "status": "escalated",
+                            "user_id": supplier_id,
+                        },
+                    )
+                    for ticket_id, supplier_id in tickets
+                ]
+            )
+        escalated.extend(ticket_ids)
+    return escalated
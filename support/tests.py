@@ -1,3 +1,240 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from events.models import OutboxEvent
+from events.relay import relay_events
+from .handlers import get_department_recipients
+from .models import (
+    ReplyAttachment,
+    SLAPolicy,
+    Ticket,
+    TicketAttachment,
+    TicketDepartment,
+    TicketReply,
+)
+from .sla import escalate_breached_tickets, get_resolution_hours
+
+
+class SupportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.supplier = CustomUser.objects.create_user(
+            "supplier@example.com", "password", role="supplier"
+        )
+        self.department = TicketDepartment.objects.create(name="Compliance")
+
+    def create_ticket(self, **fields):
+        return Ticket.objects.create(
+            supplier=self.supplier,
+            department=self.department,
+            title="Certificate rejected",
+            description="Please review it again.",
+            **fields,
+        )
+
+
+class SLAPolicyTests(SupportTestCase):
+    def test_most_specific_policy_sets_the_due_date(self):
+        SLAPolicy.objects.create(priority="", resolution_hours=72)
+        SLAPolicy.objects.create(
+            department=self.department, priority="high", resolution_hours=4
+        )
+        high = self.create_ticket(priority="high")
+        low = self.create_ticket(priority="low")
+        self.assertAlmostEqual(
+            high.sla_due_date - high.date_created,
+            timedelta(hours=4),
+            delta=timedelta(seconds=1),
+        )
+        self.assertAlmostEqual(
+            low.sla_due_date - low.date_created,
+            timedelta(hours=72),
+            delta=timedelta(seconds=1),
+        )
+
+    def update_policy_elsewhere(self, policy, hours):
+        # A change made by another process, whose invalidation this one cannot see
+        SLAPolicy.objects.filter(pk=policy.pk).update(resolution_hours=hours)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_policies_are_cached_in_a_shared_cache(self):
+        policy = SLAPolicy.objects.create(priority="", resolution_hours=72)
+        self.create_ticket()
+        self.update_policy_elsewhere(policy, 24)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_resolution_hours(self.department.pk, "medium"), 72)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_policies_are_read_per_ticket_without_a_shared_cache(self):
+        policy = SLAPolicy.objects.create(priority="", resolution_hours=72)
+        self.create_ticket()
+        self.update_policy_elsewhere(policy, 24)
+        ticket = self.create_ticket()
+        self.assertAlmostEqual(
+            ticket.sla_due_date - ticket.date_created,
+            timedelta(hours=24),
+            delta=timedelta(seconds=1),
+        )
+
+    def test_policies_for_all_departments_are_unique_per_priority(self):
+        SLAPolicy.objects.create(priority="high", resolution_hours=8)
+        with self.assertRaises(IntegrityError):
+            SLAPolicy.objects.create(priority="high", resolution_hours=12)
+
+
+class EscalateBreachedTicketsTests(SupportTestCase):
+    def test_breached_open_tickets_are_escalated_once(self):
+        now = timezone.now()
+        breached = self.create_ticket(sla_due_date=now - timedelta(hours=1))
+        self.create_ticket(sla_due_date=now + timedelta(hours=1))
+        self.create_ticket(status="resolved", sla_due_date=now - timedelta(hours=1))
+        OutboxEvent.objects.all().delete()
+
+        self.assertEqual(escalate_breached_tickets(now, batch_size=1), [breached.pk])
+        breached.refresh_from_db()
+        self.assertEqual(breached.status, "escalated")
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, "ticket.status_changed")
+        self.assertEqual(
+            event.payload,
+            {
+                "ticket_id": breached.pk,
+                "status": "escalated",
+                "user_id": self.supplier.pk,
+            },
+        )
+        self.assertEqual(escalate_breached_tickets(now), [])
+
+
+@override_settings(ROOT_URLCONF="dtrack.urls", SECURE_SSL_REDIRECT=False)
+class TicketThreadTests(SupportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ticket = self.create_ticket()
+        for number in range(3):
+            TicketReply.objects.create(
+                ticket=self.ticket, author=self.supplier, message=f"Reply {number}"
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.supplier)
+        self.url = reverse("ticket-thread", args=[self.ticket.pk])
+
+    def test_replies_are_paginated_oldest_first(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["ticket"]["id"], self.ticket.pk)
+        self.assertEqual(
+            [reply["message"] for reply in response.data["results"]],
+            ["Reply 0", "Reply 1"],
+        )
+        self.assertIsNotNone(response.data["next"])
+
+    def build_thread(self, length):
+        operator = CustomUser.objects.create_user(
+            f"operator{length}@example.com", "password", role="operator"
+        )
+        ticket = self.create_ticket(assigned_to=operator)
+        TicketAttachment.objects.create(ticket=ticket, attachment="tickets/a.pdf")
+        for number in range(length):
+            reply = TicketReply.objects.create(
+                ticket=ticket,
+                author=operator if number % 2 else self.supplier,
+                message=f"Reply {number}",
+            )
+            for _ in range(2):
+                ReplyAttachment.objects.create(
+                    reply=reply, attachment="replies/attachments/a.pdf"
+                )
+        return reverse("ticket-thread", args=[ticket.pk])
+
+    def test_query_count_does_not_depend_on_the_thread_length(self):
+        short_url = self.build_thread(2)
+        long_url = self.build_thread(12)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(short_url, {"page_size": 20})
+        self.assertEqual(len(response.data["results"]), 2)
+
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(long_url, {"page_size": 20})
+        self.assertEqual(len(response.data["results"]), 12)
+        self.assertEqual(len(response.data["results"][-1]["attachments"]), 2)
+        self.assertEqual(response.data["results"][-1]["author"]["role"], "operator")
+
+    def test_unchanged_thread_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        TicketReply.objects.create(
+            ticket=self.ticket, author=self.supplier, message="Reply 3"
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_other_suppliers_cannot_read_the_thread(self):
+        other = CustomUser.objects.create_user(
+            "other@example.com", "password", role="supplier"
+        )
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class TicketNotificationTests(SupportTestCase):
+    def setUp(self):
+        super().setUp()
+        operator = CustomUser.objects.create_user(
+            "operator@example.com", "password", role="operator"
+        )
+        CustomUser.objects.filter(pk=operator.pk).update(is_active=True)
+        self.department.operators.add(operator)
+
+    def remove_operators_elsewhere(self):
+        # A change made by another process, whose invalidation this one cannot see
+        TicketDepartment.operators.through.objects.filter(
+            ticketdepartment=self.department
+        ).delete()
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_recipients_are_cached_in_a_shared_cache(self):
+        get_department_recipients(self.department.pk)
+        self.remove_operators_elsewhere()
+        self.assertEqual(
+            get_department_recipients(self.department.pk), ["operator@example.com"]
+        )
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_recipients_are_read_per_batch_without_a_shared_cache(self):
+        get_department_recipients(self.department.pk)
+        self.remove_operators_elsewhere()
+        self.assertEqual(get_department_recipients(self.department.pk), [])
+
+    def test_ticket_events_are_mailed_by_the_relay(self):
+
+        ticket = self.create_ticket()
+        self.assertEqual(len(mail.outbox), 0)
+        relay_events()
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["operator@example.com", "supplier@example.com"],
+        )
+
+        ticket.status = "resolved"
+        ticket.save()
+        relay_events()
+        self.assertEqual(mail.outbox[-1].to, ["operator@example.com"])
+        self.assertIn("Resolved", mail.outbox[-1].subject)
+        # Events already delivered are not mailed again
+        relay_events()
+        self.assertEqual(len(mail.outbox), 3)
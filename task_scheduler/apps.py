@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TaskSchedulerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "task_scheduler"
+
+    def ready(self):
+        from .signals import connect_signals
+
+        connect_signals()
@@ -0,0 +1,244 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, Q
+from django.utils import timezone
+
+# Lookups for the comparison operators of TaskCondition
+OPERATOR_LOOKUPS = {
+    "<": "lt",
+    "<=": "lte",
+    "=": "exact",
+    ">=": "gte",
+    ">": "gt",
+}
+# The same comparison seen from the other side, for "days since" conditions
+REVERSED_OPERATORS = {"<": ">", "<=": ">=", "=": "=", ">=": "<=", ">": "<"}
+
+BOOLEAN_FIELDS = {
+    "profile_completion": "profile__profile_complete",
+    "email_verification": "email_verified",
+    "phone_verification": "profile__phone_verified",
+}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+
+# Conditions that filter across the certificate relation and need distinct results
+MULTI_VALUED_TYPES = {"certificate_expiry"}
+
+# User fields, as lookup paths from the user, that custom conditions may filter on
+CUSTOM_CONDITION_FIELDS = {
+    "role",
+    "language",
+    "is_active",
+    "email_verified",
+    "profile_complete",
+    "is_approved",
+    "approval_status",
+    "date_joined",
+    "last_login",
+    "profile__city",
+    "profile__country",
+    "profile__supplier_type",
+    "profile__industry",
+    "profile__phone_verified",
+    "profile__preferred_language",
+    "profile__profile_complete",
+    "profile__date_created",
+}
+
+
+def parse_days(value, operator):
+    """
+    Parse a number of days, or a "low,high" range of days for the "in" operator.
+    """
+    try:
+        if operator == "in":
+            low, high = (int(part) for part in value.split(","))
+            return (low, high) if low <= high else (high, low)
+        return int(value)
+    except ValueError:
+        raise ValueError(
+            f"Expected a number of days{' range such as 30,60' if operator == 'in' else ''}, got {value!r}."
+        )
+
+
+def parse_boolean(value):
+    normalized = value.strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValueError(f"Expected true or false, got {value!r}.")
+
+
+def get_user_field(path):
+    """
+    Return the model field a lookup path from the user ends at.
+    """
+    from accounts.models import CustomUser
+
+    model = CustomUser
+    *relations, name = path.split("__")
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def parse_custom_value(field_path, value):
+    """
+    Convert a custom condition value to the type of the field it is compared with.
+    """
+    field = get_user_field(field_path)
+    if isinstance(field, BooleanField):
+        return parse_boolean(value)
+    try:
+        return field.to_python(value.strip())
+    except ValidationError:
+        raise ValueError(f"Invalid value {value!r} for {field_path}.")
+
+
+def compile_condition(condition_type, operator, value, additional_data=None):
+    """
+    Validate a single condition and turn it into a plan step: a tuple of the condition
+    type, operator and parsed value (plus the field for custom conditions). Steps hold
+    no dates, so a cached plan stays valid from one day to the next.
+    """
+    if operator not in OPERATOR_LOOKUPS and operator != "in":
+        raise ValueError(f"Unknown operator {operator!r}.")
+
+    if condition_type in ("certificate_expiry", "user_activity"):
+        return (condition_type, operator, parse_days(value, operator))
+    if condition_type in BOOLEAN_FIELDS:
+        if operator != "=":
+            raise ValueError(f"{condition_type} conditions only support '='.")
+        return (condition_type, operator, parse_boolean(value))
+    if condition_type == "role_assignment":
+        if operator not in ("=", "in"):
+            raise ValueError("Role conditions only support '=' and 'in'.")
+        roles = [role.strip() for role in value.split(",") if role.strip()]
+        return (condition_type, operator, roles)
+    if condition_type == "custom":
+        field = (additional_data or {}).get("field")
+        if not field:
+            raise ValueError(
+                "Custom conditions need a 'field' lookup path in additional data."
+            )
+        if field not in CUSTOM_CONDITION_FIELDS:
+            raise ValueError(
+                f"Custom conditions cannot filter on {field!r}. Allowed fields: "
+                f"{', '.join(sorted(CUSTOM_CONDITION_FIELDS))}."
+            )
+        if operator == "in":
+            parsed = [parse_custom_value(field, part) for part in value.split(",")]
+        else:
+            parsed = parse_custom_value(field, value)
+        return (condition_type, operator, parsed, field)
+    raise ValueError(f"Unknown condition type {condition_type!r}.")
+
+
+def compile_conditions(conditions):
+    """
+    Compile condition rows (or dicts with the same keys) into a plan.
+    """
+    plan = []
+    for condition in conditions:
+        if not isinstance(condition, dict):
+            condition = {
+                "condition_type": condition.condition_type,
+                "operator": condition.operator,
+                "value": condition.value,
+                "additional_data": condition.additional_data,
+            }
+        plan.append(
+            compile_condition(
+                condition["condition_type"],
+                condition["operator"],
+                condition["value"],
+                condition["additional_data"],
+            )
+        )
+    return plan
+
+
+def days_range_q(field, operator, days, origin, sign):
+    """
+    Build the filter for "`field` is `days` days away from `origin`" where `sign` is 1
+    for dates in the future and -1 for dates in the past.
+    """
+    if operator == "in":
+        low, high = (origin + timedelta(days=sign * bound) for bound in days)
+        return Q(**{f"{field}__range": (min(low, high), max(low, high))})
+    if sign < 0:
+        operator = REVERSED_OPERATORS[operator]
+    return Q(
+        **{
+            f"{field}__{OPERATOR_LOOKUPS[operator]}": origin
+            + timedelta(days=sign * days)
+        }
+    )
+
+
+def step_to_q(step, now):
+    condition_type, operator, value = step[:3]
+    if condition_type == "certificate_expiry":
+        # Days until expiry of an approved, verified certificate, matched on one certificate row
+        return days_range_q(
+            "certificate__expiry_date", operator, value, now.date(), 1
+        ) & Q(certificate__approved=True, certificate__verified=True)
+    if condition_type == "user_activity":
+        # Days since the last login; users who never logged in count as inactive
+        if operator == "=":
+            return Q(last_login__date=now.date() - timedelta(days=value))
+        activity = days_range_q("last_login", operator, value, now, -1)
+        if operator in (">", ">="):
+            activity |= Q(last_login__isnull=True)
+        return activity
+    if condition_type in BOOLEAN_FIELDS:
+        return Q(**{BOOLEAN_FIELDS[condition_type]: value})
+    if condition_type == "role_assignment":
+        return Q(role__in=value)
+    field = step[3]
+    lookup = "in" if operator == "in" else OPERATOR_LOOKUPS[operator]
+    return Q(**{f"{field}__{lookup}": value})
+
+
+def plan_to_q(plan, now=None):
+    """
+    Combine the steps of a plan into one Q expression, evaluated relative to `now`.
+    """
+    now = now or timezone.now()
+    q = Q()
+    for step in plan:
+        q &= step_to_q(step, now)
+    return q
+
+
+def plan_needs_distinct(plan):
+    return any(step[0] in MULTI_VALUED_TYPES for step in plan)
+
+
+def plan_cache_key(task_id):
+    return f"task-condition-plan:{task_id}"
+
+
+def get_condition_plan(task):
+    """
+    Return the compiled condition plan of a task, from the cache when possible.
+    The cached plan is dropped whenever one of the task's conditions changes, so it
+    is only cached when the cache is shared with the processes editing conditions.
+    """
+    if not settings.CACHE_IS_SHARED:
+        return compile_conditions(task.conditions.all())
+    key = plan_cache_key(task.pk)
+    plan = cache.get(key)
+    if plan is None:
+        plan = compile_conditions(task.conditions.all())
+        cache.set(key, plan, settings.TASK_CONDITION_PLAN_CACHE_TIMEOUT)
+    return plan
+
+
+def invalidate_condition_plan(sender, instance, **kwargs):
+    cache.delete(plan_cache_key(instance.task_id))
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_scheduler.scheduler import run_due, seconds_until_next_run
+
+
+class Command(BaseCommand):
+    help = "Run due scheduled tasks and notification schedules. Safe to run on several replicas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, sleeping until the next task is due, instead of exiting.",
+        )
+        parser.add_argument(
+            "--max-interval",
+            type=float,
+            default=settings.SCHEDULER_MAX_SLEEP,
+            help="Maximum seconds to sleep between checks, so newly added tasks are picked up.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            task_count, schedule_count = run_due()
+            if task_count or schedule_count:
+                self.stdout.write(
+                    f"Ran {task_count} task(s) and {schedule_count} notification schedule(s)."
+                )
+            if not options["loop"]:
+                break
+            time.sleep(seconds_until_next_run(options["max_interval"]))
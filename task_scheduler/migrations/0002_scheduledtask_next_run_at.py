@@ -0,0 +1,72 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:53
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_active_tasks(apps, schema_editor):
+    """
+    Tasks whose rule has a notification schedule keep running only through it. The
+    others continue on their interval from their last run, or from their creation if
+    they never ran, at the first slot after now, so the deploy does not fire them all.
+    """
+    ScheduledTask = apps.get_model("task_scheduler", "ScheduledTask")
+    NotificationSchedule = apps.get_model("notifications", "NotificationSchedule")
+    ScheduledTask.objects.filter(
+        notification_rule__in=NotificationSchedule.objects.values("rule")
+    ).update(run_interval=None)
+
+    now = timezone.now()
+    tasks = list(
+        ScheduledTask.objects.filter(is_active=True, run_interval__isnull=False)
+    )
+    for task in tasks:
+        start = task.last_run_at or task.created_at
+        interval = timedelta(hours=task.run_interval)
+        task.next_run_at = start + ((now - start) // interval + 1) * interval
+    ScheduledTask.objects.bulk_update(tasks, ["next_run_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_notificationschedule_next_run_at"),
+        ("task_scheduler", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduledtask",
+            name="next_run_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the scheduler runs the task next.",
+                null=True,
+                verbose_name="Next Run At",
+            ),
+        ),
+        migrations.AddField(
+            model_name="scheduledtask",
+            name="run_interval",
+            field=models.PositiveIntegerField(
+                blank=True,
+                default=24,
+                help_text="Hours between runs. Leave empty to only run the task through notification schedules.",
+                null=True,
+                verbose_name="Run Interval (hours)",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scheduledtask",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["next_run_at"],
+                name="scheduledtask_due_idx",
+            ),
+        ),
+        migrations.RunPython(schedule_active_tasks, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,31 @@
+import logging
+import time
 from datetime import timedelta
-from django.db import models
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, models
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from notifications.models import NotificationRule, Notification, NotificationHistory
+from notifications.models import (
+    NotificationRule,
+    Notification,
+    next_occurrence,
+)
 from accounts.models import CustomUser
-from certificates.models import Certificate
+from certificates.expiry import suppliers_with_expiry_on
+from support.models import SLA_OPEN_STATUSES, Ticket
+from .conditions import (
+    compile_condition,
+    get_condition_plan,
+    plan_needs_distinct,
+    plan_to_q,
+)
+
+logger = logging.getLogger(__name__)
+
+RECIPIENT_FIELDS = ["pk", "email", "phone_number"]
 
 
 class TaskCondition(models.Model):
@@ -50,6 +71,19 @@ class TaskCondition(models.Model):
     def __str__(self):
         return f"Condition for {self.task.name}: {self.condition_type} {self.operator} {self.value}"
 
+    def clean(self):
+        try:
+            compile_condition(
+                self.condition_type, self.operator, self.value, self.additional_data
+            )
+        except ValueError as e:
+            raise ValidationError({"value": str(e)})
+
+    def save(self, *args, **kwargs):
+        # Invalid conditions are rejected here rather than failing in the scheduler
+        self.clean()
+        super().save(*args, **kwargs)
+
 
 class ScheduledTask(models.Model):
     TASK_TYPE_CHOICES = [
@@ -77,6 +111,21 @@ class ScheduledTask(models.Model):
     is_active = models.BooleanField(_("Is Active"), default=True)
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     last_run_at = models.DateTimeField(_("Last Run At"), null=True, blank=True)
+    run_interval = models.PositiveIntegerField(
+        _("Run Interval (hours)"),
+        null=True,
+        blank=True,
+        default=24,
+        help_text=_(
+            "Hours between runs. Leave empty to only run the task through notification schedules."
+        ),
+    )
+    next_run_at = models.DateTimeField(
+        _("Next Run At"),
+        null=True,
+        blank=True,
+        help_text=_("When the scheduler runs the task next."),
+    )
     created_by = models.ForeignKey(
         CustomUser, on_delete=models.SET_NULL, null=True, verbose_name=_("Created By")
     )
@@ -88,47 +137,150 @@ class ScheduledTask(models.Model):
         help_text=_("Custom date intervals in days, e.g., {'days': [30, 60, 90, 180]}"),
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_run_at"],
+                condition=models.Q(is_active=True),
+                name="scheduledtask_due_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
-    def execute_task(self):
-        if not self.is_active:
-            return
+    def get_next_run_at(self, now):
+        """
+        Return the next run after `now` on the task's interval, or None if it does not repeat.
+        """
+        if not self.run_interval:
+            return None
+        return next_occurrence(
+            self.next_run_at or now, timedelta(hours=self.run_interval), now
+        )
 
-        # Execute task based on task type
-        users = self.get_users_for_task()
-        for user in users:
-            # Create notification for each user based on the associated rule
-            notification = Notification.objects.create(
-                user=user,
-                rule=self.notification_rule,
-                method=self.notification_rule.notification_methods.first(),
-                status="pending",
+    def save(self, *args, **kwargs):
+        # New tasks and tasks given an interval run on the next scheduler tick
+        if self.next_run_at is None and self.run_interval:
+            self.next_run_at = timezone.now()
+        super().save(*args, **kwargs)
+
+    def execute_task(self, chunk_size=None):
+        """
+        Queue a pending notification for every recipient of the task. Recipients are
+        streamed from a single query and written with chunked bulk inserts, or with one
+        INSERT ... SELECT when SCHEDULED_TASK_INSERT_SELECT is set. The history row of
+        each notification is written by the dispatcher once it is sent.
+        Returns the number of notifications created and the elapsed time in seconds.
+        """
+        if not self.is_active or self.notification_rule is None:
+            return None
+
+        started = time.monotonic()
+        chunk_size = chunk_size or settings.SCHEDULED_TASK_CHUNK_SIZE
+        method = self.notification_rule.notification_methods.order_by("pk").first()
+        method_id = method.pk if method else None
+        if settings.SCHEDULED_TASK_INSERT_SELECT:
+            created = self.insert_notifications_from_query(
+                self.get_recipients(method), method_id
             )
-            # Record in history
-            NotificationHistory.objects.create(
-                user=user,
-                rule=self.notification_rule,
-                method=notification.method,
-                status="pending",
-                message_id=None,
+        else:
+            created = self.bulk_create_notifications(
+                self.iter_recipients(chunk_size, fields=["pk"], method=method),
+                method_id,
+            )
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Scheduled task {self.pk} ({self.task_type}) queued {created} notification(s) in {elapsed:.2f}s."
+        )
+        return {"created": created, "elapsed": elapsed}
+
+    def bulk_create_notifications(self, chunks, method_id):
+        """
+        Create pending notifications for chunks of recipient rows, one insert per
+        chunk.
+        """
+        created = 0
+        for chunk in chunks:
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=row[0],
+                        rule_id=self.notification_rule_id,
+                        method_id=method_id,
+                        status="pending",
+                    )
+                    for row in chunk
+                ]
             )
+            created += len(chunk)
+        return created
+
+    def insert_notifications_from_query(self, recipients, method_id):
+        """
+        Create pending notifications inside the database with INSERT ... SELECT over
+        the recipient query, without loading any user IDs into Python.
+        """
+        select_sql, select_params = (
+            recipients.order_by().values_list("pk", flat=True).query.sql_with_params()
+        )
+        params = [
+            self.notification_rule_id,
+            method_id,
+            "pending",
+            "",
+            timezone.now(),
+        ] + list(select_params)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {Notification._meta.db_table} "
+                "(user_id, rule_id, method_id, status, message_id, created_at) "
+                f"SELECT recipients.id, %s, %s, %s, %s, %s FROM ({select_sql}) recipients",
+                params,
+            )
+            return cursor.rowcount
+
+    def get_recipients(self, method=None):
+        """
+        Return the users of the task that can be reached through `method`.
+        """
+        users = self.get_users_for_task()
+        if method is not None and method.method in ("sms", "voice"):
+            users = users.exclude(phone_number__isnull=True).exclude(phone_number="")
+        return users
+
+    def iter_recipients(self, chunk_size=None, fields=RECIPIENT_FIELDS, method=None):
+        """
+        Yield the recipients of the task as lists of at most `chunk_size` rows holding
+        `fields`, by default the user ID and contact details. Rows are read through a
+        server-side cursor on PostgreSQL, so the audience is never loaded as a whole.
+        """
+        chunk_size = chunk_size or settings.SCHEDULED_TASK_CHUNK_SIZE
+        rows = (
+            self.get_recipients(method)
+            .order_by()
+            .values_list(*fields)
+            .iterator(chunk_size=chunk_size)
+        )
+        while chunk := list(islice(rows, chunk_size)):
+            yield chunk
 
     def get_users_for_task(self):
+        """
+        Return the users targeted by the task: the built-in audience of its task type,
+        narrowed by its conditions in the same query. Task types without a built-in
+        audience target all users matching the conditions, or nobody without conditions.
+        """
         today = timezone.now().date()
-        users = []
+        plan = get_condition_plan(self)
 
         if self.task_type == "certificate_expiry":
             # Fetch dynamic expiry dates based on custom_dates JSON field
             expiry_dates = [
                 today + timedelta(days=days)
-                for days in self.custom_dates.get("days", [])
+                for days in (self.custom_dates or {}).get("days", [])
             ]
-            users = CustomUser.objects.filter(
-                certificate__expiry_date__in=expiry_dates,
-                certificate__approved=True,
-                certificate__verified=True,
-            ).distinct()
+            users = suppliers_with_expiry_on(expiry_dates)
 
         elif self.task_type == "profile_completion":
             users = CustomUser.objects.filter(profile__profile_complete=False)
@@ -136,4 +288,23 @@ class ScheduledTask(models.Model):
         elif self.task_type == "email_verification":
             users = CustomUser.objects.filter(email_verified=False)
 
+        elif self.task_type == "unresolved_tickets":
+            # Operators assigned to unresolved tickets past their SLA due date
+            breached = Ticket.objects.filter(
+                status__in=SLA_OPEN_STATUSES + ["escalated"],
+                sla_due_date__lt=timezone.now(),
+                assigned_to__isnull=False,
+            )
+            users = CustomUser.objects.filter(pk__in=breached.values("assigned_to_id"))
+
+        elif plan:
+            users = CustomUser.objects.all()
+
+        else:
+            return CustomUser.objects.none()
+
+        if plan:
+            users = users.filter(plan_to_q(plan))
+            if plan_needs_distinct(plan):
+                users = users.distinct()
         return users
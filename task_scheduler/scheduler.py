@@ -0,0 +1,135 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, Min, OuterRef
+from django.utils import timezone
+
+from notifications.models import NotificationSchedule
+from .models import ScheduledTask
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    """
+    Return the thread pool that runs due tasks, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.SCHEDULER_WORKERS)
+    return _executor
+
+
+def claim_due_tasks(now):
+    """
+    Lock the active tasks whose next run is due, move their next run forward and record
+    the run. Rows locked by another scheduler are skipped and the claim is committed
+    before any task runs, so a run is never fired twice by concurrent schedulers.
+    Tasks whose notification rule has a schedule only run through that schedule, so
+    their interval runs are moved forward without being returned.
+    """
+    scheduled = NotificationSchedule.objects.filter(
+        rule_id=OuterRef("notification_rule_id")
+    )
+    with transaction.atomic():
+        tasks = list(
+            ScheduledTask.objects.select_for_update(skip_locked=True)
+            .filter(is_active=True, next_run_at__lte=now)
+            .annotate(has_schedule=Exists(scheduled))
+            .order_by("next_run_at")
+        )
+        for task in tasks:
+            task.next_run_at = task.get_next_run_at(now)
+            if not task.has_schedule:
+                task.last_run_at = now
+        ScheduledTask.objects.bulk_update(tasks, ["next_run_at", "last_run_at"])
+    return [task for task in tasks if not task.has_schedule]
+
+
+def claim_schedule_tasks(schedules, now):
+    """
+    Lock and record the run of the active tasks of the schedules' notification rules,
+    which define their audience. A task runs once per tick even when several of its
+    schedules are due; `claim_due_tasks` never returns these tasks, so a task is not
+    also run on its interval. The lock waits for a concurrent interval claim.
+    """
+    with transaction.atomic():
+        tasks = list(
+            ScheduledTask.objects.select_for_update()
+            .filter(
+                notification_rule_id__in={schedule.rule_id for schedule in schedules},
+                is_active=True,
+            )
+            .order_by("pk")
+        )
+        for task in tasks:
+            task.last_run_at = now
+        ScheduledTask.objects.bulk_update(tasks, ["last_run_at"])
+    return tasks
+
+
+def claim_due_schedules(now):
+    """
+    Lock the notification schedules that are due and record them as sent, in the same
+    way as `claim_due_tasks`.
+    """
+    with transaction.atomic():
+        schedules = list(
+            NotificationSchedule.objects.select_for_update(skip_locked=True)
+            .filter(next_run_at__lte=now)
+            .order_by("next_run_at")
+        )
+        for schedule in schedules:
+            schedule.last_sent_at = now
+            schedule.next_run_at = schedule.get_next_run_at()
+        NotificationSchedule.objects.bulk_update(
+            schedules, ["last_sent_at", "next_run_at"]
+        )
+    return schedules
+
+
+def run_task(task):
+    try:
+        return task.execute_task()
+    except Exception as e:
+        logger.error(f"Scheduled task {task.pk} failed: {e}")
+    finally:
+        connection.close()
+
+
+def run_due():
+    """
+    Claim everything that is due and run it on the worker pool.
+    Returns the number of tasks and schedules fired.
+    """
+    now = timezone.now()
+    tasks = claim_due_tasks(now)
+    schedules = claim_due_schedules(now)
+    if schedules:
+        tasks += claim_schedule_tasks(schedules, now)
+    executor = get_executor()
+    for future in [executor.submit(run_task, task) for task in tasks]:
+        future.result()
+    return len(tasks), len(schedules)
+
+
+def seconds_until_next_run(max_wait):
+    """
+    Return how long the scheduler can sleep before the next task or schedule is due,
+    read from the next-run indexes, capped at `max_wait` seconds.
+    """
+    next_runs = [
+        ScheduledTask.objects.filter(is_active=True).aggregate(
+            next_run=Min("next_run_at")
+        )["next_run"],
+        NotificationSchedule.objects.aggregate(next_run=Min("next_run_at"))["next_run"],
+    ]
+    next_runs = [next_run for next_run in next_runs if next_run is not None]
+    if not next_runs:
+        return max_wait
+    wait = (min(next_runs) - timezone.now()).total_seconds()
+    return min(max(wait, 0), max_wait)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+
+from .conditions import invalidate_condition_plan
+from .models import TaskCondition
+
+
+def connect_signals():
+    """
+    Drops the cached condition plan of a task whenever one of its conditions changes.
+    """
+    post_save.connect(invalidate_condition_plan, sender=TaskCondition)
+    post_delete.connect(invalidate_condition_plan, sender=TaskCondition)
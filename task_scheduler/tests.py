@@ -1,3 +1,204 @@
-from django.test import TestCase
+from concurrent.futures import Future
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from notifications.models import (
+    Notification,
+    NotificationHistory,
+    NotificationMethod,
+    NotificationRule,
+    NotificationSchedule,
+)
+from .conditions import compile_condition
+from .models import ScheduledTask, TaskCondition
+from .scheduler import claim_due_tasks, run_due
+
+seed_migration = import_module(
+    "task_scheduler.migrations.0002_scheduledtask_next_run_at"
+)
+
+
+class InlineExecutor:
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.rule = NotificationRule.objects.create(name="Reminder", trigger="task")
+        self.scheduled_rule = NotificationRule.objects.create(
+            name="Scheduled", trigger="task"
+        )
+        self.task = ScheduledTask.objects.create(
+            name="Interval", task_type="email_verification", notification_rule=self.rule
+        )
+        self.scheduled_task = ScheduledTask.objects.create(
+            name="Scheduled",
+            task_type="email_verification",
+            notification_rule=self.scheduled_rule,
+        )
+        self.now = timezone.now()
+        self.schedule = NotificationSchedule.objects.create(
+            rule=self.scheduled_rule, schedule_time=self.now + timedelta(days=1)
+        )
+
+    def test_due_tasks_are_claimed_once(self):
+        claimed = claim_due_tasks(self.now)
+        self.assertEqual([task.pk for task in claimed], [self.task.pk])
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.last_run_at, self.now)
+        self.assertGreater(self.task.next_run_at, self.now)
+        self.assertEqual(claim_due_tasks(self.now), [])
+
+    def test_scheduled_tasks_only_run_through_their_schedule(self):
+        claim_due_tasks(self.now)
+        self.scheduled_task.refresh_from_db()
+        self.assertIsNone(self.scheduled_task.last_run_at)
+        self.assertGreater(self.scheduled_task.next_run_at, self.now)
+
+    def test_run_due_runs_each_task_once(self):
+        # A second schedule of the same rule due at the same time
+        NotificationSchedule.objects.create(
+            rule=self.scheduled_rule, schedule_time=self.now + timedelta(days=1)
+        )
+        NotificationSchedule.objects.update(next_run_at=self.now)
+        ScheduledTask.objects.update(next_run_at=self.now)
+
+        with mock.patch(
+            "task_scheduler.scheduler.get_executor", return_value=InlineExecutor()
+        ), mock.patch("task_scheduler.scheduler.run_task") as run_task:
+            self.assertEqual(run_due(), (2, 2))
+
+        ran = sorted(call.args[0].pk for call in run_task.call_args_list)
+        self.assertEqual(ran, sorted([self.task.pk, self.scheduled_task.pk]))
+
+    def test_seeding_continues_from_the_last_run(self):
+        ScheduledTask.objects.filter(pk=self.task.pk).update(
+            last_run_at=self.now - timedelta(hours=30), next_run_at=None
+        )
+        seed_migration.schedule_active_tasks(apps, None)
+
+        self.task.refresh_from_db()
+        self.assertGreater(self.task.next_run_at, timezone.now())
+        self.assertEqual(
+            self.task.next_run_at, self.now - timedelta(hours=30) + timedelta(hours=48)
+        )
+        self.scheduled_task.refresh_from_db()
+        self.assertIsNone(self.scheduled_task.run_interval)
+
+
+class CustomConditionTests(TestCase):
+    def setUp(self):
+        self.task = ScheduledTask.objects.create(name="Custom", task_type="custom")
+
+    def add_condition(self, field, operator, value):
+        return TaskCondition.objects.create(
+            task=self.task,
+            condition_type="custom",
+            operator=operator,
+            value=value,
+            additional_data={"field": field},
+        )
+
+    def test_fields_outside_the_allowlist_are_rejected(self):
+        for field in ["password", "groups__name", "profile__user__password", "nope"]:
+            with self.assertRaises(ValueError):
+                compile_condition("custom", "=", "x", {"field": field})
+            with self.assertRaises(ValidationError):
+                self.add_condition(field, "=", "x")
+        self.assertFalse(TaskCondition.objects.exists())
+
+    def test_values_are_checked_against_the_field_type(self):
+        with self.assertRaises(ValidationError):
+            self.add_condition("date_joined", ">", "yesterday")
+        self.assertEqual(
+            compile_condition("custom", "=", "True", {"field": "is_approved"})[2], True
+        )
+
+    def test_custom_conditions_filter_users(self):
+        CustomUser.objects.create_user("a@example.com", role="supplier")
+        CustomUser.objects.create_user("b@example.com", role="operator")
+        self.add_condition("role", "in", "supplier, admin")
+        self.assertEqual(
+            list(self.task.get_users_for_task().values_list("email", flat=True)),
+            ["a@example.com"],
+        )
+
+
+class ExecuteTaskTests(TestCase):
+    def setUp(self):
+        self.method = NotificationMethod.objects.create(method="email")
+        self.rule = NotificationRule.objects.create(name="Verify", trigger="task")
+        self.rule.notification_methods.add(self.method)
+        self.task = ScheduledTask.objects.create(
+            name="Verify", task_type="email_verification", notification_rule=self.rule
+        )
+        self.recipients = 0
+
+    def add_recipients(self, count):
+        for _ in range(count):
+            self.recipients += 1
+            CustomUser.objects.create_user(f"user{self.recipients}@example.com")
+
+    def assert_queued(self, result):
+        self.assertEqual(set(result), {"created", "elapsed"})
+        self.assertEqual(result["created"], self.recipients)
+        self.assertEqual(
+            Notification.objects.filter(
+                rule=self.rule, method=self.method, status="pending"
+            ).count(),
+            self.recipients,
+        )
+        # The history row is written by the dispatcher once the notification is sent
+        self.assertFalse(NotificationHistory.objects.exists())
+
+    def assert_constant_queries(self, chunk_size):
+        self.add_recipients(3)
+        with CaptureQueriesContext(connection) as queries:
+            result = self.task.execute_task(chunk_size)
+        self.assert_queued(result)
+
+        Notification.objects.all().delete()
+        self.add_recipients(5)
+        with self.assertNumQueries(len(queries)):
+            result = self.task.execute_task(chunk_size)
+        self.assert_queued(result)
+
+    @override_settings(SCHEDULED_TASK_INSERT_SELECT=False)
+    def test_recipients_are_queued_in_chunks(self):
+        self.assert_constant_queries(chunk_size=100)
+
+    @override_settings(SCHEDULED_TASK_INSERT_SELECT=False)
+    def test_each_chunk_is_one_insert(self):
+        self.add_recipients(5)
+        with CaptureQueriesContext(connection) as queries:
+            result = self.task.execute_task(chunk_size=2)
+        self.assert_queued(result)
+        inserts = [
+            query
+            for query in queries
+            if query["sql"].startswith('INSERT INTO "notifications_notification"')
+        ]
+        self.assertEqual(len(inserts), 3)
+
+    @override_settings(SCHEDULED_TASK_INSERT_SELECT=True)
+    def test_recipients_are_queued_with_insert_select(self):
+        self.assert_constant_queries(chunk_size=2)
+
+    def test_inactive_task_queues_nothing(self):
+        self.add_recipients(1)
+        self.task.is_active = False
+        self.assertIsNone(self.task.execute_task())
+        self.assertFalse(Notification.objects.exists())
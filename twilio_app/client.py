@@ -0,0 +1,98 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+REQUIRED_SETTINGS = [
+    "TWILIO_ACCOUNT_SID",
+    "TWILIO_AUTH_TOKEN",
+    "TWILIO_PHONE_NUMBER",
+]
+
+_client = None
+_client_lock = threading.Lock()
+_executor = None
+
+
+def validate_twilio_settings():
+    """
+    Validates that all necessary Twilio settings are present.
+    """
+    missing_settings = [
+        setting for setting in REQUIRED_SETTINGS if not getattr(settings, setting, None)
+    ]
+    if missing_settings:
+        raise ValueError(f"Missing required setting(s): {', '.join(missing_settings)}")
+
+
+def get_twilio_client():
+    """
+    Return the Twilio client shared by the whole process, creating it on first use.
+    Its HTTP session keeps up to TWILIO_SEND_CONCURRENCY connections to the API open,
+    so concurrent requests reuse TLS connections instead of opening one per message.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                validate_twilio_settings()
+                http_client = TwilioHttpClient(timeout=settings.TWILIO_HTTP_TIMEOUT)
+                http_client.session.mount(
+                    "https://",
+                    HTTPAdapter(pool_maxsize=settings.TWILIO_SEND_CONCURRENCY),
+                )
+                _client = Client(
+                    settings.TWILIO_ACCOUNT_SID,
+                    settings.TWILIO_AUTH_TOKEN,
+                    http_client=http_client,
+                )
+    return _client
+
+
+def get_executor():
+    """
+    Return the thread pool used to fan out Twilio requests, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.TWILIO_SEND_CONCURRENCY)
+    return _executor
+
+
+def create_message(params):
+    try:
+        message = get_twilio_client().messages.create(
+            from_=settings.TWILIO_PHONE_NUMBER, **params
+        )
+    except Exception as e:
+        return None, e
+    return message.sid, None
+
+
+def create_call(params):
+    try:
+        call = get_twilio_client().calls.create(
+            from_=settings.TWILIO_PHONE_NUMBER, **params
+        )
+    except Exception as e:
+        return None, e
+    return call.sid, None
+
+
+def send_sms_batch(messages):
+    """
+    Send SMS messages concurrently. Each item holds the keyword arguments of
+    `messages.create` (e.g. `to` and `body`). Returns a (SID, error) pair per message.
+    """
+    return list(get_executor().map(create_message, messages))
+
+
+def make_voice_calls(calls):
+    """
+    Start voice calls concurrently. Each item holds the keyword arguments of
+    `calls.create` (e.g. `to` and `twiml` or `url`). Returns a (SID, error) pair per call.
+    """
+    return list(get_executor().map(create_call, calls))
@@ -1,9 +1,10 @@
 from django.db import models
 from django.conf import settings
-from twilio.rest import Client
 from django.utils.translation import gettext_lazy as _
 import logging
 
+from .client import get_twilio_client, validate_twilio_settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,20 +69,7 @@ class TwilioService:
         """
         Validates that all necessary Twilio settings are present.
         """
-        required_settings = [
-            "TWILIO_ACCOUNT_SID",
-            "TWILIO_AUTH_TOKEN",
-            "TWILIO_PHONE_NUMBER",
-        ]
-        missing_settings = [
-            setting
-            for setting in required_settings
-            if not getattr(settings, setting, None)
-        ]
-        if missing_settings:
-            raise ValueError(
-                f"Missing required setting(s): {', '.join(missing_settings)}"
-            )
+        validate_twilio_settings()
 
     @staticmethod
     def send_sms(to, body):
@@ -95,8 +83,7 @@ class TwilioService:
         if not body:
             raise ValueError("SMS body cannot be empty.")
 
-        TwilioService.validate_twilio_settings()
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
 
         try:
             message = client.messages.create(
@@ -120,8 +107,7 @@ class TwilioService:
         if not url:
             raise ValueError("URL for voice call cannot be empty.")
 
-        TwilioService.validate_twilio_settings()
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
 
         try:
             call = client.calls.create(
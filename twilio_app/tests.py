@@ -1,3 +1,66 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from . import client
+from .client import get_twilio_client, make_voice_calls, send_sms_batch
+
+
+@override_settings(
+    TWILIO_ACCOUNT_SID="AC123",
+    TWILIO_AUTH_TOKEN="token",
+    TWILIO_PHONE_NUMBER="+15550000000",
+    TWILIO_SEND_CONCURRENCY=4,
+)
+class TwilioClientTests(SimpleTestCase):
+    def setUp(self):
+        client._client = None
+        client._executor = None
+        self.addCleanup(setattr, client, "_client", None)
+        self.addCleanup(setattr, client, "_executor", None)
+        patcher = mock.patch("twilio_app.client.Client")
+        self.Client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_client_is_built_once_and_shared(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: get_twilio_client(), range(16)))
+        self.Client.assert_called_once()
+        self.assertTrue(all(shared is clients[0] for shared in clients))
+
+    @override_settings(TWILIO_AUTH_TOKEN="")
+    def test_missing_settings_are_reported(self):
+        with self.assertRaisesMessage(ValueError, "TWILIO_AUTH_TOKEN"):
+            get_twilio_client()
+
+    def test_sms_fan_out_returns_a_result_per_recipient(self):
+        def create(to, body, from_):
+            if to == "+2":
+                raise RuntimeError("Invalid number")
+            return mock.Mock(sid=f"SM{to}")
+
+        self.Client.return_value.messages.create.side_effect = create
+        results = send_sms_batch(
+            [{"to": f"+{number}", "body": "Hello"} for number in range(1, 5)]
+        )
+
+        self.assertEqual(
+            [sid for sid, _error in results], ["SM+1", None, "SM+3", "SM+4"]
+        )
+        self.assertIsInstance(results[1][1], RuntimeError)
+        self.assertEqual(self.Client.return_value.messages.create.call_count, 4)
+        self.Client.assert_called_once()
+
+    def test_voice_calls_return_a_result_per_call(self):
+        self.Client.return_value.calls.create.side_effect = [
+            mock.Mock(sid="CA1"),
+            RuntimeError("Busy"),
+        ]
+        results = make_voice_calls(
+            [{"to": "+1", "twiml": "<Response/>"}, {"to": "+2", "twiml": "<Response/>"}]
+        )
+        self.assertEqual(len(results), 2)
+        self.assertEqual(
+            sorted(str(sid or error) for sid, error in results), ["Busy", "CA1"]
+        )